@@ -0,0 +1,79 @@
+import gzip
+import secrets
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered
+    brotli = None
+
+_accepts_br = _lazy_re_compile(r'\bbr\b')
+_accepts_gzip = _lazy_re_compile(r'\bgzip\b')
+
+
+def compress(body, encoding):
+    config = settings.RESPONSE_COMPRESSION
+    if encoding == 'br':
+        return brotli.compress(body, quality=config['BROTLI_QUALITY'])
+    compressed = gzip.compress(body, compresslevel=config['GZIP_LEVEL'], mtime=0)
+    # As django.utils.text.compress_string: a random-length file name in the
+    # header so the compressed length leaks less (BREACH)
+    header = bytearray(compressed[:10])
+    header[3] = gzip.FNAME
+    filename = b'a' * secrets.randbelow(config['GZIP_MAX_RANDOM_BYTES']) + b'\x00'
+    return bytes(header) + filename + compressed[10:]
+
+
+def negotiate(accept_encoding):
+    """Preferred encoding the client accepts, or None."""
+    if brotli is not None and _accepts_br.search(accept_encoding):
+        return 'br'
+    if _accepts_gzip.search(accept_encoding):
+        return 'gzip'
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Brotli or gzip response bodies, negotiated from ``Accept-Encoding``.
+
+    Like Django's ``GZipMiddleware`` but with brotli and a configurable
+    ``RESPONSE_COMPRESSION['MIN_SIZE']``: small bodies aren't worth the CPU.
+    Streaming responses are passed through untouched.
+
+    BREACH: gzip keeps ``GZipMiddleware``'s random file name padding, but
+    brotli has no such field. So responses that set cookies (the auth
+    views' tokens) or used the CSRF token are never compressed, as they
+    are the ones likely to carry a secret next to reflected input.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if len(response.content) < settings.RESPONSE_COMPRESSION['MIN_SIZE']:
+            return response
+        if response.cookies or request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The body changed, so a strong ETag no longer applies
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
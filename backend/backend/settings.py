@@ -38,10 +38,14 @@ INSTALLED_APPS = [
     'contact',
     # 'code_practice',
     'learn',
+    'perf',
+    'execution',
 
 ]
 
 MIDDLEWARE = [
+    'perf.middleware.RequestTimingMiddleware',  # Outermost so it sees the whole request
+    'backend.middleware.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -62,8 +66,19 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',  # Disable browsable API in production
-    )
+        'backend.renderers.FastJSONRenderer',  # Disable browsable API in production
+    ),
+    # Token buckets for the auth views (user.throttling): burst of N, refilled at N per period.
+    # The IP budget is generous because a whole classroom often shares one school IP.
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': '300/min',
+        'auth_email': '10/min',
+        'auth_email_send': '5/hour',  # Registration and password reset OTP emails
+    },
+    # Reverse proxies in front of Django that append to X-Forwarded-For (e.g. 1
+    # behind nginx). The auth_ip throttle keys on the address that many hops from
+    # the right; with 0 it uses REMOTE_ADDR, as client-supplied headers can't be trusted.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
 }
 
 SIMPLE_JWT = {
@@ -82,6 +97,40 @@ SIMPLE_JWT = {
     'AUTH_COOKIE_DOMAIN': None,  # Current domain only
 }
 
+# In-memory filter in front of the refresh-token blacklist (user.blacklist).
+# SYNC_SECONDS bounds how long a token blacklisted by another worker can
+# still pass in this one; 0 syncs on every refresh. SYNC_OVERLAP_ROWS ids
+# below the last one seen are re-read on each sync, for rows whose
+# transaction committed after a higher id had already been synced.
+TOKEN_BLACKLIST_FILTER = {
+    'CAPACITY': 100000,
+    'ERROR_RATE': 0.01,
+    'SYNC_SECONDS': 2,
+    'SYNC_OVERLAP_ROWS': 1000,
+    'REBUILD_SECONDS': 3600,
+}
+
+# Cache
+# Per-process by default; point at a shared backend (e.g. Redis) to share
+# entries between workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Seconds an authenticated user row is served from cache (user.authentication).
+# Deactivation and password changes only evict the entry from the worker that
+# saved the user, so with the per-process cache above the shorter LOCAL
+# timeout applies instead.
+AUTH_USER_CACHE_TIMEOUT = 300
+AUTH_USER_LOCAL_CACHE_TIMEOUT = 5
+# Static question fields used by the submit views (learn.questions). As
+# above, edits only evict the entries of the saving process, so the LOCAL
+# timeout applies with a per-process cache.
+QUESTION_CACHE_TIMEOUT = 300
+QUESTION_LOCAL_CACHE_TIMEOUT = 5
+
 ROOT_URLCONF = 'backend.urls'
 
 TEMPLATES = [
@@ -125,6 +174,49 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 
+# Outbox worker (python manage.py send_outbox --loop)
+OUTBOX = {
+    'BATCH_SIZE': 50,
+    'RATE_PER_SECOND': 5,  # Stay under the SMTP provider's sending limits
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 30,  # Seconds; doubles on each attempt
+    'CLAIM_TIMEOUT': 600,  # Reclaim rows left in "sending" by a crashed worker
+    'POLL_INTERVAL': 1,
+}
+
+# backend.middleware.CompressionMiddleware: brotli (if installed) or gzip
+RESPONSE_COMPRESSION = {
+    'MIN_SIZE': 1024,  # Bytes; smaller bodies go out as they are
+    'GZIP_LEVEL': 6,
+    'GZIP_MAX_RANDOM_BYTES': 100,  # BREACH padding, as GZipMiddleware.max_random_bytes
+    'BROTLI_QUALITY': 5,  # 11 is too slow to run per response
+}
+
+# In-process curriculum search index (learn.search): how often a worker
+# checks whether another worker changed the content
+LEARN_SEARCH = {
+    'SYNC_SECONDS': 30,
+}
+
+# Stored curriculum translations (learn.translation), filled by translate_curriculum
+CURRICULUM_TRANSLATION = {
+    'LANGUAGES': ['ta'],
+    'BATCH_CHARS': 4500,  # Google Translate rejects requests over 5000 characters
+    'POLL_INTERVAL': 30,  # Seconds between passes with --loop
+}
+
+# Days an applied progress event's idempotency key is kept, i.e. how late a
+# client may retry a batch (prune_progress_events deletes older keys)
+PROGRESS_EVENT_RETENTION_DAYS = 30
+
+# Write-behind buffer for the public contact form (contact.buffer)
+CONTACT_BUFFER = {
+    'BATCH_SIZE': 50,
+    'FLUSH_SECONDS': 2,
+    'MAX_SIZE': 1000,  # Held at most; past this, messages are saved inline
+    'DEDUP_SECONDS': 300,
+}
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
@@ -170,7 +262,58 @@ USE_TZ = True
 
 # OpenAI
 openai.api_key = os.getenv('OPENAI_API_KEY')
-PISTON_EXECUTE_URL = "https://emkc.org/api/v2/piston/execute"
+# Base URLs are overridable so load tests can point at local stand-ins (see perf/standins.py)
+openai.api_base = os.getenv('OPENAI_API_BASE', openai.api_base)
+PISTON_EXECUTE_URL = os.getenv('PISTON_EXECUTE_URL', "https://emkc.org/api/v2/piston/execute")
+GOOGLE_TRANSLATE_URL = os.getenv('GOOGLE_TRANSLATE_URL')  # None uses deep-translator's default
+
+# Where student code runs (execution.backends): 'piston' (remote API) or
+# 'forkserver' (local pool of warm template processes, execution.forkserver)
+CODE_EXECUTION = {
+    'BACKEND': os.getenv('CODE_EXECUTION_BACKEND', 'piston'),
+    'POOL_SIZE': int(os.getenv('CODE_EXECUTION_POOL_SIZE', 4)),  # Templates per web worker
+    'MAX_RUNS_PER_TEMPLATE': 500,  # Then the template is replaced
+    # Imported once by each template, so runs don't pay for them
+    'PRELOAD_MODULES': [
+        'math', 'random', 'string', 'collections', 'itertools', 'functools', 'operator',
+        'datetime', 'time', 'json', 're', 'statistics', 'fractions', 'decimal', 'heapq', 'bisect',
+    ],
+    'CPU_SECONDS': 5,
+    'WALL_SECONDS': 10,
+    'PISTON_RUN_TIMEOUT_MS': 3000,  # Piston's run_timeout; it SIGKILLs runs at this
+    'MEMORY_BYTES': 256 * 1024 * 1024,
+    'MAX_OUTPUT_BYTES': 1024 * 1024,  # The run is killed past this
+    # Output kept per stream: the first and last half of these, the middle elided
+    'CAPTURE_BYTES': 8 * 1024,
+    'CAPTURE_LINES': 200,
+    'WORKDIR': '/tmp',
+    # Children drop to this uid. Required when the server runs as root: templates
+    # refuse to start otherwise, as a root child isn't held by RLIMIT_NPROC.
+    'RUN_AS_UID': int(os.environ['CODE_EXECUTION_RUN_AS_UID']) if os.getenv('CODE_EXECUTION_RUN_AS_UID') else None,
+    # Fair admission to execution (execution.scheduler). Slots and queues are per
+    # worker; PER_USER holds across workers when CACHES is shared.
+    'SCHEDULER': {
+        'SLOTS': int(os.getenv('CODE_EXECUTION_POOL_SIZE', 4)),  # Concurrent runs per worker
+        'PER_USER': 1,  # Concurrent runs per user
+        'PER_USER_QUEUED': 1,  # Further runs a user may have waiting in a worker
+        'CLAIM_SECONDS': 60,  # A dead worker's per-user counts expire after this
+        'MAX_QUEUE': 64,
+        'QUEUE_SECONDS': 8,  # Then the request is answered "busy"
+        'STAFF_WEIGHT': 2.0,
+    },
+    # Interactive runs for input() programs (execution.sessions), one process each
+    'SESSIONS': {
+        'SOCKET_DIR': os.getenv('CODE_EXECUTION_SESSION_DIR', '/tmp/pywhiz-sessions'),  # Shared by all workers
+        'MAX_SESSIONS': 64,  # Per host; each user has at most one
+        'SECONDS': 300,  # Lifetime cap
+        'IDLE_SECONDS': 60,  # Killed when no client has asked for this long
+        'POLL_SECONDS': 20,  # Longest a poll is held open
+        'LINGER_SECONDS': 5,  # Final output is kept this long after it was collected
+        'BUFFER_CHARS': 32 * 1024,  # Output retained for polling
+        'MAX_INPUTS': 1000,
+        'MAX_LINE_CHARS': 1000,
+    },
+}
 
 # Static files
 STATIC_URL = 'static/'
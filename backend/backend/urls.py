@@ -23,6 +23,7 @@ urlpatterns = [
     path('api/auth/', include('user.urls')),
     path('api/contact/', include('contact.urls')),
     path('api/learn/', include('learn.urls')),  # Changed from lesson to learn
+    path('api/perf/', include('perf.urls')),
 ]
     
    
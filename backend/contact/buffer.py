@@ -0,0 +1,128 @@
+import atexit
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connections
+
+from .models import ContactMessage
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(data):
+    # Exact duplicates only: same sender, same name, same message
+    key = '\x1f'.join((data['email'].strip().lower(), data['full_name'].strip(), data['message'].strip()))
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class ContactBuffer:
+    """
+    Write-behind buffer for contact messages.
+
+    Messages are queued in memory and written with one ``bulk_create``
+    once ``CONTACT_BUFFER['BATCH_SIZE']`` are waiting or
+    ``CONTACT_BUFFER['FLUSH_SECONDS']`` have passed. A message identical to
+    one accepted in the last ``DEDUP_SECONDS`` is dropped. The queue is
+    flushed at interpreter exit, so a graceful worker shutdown doesn't lose
+    anything. At most ``MAX_SIZE`` messages are held, counting a batch being
+    written; past that, messages are saved inline, so a database outage
+    fails the request instead of growing the queue.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = []
+        self._in_flight = 0  # Taken by a flush that hasn't finished
+        self._recent = OrderedDict()  # content hash -> expiry (monotonic)
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    @property
+    def config(self):
+        return settings.CONTACT_BUFFER
+
+    def _forget_expired(self, now):
+        while self._recent:
+            digest, expires = next(iter(self._recent.items()))
+            if expires > now:
+                break
+            self._recent.popitem(last=False)
+
+    def add(self, data):
+        """
+        Queue a validated message. Returns False if it was a recent duplicate.
+
+        When the buffer is full the message is saved inline, and a database
+        error propagates to the caller.
+        """
+        digest = content_hash(data)
+        now = time.monotonic()
+        message = ContactMessage(**data)  # created_at is the time of receipt
+        with self._lock:
+            self._forget_expired(now)
+            if digest in self._recent:
+                return False
+            full = len(self._pending) + self._in_flight >= self.config['MAX_SIZE']
+            if not full:
+                self._recent[digest] = now + self.config['DEDUP_SECONDS']
+                self._pending.append(message)
+                pending = len(self._pending)
+        self._ensure_flusher()
+
+        if full:
+            self._wakeup.set()
+            message.save()  # Backpressure: the request pays for the write
+            with self._lock:
+                self._recent[digest] = now + self.config['DEDUP_SECONDS']
+        elif pending >= self.config['BATCH_SIZE']:
+            self._wakeup.set()
+        return True
+
+    def flush(self):
+        """Write everything queued so far. Returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._in_flight = len(batch)
+            if not batch:
+                return 0
+            try:
+                ContactMessage.objects.bulk_create(batch)
+            except Exception as e:
+                logger.error(f"Contact buffer flush of {len(batch)} messages failed: {e}")
+                with self._lock:
+                    self._pending[:0] = batch  # Keep them for the next attempt
+                    self._in_flight = 0
+                return 0
+            with self._lock:
+                self._in_flight = 0
+            return len(batch)
+
+    def _ensure_flusher(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='contact-buffer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.config['FLUSH_SECONDS'])
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                connections.close_all()  # This thread's connections only
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+
+contact_buffer = ContactBuffer()
+atexit.register(contact_buffer.flush)
@@ -1,10 +1,11 @@
 from django.db import models
+from django.utils import timezone
 
 class ContactMessage(models.Model):
     full_name = models.CharField(max_length=100)
     email = models.EmailField()
     message = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now)  # Set on receipt; contact.buffer writes later
     
     def __str__(self):
         return f"Message from {self.full_name}"
\ No newline at end of file
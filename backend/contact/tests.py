@@ -1,3 +1,54 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .buffer import ContactBuffer
+from .models import ContactMessage
+
+
+def message(i):
+    return {'full_name': "Student", 'email': f"student{i}@example.com", 'message': "Hello"}
+
+
+@override_settings(CONTACT_BUFFER=dict(settings.CONTACT_BUFFER, BATCH_SIZE=100, MAX_SIZE=2))
+class ContactBufferTests(TestCase):
+    def setUp(self):
+        self.buffer = ContactBuffer()
+        self.buffer._thread = object()  # Flushed by the tests, not a background thread
+
+    def test_full_buffer_saves_inline(self):
+        for i in range(3):
+            self.assertTrue(self.buffer.add(message(i)))
+        self.assertEqual(self.buffer.pending(), 2)
+        self.assertEqual(ContactMessage.objects.get().email, "student2@example.com")
+        self.assertFalse(self.buffer.add(message(2)))
+
+    def test_failed_flushes_do_not_grow_the_queue(self):
+        self.buffer.add(message(0))
+        self.buffer.add(message(1))
+        with mock.patch.object(ContactMessage.objects, 'bulk_create', side_effect=OperationalError("down")), \
+                mock.patch.object(ContactMessage, 'save', side_effect=OperationalError("down")), \
+                self.assertLogs('contact.buffer', 'ERROR'):
+            self.assertEqual(self.buffer.flush(), 0)
+            with self.assertRaises(OperationalError):
+                self.buffer.add(message(2))
+        self.assertEqual(self.buffer.pending(), 2)
+        self.assertEqual(self.buffer.flush(), 2)
+
+    def test_created_at_is_the_time_of_receipt(self):
+        self.buffer.add(message(0))
+        queued = self.buffer._pending[0].created_at
+        self.buffer.flush()
+        self.assertEqual(ContactMessage.objects.get().created_at, queued)
+
+
+class ContactMessageCreateViewTests(TestCase):
+    def test_database_outage_is_reported(self):
+        with mock.patch('contact.views.contact_buffer.add', side_effect=OperationalError("down")), \
+                self.assertLogs('contact.views', 'ERROR'):
+            response = APIClient().post(reverse('contact-message-create'), message(0))
+        self.assertEqual(response.status_code, 503)
@@ -1,7 +1,32 @@
-from rest_framework import generics
+import logging
+
+from django.db import DatabaseError
+from rest_framework import generics, status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from .buffer import contact_buffer
 from .models import ContactMessage
 from .serializers import ContactMessageSerializer
 
+logger = logging.getLogger(__name__)
+
+
 class ContactMessageCreateView(generics.CreateAPIView):
     queryset = ContactMessage.objects.all()
-    serializer_class = ContactMessageSerializer
\ No newline at end of file
+    serializer_class = ContactMessageSerializer
+    permission_classes = [AllowAny]
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # Queued for a batched insert; recent exact duplicates are dropped silently
+        try:
+            contact_buffer.add(serializer.validated_data)
+        except DatabaseError as e:
+            # Only when the buffer is full, i.e. its flushes are failing too
+            logger.error(f"Contact message could not be saved: {e}")
+            return Response(
+                {"error": "Message could not be sent, please try again later"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
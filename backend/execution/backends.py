@@ -0,0 +1,137 @@
+import signal
+import time
+
+import requests
+from django.conf import settings
+
+from perf.timing import timed_phase
+from .forkserver import ExecutionError, pool
+from .sandbox import OutputCapture
+
+
+class ExecutionResult:
+    """Output and resource usage of one run, whichever backend produced it."""
+    def __init__(self, stdout='', stderr='', exit_code=None, signal=None, reason=None,
+                 wall_ms=None, cpu_ms=None, max_rss_kb=None, output_bytes=None, truncated=False):
+        self.stdout = stdout
+        self.stderr = stderr
+        self.truncated = truncated  # The middle of stdout or stderr was dropped
+        self.exit_code = exit_code
+        self.signal = signal
+        self.reason = reason  # 'timeout', 'output_limit', 'oom' or None
+        self.wall_ms = wall_ms
+        self.cpu_ms = cpu_ms
+        self.max_rss_kb = max_rss_kb
+        self.output_bytes = output_bytes if output_bytes is not None else (
+            len(stdout.encode('utf-8')) + len(stderr.encode('utf-8'))
+        )
+
+    @property
+    def outcome(self):
+        """Why the run ended: ok, error, timeout, output_limit, cpu_limit, oom or signal."""
+        if self.reason:
+            return self.reason
+        if self.signal in (signal.SIGXCPU, 'SIGXCPU'):
+            return 'cpu_limit'
+        if self.stderr.rstrip().endswith('MemoryError'):
+            return 'oom'  # Hit the address-space limit
+        # A bare SIGKILL may be a timeout, an output limit or the OOM killer;
+        # backends that can tell set ``reason``
+        if self.signal:
+            return 'signal'
+        return 'ok' if self.exit_code == 0 else 'error'
+
+
+def capture(text):
+    """``(text, truncated)`` cut to the capture limits, as the fork server does."""
+    config = settings.CODE_EXECUTION
+    output = OutputCapture(config['CAPTURE_BYTES'], config['CAPTURE_LINES'])
+    output.write(text.encode('utf-8'))
+    return output.text()
+
+
+# Piston's run status: TO timed out, OL/EL stdout/stderr too long (SG signal,
+# RE runtime error and XX internal error are told apart by the other fields)
+PISTON_REASONS = {'TO': 'timeout', 'OL': 'output_limit', 'EL': 'output_limit'}
+
+
+def piston_reason(run):
+    """Why Piston stopped a run, from its status and message, or None."""
+    reason = PISTON_REASONS.get(run.get("status"))
+    if reason:
+        return reason
+    message = (run.get("message") or "").lower()
+    if 'memory' in message or 'oom' in message:
+        return 'oom'
+    # Versions without a status: a kill at the run timeout is the timeout
+    wall_time = run.get("wall_time")
+    if (run.get("signal") == 'SIGKILL' and isinstance(wall_time, (int, float))
+            and wall_time >= settings.CODE_EXECUTION['PISTON_RUN_TIMEOUT_MS']):
+        return 'timeout'
+    return None
+
+
+def run_piston(code, stdin):
+    payload = {
+        "language": "python3",
+        "version": "3.10.0",
+        "files": [{"name": "main.py", "content": code}],
+    }
+    if stdin:
+        payload["stdin"] = stdin
+    started = time.perf_counter()
+    with timed_phase('piston'):
+        response = requests.post(settings.PISTON_EXECUTE_URL, json=payload, timeout=10)
+    wall_ms = round((time.perf_counter() - started) * 1000)
+    if response.status_code != 200:
+        raise ExecutionError(f"Piston returned {response.status_code}")
+    run = response.json().get("run", {})
+    # Piston reports usage only in some versions; memory is in bytes
+    memory = run.get("memory")
+    stdout, stderr = run.get("stdout") or "", run.get("stderr") or ""
+    output_bytes = len(stdout.encode('utf-8')) + len(stderr.encode('utf-8'))
+    (stdout, stdout_truncated), (stderr, stderr_truncated) = capture(stdout), capture(stderr)
+    return ExecutionResult(
+        stdout=stdout,
+        stderr=stderr,
+        exit_code=run.get("code"),
+        signal=run.get("signal"),
+        reason=piston_reason(run),
+        wall_ms=run.get("wall_time", wall_ms),
+        cpu_ms=run.get("cpu_time"),
+        max_rss_kb=memory // 1024 if isinstance(memory, int) else None,
+        output_bytes=output_bytes,
+        truncated=stdout_truncated or stderr_truncated,
+    )
+
+
+def run_forkserver(code, stdin):
+    with timed_phase('sandbox'):
+        result = pool.run(code, stdin)
+    return ExecutionResult(
+        stdout=result['stdout'],
+        stderr=result['stderr'],
+        exit_code=result['exit_code'],
+        signal=result['signal'],
+        reason=result['reason'],
+        wall_ms=result['wall_ms'],
+        cpu_ms=result['cpu_ms'],
+        max_rss_kb=result['max_rss_kb'],
+        output_bytes=result['output_bytes'],
+        truncated=result['truncated'],
+    )
+
+
+BACKENDS = {
+    'piston': run_piston,
+    'forkserver': run_forkserver,
+}
+
+
+def execute(code, stdin=''):
+    """
+    Run ``code`` with ``stdin`` on the configured backend
+    (``CODE_EXECUTION['BACKEND']``). Raises ``ExecutionError`` if the
+    backend itself fails; errors in the code are in ``stderr``.
+    """
+    return BACKENDS[settings.CODE_EXECUTION['BACKEND']](code, stdin)
@@ -0,0 +1,168 @@
+import atexit
+import json
+import os
+import queue
+import select
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+from .sandbox import read_frame, write_frame
+
+SANDBOX_SCRIPT = str(Path(__file__).resolve().with_name('sandbox.py'))
+
+
+class ExecutionError(Exception):
+    pass
+
+
+def sandbox_config():
+    config = settings.CODE_EXECUTION
+    return {
+        'preload': config['PRELOAD_MODULES'],
+        'cpu_seconds': config['CPU_SECONDS'],
+        'wall_seconds': config['WALL_SECONDS'],
+        'memory_bytes': config['MEMORY_BYTES'],
+        'max_output_bytes': config['MAX_OUTPUT_BYTES'],
+        'capture_bytes': config['CAPTURE_BYTES'],
+        'capture_lines': config['CAPTURE_LINES'],
+        'workdir': config['WORKDIR'],
+        'run_as_uid': config['RUN_AS_UID'],
+    }
+
+
+def start_template(config, request=None):
+    """
+    Start a template process and wait until its modules are imported.
+
+    It gets an isolated interpreter (``-I``) and an environment without
+    our secrets; children inherit both. Interactive sessions get their
+    ``request`` up front and their own session, so they outlive the
+    worker that started them.
+    """
+    if os.geteuid() == 0 and config['run_as_uid'] is None:
+        raise ExecutionError("Refusing to run code as root: set CODE_EXECUTION['RUN_AS_UID']")
+    env = {'PATH': os.environ.get('PATH', '/usr/bin:/bin'), 'LANG': 'C.UTF-8', 'PYTHONIOENCODING': 'utf-8'}
+    process = subprocess.Popen(
+        [sys.executable, '-I', SANDBOX_SCRIPT, json.dumps(config)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env, cwd=config['workdir'],
+        start_new_session=request is not None,
+    )
+    if request is not None:
+        write_frame(process.stdin, request)
+    hello = read_frame(process.stdout)
+    if not hello or not hello.get('ready'):
+        process.kill()
+        process.wait()
+        raise ExecutionError("Sandbox template failed to start")
+    return process
+
+
+class Template:
+    """One warm template process; serves one run at a time."""
+    # Beyond the run's own wall limit, for forking and collecting it
+    REPLY_GRACE_SECONDS = 5
+
+    def __init__(self, config):
+        self.process = start_template(config)
+        self.reply_seconds = config['wall_seconds'] + self.REPLY_GRACE_SECONDS
+        self.runs = 0
+
+    def run(self, code, stdin):
+        try:
+            write_frame(self.process.stdin, {'code': code, 'stdin': stdin})
+            ready, _, _ = select.select([self.process.stdout], [], [], self.reply_seconds)
+            if not ready:
+                # Stuck: kill it so the pool replaces it instead of waiting forever
+                self.process.kill()
+                self.process.wait()
+                raise ExecutionError("Sandbox template did not answer")
+            result = read_frame(self.process.stdout)
+        except (BrokenPipeError, ValueError) as e:
+            raise ExecutionError(f"Sandbox template died: {e}")
+        if result is None:
+            raise ExecutionError("Sandbox template exited")
+        if 'error' in result:
+            raise ExecutionError(result['error'])
+        self.runs += 1
+        return result
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+
+class ForkServerPool:
+    """
+    Up to ``CODE_EXECUTION['POOL_SIZE']`` template processes per worker.
+
+    A run borrows an idle template (starting one if none is idle and the
+    pool isn't full, otherwise waiting), which forks a fresh child for the
+    code. Templates are replaced after ``MAX_RUNS_PER_TEMPLATE`` runs or
+    after any protocol error.
+    """
+    def __init__(self):
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._slots = None
+
+    @property
+    def config(self):
+        return settings.CODE_EXECUTION
+
+    def _acquire(self):
+        with self._lock:
+            if self._slots is None:
+                self._slots = threading.BoundedSemaphore(self.config['POOL_SIZE'])
+        if not self._slots.acquire(timeout=self.config['WALL_SECONDS'] * 3):
+            raise ExecutionError("All sandboxes are busy")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return Template(sandbox_config())
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, template, healthy):
+        if healthy and template.runs < self.config['MAX_RUNS_PER_TEMPLATE']:
+            self._idle.put(template)
+        else:
+            template.close()
+        self._slots.release()
+
+    def run(self, code, stdin=''):
+        template = self._acquire()
+        healthy = False
+        try:
+            result = template.run(code, stdin)
+            healthy = True
+            return result
+        finally:
+            self._release(template, healthy)
+
+    def prewarm(self):
+        """Start templates until the pool is full, so first runs don't pay startup."""
+        templates = [self._acquire() for _ in range(self.config['POOL_SIZE'])]
+        for template in templates:
+            self._release(template, True)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+pool = ForkServerPool()
+atexit.register(pool.close)
@@ -0,0 +1,59 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from execution.forkserver import Template, pool, sandbox_config
+from perf.stats import percentile
+
+PROGRAMS = {
+    'hello': "print('Hello, world!')",
+    'input': "name = input('Name? ')\nprint('Hi', name)",
+    'compute': "print(sum(i * i for i in range(100000)))",
+    'imports': "import math, random, collections\nprint(math.sqrt(random.randint(1, 100)) > 0)",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare running code in a freshly spawned sandbox interpreter (cold) "
+        "with the warm fork-server pool, per sample program."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=30, help="Runs per program and mode.")
+
+    def handle(self, *args, **options):
+        config = sandbox_config()
+        pool.prewarm()
+
+        header = f"{'program':<10} {'cold p50':>9} {'cold p95':>9} {'warm p50':>9} {'warm p95':>9} {'saved':>8}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        savings = []
+        for name, code in PROGRAMS.items():
+            stdin = 'Ada\n' if 'input(' in code else ''
+            cold = [self.timed(lambda: self.cold_run(config, code, stdin)) for _ in range(options['runs'])]
+            warm = [self.timed(lambda: pool.run(code, stdin)) for _ in range(options['runs'])]
+            saved = statistics.median(cold) - statistics.median(warm)
+            savings.append(saved)
+            self.stdout.write(
+                f"{name:<10} {statistics.median(cold):>9.1f} {percentile(cold, 95):>9.1f} "
+                f"{statistics.median(warm):>9.1f} {percentile(warm, 95):>9.1f} {saved:>8.1f}"
+            )
+        pool.close()
+        self.stdout.write(self.style.SUCCESS(
+            f"Fork server saves {statistics.mean(savings):.1f} ms of startup per run (times in ms)"
+        ))
+
+    def cold_run(self, config, code, stdin):
+        template = Template(config)
+        try:
+            return template.run(code, stdin)
+        finally:
+            template.close()
+
+    def timed(self, func):
+        start = time.perf_counter()
+        func()
+        return (time.perf_counter() - start) * 1000
@@ -0,0 +1,731 @@
+"""
+Fork-server template process for running student code.
+
+Started by ``execution.forkserver`` as ``python -I sandbox.py <config>``.
+It pre-imports the allowed modules once, then serves run requests read
+from stdin as length-prefixed JSON frames: each run forks a child that
+applies rlimits and restrictions, executes the code and exits. Results go
+back on stdout in the same framing.
+
+With a ``session`` key in the config it instead runs a single program
+interactively for ``execution.sessions`` (see ``serve_session``).
+
+This file must not import Django or anything from the project: it runs in
+a clean, isolated interpreter.
+"""
+import codecs
+import collections
+import ctypes
+import io
+import json
+import os
+import resource
+import selectors
+import signal
+import socket
+import struct
+import sys
+import tempfile
+import time
+import traceback
+
+FRAME = struct.Struct('>I')
+PR_SET_NO_NEW_PRIVS = 38
+PR_SET_SECCOMP = 22
+SECCOMP_MODE_FILTER = 2
+
+# Audit events student code may not trigger (see sys.addaudithook)
+BLOCKED_EVENTS = (
+    'socket.', 'subprocess.', 'os.system', 'os.exec', 'os.posix_spawn', 'os.spawn',
+    'os.fork', 'os.forkpty', 'os.kill', 'os.killpg', 'os.putenv', 'os.unsetenv',
+    'os.remove', 'os.rename', 'os.rmdir', 'os.mkdir', 'os.chmod',
+    'os.chown', 'os.symlink', 'os.link', 'os.truncate', 'os.utime', 'shutil.', 'ctypes.',
+    'code.__new__', 'pty.', 'resource.setrlimit', 'webbrowser.',
+    'gc.get_objects', 'gc.get_referrers', 'gc.get_referents',
+)
+
+# Modules whose functions start processes, open sockets or touch raw memory
+# without raising an audit event (e.g. _posixsubprocess.fork_exec). They are
+# dropped from sys.modules before the code runs and may not be imported.
+BLOCKED_MODULES = (
+    '_posixsubprocess', 'subprocess', 'multiprocessing', '_multiprocessing',
+    '_ctypes', 'ctypes', '_socket', 'socket', '_ssl', 'ssl', 'pty',
+)
+
+# Syscalls refused by the seccomp filter, by machine: execve, execveat,
+# fork, vfork, socket, socketpair, kill and ptrace. clone is allowed only
+# for threads, and clone3 (whose flags a filter can't read) reports ENOSYS
+# so the C library falls back to clone.
+SECCOMP_ARCHES = {
+    'x86_64': {'arch': 0xC000003E, 'deny': (59, 322, 57, 58, 41, 53, 62, 101), 'clone': 56, 'clone3': 435},
+    'aarch64': {'arch': 0xC00000B7, 'deny': (221, 281, 198, 199, 129, 117), 'clone': 220, 'clone3': 435},
+}
+X32_SYSCALL_BIT = 0x40000000
+CLONE_THREAD = 0x00010000
+
+
+def read_frame(stream):
+    header = stream.read(FRAME.size)
+    if len(header) < FRAME.size:
+        return None
+    (length,) = FRAME.unpack(header)
+    return json.loads(stream.read(length))
+
+
+def write_frame(stream, message):
+    data = json.dumps(message).encode('utf-8')
+    stream.write(FRAME.pack(len(data)) + data)
+    stream.flush()
+
+
+class OutputCapture:
+    """
+    Keep a bounded head and tail of a stream fed in chunks.
+
+    At most ``max_bytes`` and ``max_lines`` are kept, half from the start
+    and half from the end; memory stays bounded however much is written.
+    ``text()`` returns the kept output with a marker where the middle was
+    dropped, and whether anything was dropped.
+    """
+    def __init__(self, max_bytes, max_lines):
+        self.head_bytes = max_bytes // 2
+        self.tail_bytes = max_bytes - self.head_bytes
+        self.head_lines = max_lines // 2
+        self.tail_lines = max_lines - self.head_lines
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.head_full = False
+        self.total_bytes = 0
+        self.total_lines = 0
+
+    def write(self, chunk):
+        self.total_bytes += len(chunk)
+        self.total_lines += chunk.count(b'\n')
+        if not self.head_full:
+            piece = chunk[:self.head_bytes - len(self.head)]
+            newlines = self.head.count(b'\n')
+            end = 0
+            while newlines < self.head_lines:
+                end = piece.find(b'\n', end) + 1
+                if not end:
+                    end = len(piece)
+                    break
+                newlines += 1
+            else:
+                piece = piece[:end]
+            self.head += piece
+            chunk = chunk[len(piece):]
+            self.head_full = bool(chunk) or len(self.head) >= self.head_bytes or newlines >= self.head_lines
+        if chunk:
+            self.tail += chunk
+            del self.tail[:-self.tail_bytes]
+
+    def _tail(self):
+        """The tail trimmed to ``tail_lines`` lines."""
+        needed = self.tail_lines + 1 if self.tail.endswith(b'\n') else self.tail_lines
+        position = len(self.tail)
+        for _ in range(needed):
+            position = self.tail.rfind(b'\n', 0, position)
+            if position < 0:
+                return bytes(self.tail)
+        return bytes(self.tail[position + 1:])
+
+    def text(self):
+        """``(text, truncated)``."""
+        tail = self._tail()
+        omitted = self.total_bytes - len(self.head) - len(tail)
+        if not omitted:
+            return (self.head + tail).decode('utf-8', 'replace'), False
+        lines = self.total_lines - self.head.count(b'\n') - tail.count(b'\n')
+        head = self.head.decode('utf-8', 'replace')
+        if head and not head.endswith('\n'):
+            head += '\n'
+        marker = f"... [{omitted} bytes, {lines} lines omitted] ...\n"
+        return head + marker + tail.decode('utf-8', 'replace'), True
+
+
+class _SockFilter(ctypes.Structure):
+    _fields_ = [('code', ctypes.c_ushort), ('jt', ctypes.c_ubyte), ('jf', ctypes.c_ubyte), ('k', ctypes.c_uint32)]
+
+
+class _SockFprog(ctypes.Structure):
+    _fields_ = [('len', ctypes.c_ushort), ('filter', ctypes.POINTER(_SockFilter))]
+
+
+def seccomp_program(machine):
+    """Classic BPF program over ``struct seccomp_data`` for ``machine``."""
+    ld, jeq, jge, jset, ret = 0x20, 0x15, 0x35, 0x45, 0x06
+    allow, kill = 0x7FFF0000, 0x80000000
+    eperm, enosys = 0x00050000 | 1, 0x00050000 | 38
+    table = SECCOMP_ARCHES[machine]
+    program = [
+        (ld, 0, 0, 4),  # seccomp_data.arch
+        (jeq, 1, 0, table['arch']),
+        (ret, 0, 0, kill),
+        (ld, 0, 0, 0),  # seccomp_data.nr
+    ]
+    if machine == 'x86_64':
+        program += [(jge, 0, 1, X32_SYSCALL_BIT), (ret, 0, 0, eperm)]
+    for nr in table['deny']:
+        program += [(jeq, 0, 1, nr), (ret, 0, 0, eperm)]
+    program += [
+        (jeq, 0, 1, table['clone3']),
+        (ret, 0, 0, enosys),
+        (jeq, 0, 3, table['clone']),
+        (ld, 0, 0, 16),  # Low half of seccomp_data.args[0], the flags
+        (jset, 1, 0, CLONE_THREAD),
+        (ret, 0, 0, eperm),
+        (ret, 0, 0, allow),
+    ]
+    return program
+
+
+def _install_seccomp(libc):
+    machine = os.uname().machine
+    if machine not in SECCOMP_ARCHES:
+        raise OSError(f"No seccomp filter for {machine}")
+    program = seccomp_program(machine)
+    filters = (_SockFilter * len(program))(*[_SockFilter(*instruction) for instruction in program])
+    fprog = _SockFprog(len(program), filters)
+    if libc.prctl(PR_SET_SECCOMP, SECCOMP_MODE_FILTER, ctypes.byref(fprog), 0, 0) != 0:
+        raise OSError(ctypes.get_errno(), "Installing the seccomp filter failed")
+
+
+def _restrict(config):
+    """
+    Limits applied in the child just before the student's code runs.
+    Raises if any of them can't be applied; the child must not run the
+    code then.
+    """
+    cpu = config['cpu_seconds']
+    limits = [
+        (resource.RLIMIT_CPU, (cpu, cpu + 1)),
+        (resource.RLIMIT_AS, (config['memory_bytes'], config['memory_bytes'])),
+        (resource.RLIMIT_FSIZE, (0, 0)),
+        (resource.RLIMIT_NOFILE, (32, 32)),
+        (resource.RLIMIT_CORE, (0, 0)),
+        (resource.RLIMIT_NPROC, (0, 0)),
+    ]
+    for limit, value in limits:
+        try:
+            resource.setrlimit(limit, value)
+        except (ValueError, OSError):
+            pass  # e.g. RLIMIT_AS is unsupported on some platforms
+    if config.get('run_as_uid') is not None and os.getuid() == 0:
+        os.setgroups([])
+        os.setgid(config['run_as_uid'])
+        os.setuid(config['run_as_uid'])
+    if os.getuid() == 0 or os.geteuid() == 0:
+        raise PermissionError("Refusing to run code as root")
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0) != 0:
+        raise OSError(ctypes.get_errno(), "Setting no_new_privs failed")
+    _install_seccomp(libc)
+    for name in BLOCKED_MODULES:
+        sys.modules.pop(name, None)
+        globals().pop(name, None)  # This module's own socket and ctypes
+
+    stdlib = os.path.dirname(os.__file__)
+
+    def under_stdlib(path):
+        return isinstance(path, str) and os.path.realpath(path).startswith(stdlib)
+
+    def guard(event, args):
+        if event.startswith(BLOCKED_EVENTS):
+            raise PermissionError(f"{event} is not allowed here")
+        if event == 'import' and args[0].partition('.')[0] in BLOCKED_MODULES:
+            raise PermissionError(f"Importing {args[0]} is not allowed here")
+        if event == 'open':
+            path, mode, flags = args
+            if isinstance(mode, str):
+                writing = any(flag in mode for flag in 'wax+')
+            else:
+                writing = bool(flags & (os.O_WRONLY | os.O_RDWR | os.O_CREAT))
+            # Reading is limited to the standard library, for lazy imports
+            if writing or not under_stdlib(path):
+                raise PermissionError(f"Opening {path!r} is not allowed here")
+        elif event in ('os.listdir', 'os.scandir') and not under_stdlib(args[0]):
+            raise PermissionError(f"Listing {args[0]!r} is not allowed here")
+
+    sys.addaudithook(guard)
+
+
+class PromptingStdin(io.TextIOWrapper):
+    """
+    stdin of an interactive run: every read first tells the session
+    supervisor, through ``control_fd``, that the program wants input.
+    """
+    control_fd = None
+
+    def _announce(self):
+        try:
+            os.write(self.control_fd, b'?')
+        except OSError:
+            pass
+
+    def readline(self, size=-1):
+        self._announce()
+        return super().readline(size)
+
+    def read(self, size=-1):
+        self._announce()
+        return super().read(size)
+
+    def __next__(self):
+        self._announce()
+        return super().__next__()
+
+
+def _child(request, config, stdin_fd, out_w, err_w, keep_fds, control_fd=None):
+    os.setsid()  # Its own process group, so a timeout kills anything it started
+    try:
+        os.dup2(stdin_fd, 0)
+        os.dup2(out_w, 1)
+        os.dup2(err_w, 2)
+        for fd in keep_fds:
+            os.close(fd)
+        if control_fd is None:
+            os.closerange(3, 1024)
+        else:
+            os.closerange(3, control_fd)
+            os.closerange(control_fd + 1, 1024)
+        os.chdir(config['workdir'])
+        if control_fd is None:
+            sys.stdin = io.TextIOWrapper(io.FileIO(0, 'r', closefd=False), encoding='utf-8')
+        else:
+            sys.stdin = PromptingStdin(io.FileIO(0, 'r', closefd=False), encoding='utf-8')
+            sys.stdin.control_fd = control_fd
+        # Interactive runs stream output line by line
+        sys.stdout = io.TextIOWrapper(io.FileIO(1, 'w', closefd=False), encoding='utf-8',
+                                      line_buffering=control_fd is not None)
+        sys.stderr = io.TextIOWrapper(io.FileIO(2, 'w', closefd=False), encoding='utf-8', line_buffering=True)
+        sys.argv = ['main.py']
+        code = compile(request['code'], 'main.py', 'exec')
+    except SyntaxError:
+        traceback.print_exc(limit=0)
+        sys.stderr.flush()
+        os._exit(1)
+    except BaseException:
+        os._exit(70)
+
+    try:
+        _restrict(config)
+    except BaseException as e:
+        os.write(2, f"Sandbox setup failed: {e}\n".encode('utf-8'))
+        os._exit(70)
+    status = 0
+    try:
+        exec(code, {'__name__': '__main__', '__builtins__': __builtins__})
+    except SystemExit as e:
+        status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        if e.code is not None and not isinstance(e.code, int):
+            print(e.code, file=sys.stderr)
+    except BaseException as e:
+        # Drop this module's frame so tracebacks start at main.py, as with a normal run
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        status = 1
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    except BaseException:
+        pass
+    os._exit(status & 0xFF)
+
+
+def run(request, config, keep_fds=()):
+    """Fork a child for one request and collect its output and exit status."""
+    with tempfile.TemporaryFile() as stdin:
+        stdin.write(request.get('stdin', '').encode('utf-8'))
+        stdin.seek(0)
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        started = time.monotonic()
+        pid = os.fork()
+        if pid == 0:
+            _child(request, config, stdin.fileno(), out_w, err_w, (out_r, err_r, *keep_fds))
+    os.close(out_w)
+    os.close(err_w)
+
+    deadline = started + config['wall_seconds']
+    captures = {fd: OutputCapture(config['capture_bytes'], config['capture_lines']) for fd in (out_r, err_r)}
+    reason = None
+    with selectors.DefaultSelector() as selector:
+        for fd in captures:
+            selector.register(fd, selectors.EVENT_READ)
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                reason = 'timeout'
+                break
+            for key, _ in selector.select(remaining):
+                chunk = os.read(key.fd, 65536)
+                if not chunk:
+                    selector.unregister(key.fd)
+                    continue
+                captures[key.fd].write(chunk)
+            if sum(c.total_bytes for c in captures.values()) > config['max_output_bytes']:
+                reason = 'output_limit'
+                break
+    reaped = 0
+    while not reason:
+        # Both pipes are closed, but the program may have closed fds 1 and 2
+        # and carried on: the deadline holds until it is gone
+        reaped, status, usage = os.wait4(pid, os.WNOHANG)
+        if reaped:
+            break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            reason = 'timeout'
+        else:
+            time.sleep(min(remaining, 0.01))
+    if reason:
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            try:
+                os.kill(pid, signal.SIGKILL)  # Killed before setsid() ran
+            except ProcessLookupError:
+                pass
+    if not reaped:
+        _, status, usage = os.wait4(pid, 0)
+    wall = time.monotonic() - started
+    for fd in captures:
+        os.close(fd)
+
+    exit_signal = os.WTERMSIG(status) if os.WIFSIGNALED(status) else None
+    stdout, stdout_truncated = captures[out_r].text()
+    stderr, stderr_truncated = captures[err_r].text()
+    return {
+        'stdout': stdout,
+        'stderr': stderr,
+        'truncated': stdout_truncated or stderr_truncated,
+        'exit_code': os.WEXITSTATUS(status) if os.WIFEXITED(status) else None,
+        'signal': exit_signal,
+        'reason': reason,
+        'wall_ms': round(wall * 1000),
+        'cpu_ms': round((usage.ru_utime + usage.ru_stime) * 1000),
+        'max_rss_kb': usage.ru_maxrss,  # Kilobytes on Linux
+        'output_bytes': sum(c.total_bytes for c in captures.values()),
+    }
+
+
+def serve(config):
+    # Keep the protocol pipes off fds 0 and 1 so children can't reach them
+    requests_in = os.fdopen(os.dup(0), 'rb')
+    results_out = os.fdopen(os.dup(1), 'wb')
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    keep_fds = (requests_in.fileno(), results_out.fileno())
+
+    write_frame(results_out, {'ready': True, 'pid': os.getpid()})
+    while True:
+        request = read_frame(requests_in)
+        if request is None:
+            return
+        try:
+            result = run(request, config, keep_fds)
+        except Exception as e:
+            result = {'error': f"{type(e).__name__}: {e}"}
+        write_frame(results_out, result)
+
+
+class InteractiveSession:
+    """
+    Supervisor side of one interactive run.
+
+    Output is kept as chunks tagged with their character offset, so
+    clients poll from a cursor; only the last ``session_buffer_chars`` are
+    retained. Input lines are queued and handed over one per read, so
+    the program is only reported as waiting when it is blocked on stdin.
+    """
+    def __init__(self, config, pid, stdin_w, out_r, err_r, control_r):
+        self.config = config
+        self.session = config['session']
+        self.pid = pid
+        self.stdin_w = stdin_w
+        self.streams = {out_r: 'stdout', err_r: 'stderr'}
+        self.decoders = {fd: codecs.getincrementaldecoder('utf-8')('replace') for fd in self.streams}
+        self.open_streams = set(self.streams)
+        self.control_r = control_r
+        self.started = self.last_contact = time.monotonic()
+        self.chunks = collections.deque()  # [offset, stream, text]
+        self.first_offset = 0
+        self.end_offset = 0
+        self.output_bytes = 0
+        self.queued = collections.deque()
+        self.inputs = []  # Every line given, so the run can be graded afterwards
+        self.reads_pending = 0
+        self.eof = False
+        self.reason = None
+        self.result = None  # Exit status and usage once the program is gone
+        self.ended_at = None
+        self.exit_reported = False
+        self.closed = False
+
+    @property
+    def state(self):
+        if self.result is not None:
+            return 'exited'
+        return 'waiting_input' if self.reads_pending else 'running'
+
+    def output(self, fd, data):
+        self.output_bytes += len(data)
+        if self.output_bytes > self.config['max_output_bytes']:
+            self.kill('output_limit')
+            return
+        text = self.decoders[fd].decode(data)
+        if not text:
+            return
+        stream = self.streams[fd]
+        if self.chunks and self.chunks[-1][1] == stream:
+            self.chunks[-1][2] += text
+        else:
+            self.chunks.append([self.end_offset, stream, text])
+        self.end_offset += len(text)
+        while self.end_offset - self.chunks[0][0] > self.session['buffer_chars'] and len(self.chunks) > 1:
+            self.chunks.popleft()
+        if self.end_offset - self.chunks[0][0] > self.session['buffer_chars']:
+            chunk = self.chunks[0]
+            cut = self.end_offset - chunk[0] - self.session['buffer_chars']
+            chunk[0], chunk[2] = chunk[0] + cut, chunk[2][cut:]
+        self.first_offset = self.chunks[0][0]
+
+    def read_requested(self, count):
+        if self.stdin_w is not None:  # Otherwise the read just got end of file
+            self.reads_pending += count
+            self.feed()
+
+    def give(self, line):
+        if len(self.inputs) >= self.session['max_inputs']:
+            raise ValueError("Too many input lines")
+        self.inputs.append(line)
+        self.queued.append(line + '\n')
+        self.feed()
+
+    def close_stdin(self):
+        self.eof = True
+        self.feed()
+
+    def feed(self):
+        while self.stdin_w is not None:
+            if self.queued and self.reads_pending:
+                self.reads_pending -= 1
+                try:
+                    os.write(self.stdin_w, self.queued.popleft().encode('utf-8'))
+                except (BlockingIOError, BrokenPipeError):
+                    pass
+            elif self.eof and not self.queued:
+                # Reads from here on see end of file
+                os.close(self.stdin_w)
+                self.stdin_w = None
+                self.reads_pending = 0
+            else:
+                return
+
+    def kill(self, reason):
+        if self.result is not None:
+            return
+        self.reason = self.reason or reason
+        try:
+            os.killpg(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            try:
+                os.kill(self.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def check(self, now):
+        """Enforce the lifetime and idle limits and notice when the program has ended."""
+        if self.result is None:
+            if now - self.started > self.session['seconds']:
+                self.kill('timeout')
+            elif now - self.last_contact > self.session['idle_seconds']:
+                self.kill('timeout')
+            if self.open_streams:
+                return  # Collect all output before reporting the end
+            pid, status, usage = os.wait4(self.pid, os.WNOHANG)
+            if pid:
+                self.ended_at = now
+                self.reads_pending = 0
+                self.result = {
+                    'exit_code': os.WEXITSTATUS(status) if os.WIFEXITED(status) else None,
+                    'signal': os.WTERMSIG(status) if os.WIFSIGNALED(status) else None,
+                    'reason': self.reason,
+                    'wall_ms': round((now - self.started) * 1000),
+                    'cpu_ms': round((usage.ru_utime + usage.ru_stime) * 1000),
+                    'max_rss_kb': usage.ru_maxrss,
+                }
+
+    def finished(self, now):
+        if self.closed:
+            return True
+        if self.result is None:
+            return False
+        linger = self.session['linger_seconds']
+        # Keep the final output around for a client that hasn't collected it yet
+        return (self.exit_reported and now - self.ended_at > linger) or now - self.last_contact > linger * 6
+
+    def has_news(self, cursor):
+        return cursor < self.end_offset or self.state != 'running'
+
+    def snapshot(self, cursor):
+        cursor = max(0, min(cursor, self.end_offset))
+        events = [
+            [stream, text[max(0, cursor - offset):]]
+            for offset, stream, text in self.chunks
+            if offset + len(text) > cursor
+        ]
+        reply = {
+            'state': self.state,
+            'events': events,
+            'cursor': self.end_offset,
+            'skipped': max(0, self.first_offset - cursor),  # Characters dropped before the client saw them
+        }
+        if self.result is not None:
+            reply.update(self.result, inputs=self.inputs, output_bytes=self.output_bytes,
+                         final=not self.exit_reported)
+            self.exit_reported = True
+        return reply
+
+
+def _handle_client(session, conn, pending, now):
+    """Serve one request from the web tier; polls that must wait go to ``pending``."""
+    conn.settimeout(2)
+    stream = conn.makefile('rwb')
+    try:
+        message = read_frame(stream)
+    except (OSError, ValueError):
+        message = None
+    if not message:
+        stream.close()
+        conn.close()
+        return
+    session.last_contact = now
+    op = message.get('op')
+    try:
+        if op == 'input':
+            if session.result is not None:
+                raise ValueError("The program has already finished")
+            session.give(str(message.get('line', '')))
+        elif op == 'eof':
+            session.close_stdin()
+        elif op == 'close':
+            session.kill('closed')
+            session.closed = True
+        elif op != 'poll':
+            raise ValueError(f"Unknown operation {op!r}")
+    except ValueError as e:
+        write_frame(stream, {'error': str(e)})
+        stream.close()
+        conn.close()
+        return
+    wait = min(float(message.get('wait', 0)), session.session['poll_seconds'])
+    pending.append((conn, stream, int(message.get('cursor', 0)), now + wait))
+
+
+def serve_session(config):
+    """
+    Run one program interactively and serve it on a Unix socket.
+
+    The code arrives as the first frame on stdin. Clients (any web
+    worker) connect to ``config['session']['socket']``, send one request
+    frame and get one reply frame. The process exits once the program
+    has ended and its output was collected, or after the idle/lifetime
+    limits.
+    """
+    request = read_frame(sys.stdin.buffer)
+    results_out = os.fdopen(os.dup(1), 'wb')
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+
+    path = config['session']['socket']
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    os.chmod(path, 0o600)
+    listener.listen(16)
+
+    in_r, in_w = os.pipe()
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    control_r, control_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        _child(request, config, in_r, out_w, err_w,
+               (in_w, out_r, err_r, control_r, listener.fileno(), results_out.fileno()), control_fd=control_w)
+    for fd in (in_r, out_w, err_w, control_w):
+        os.close(fd)
+    os.set_blocking(in_w, False)
+    session = InteractiveSession(config, pid, in_w, out_r, err_r, control_r)
+    write_frame(results_out, {'ready': True, 'pid': os.getpid()})
+    results_out.close()
+
+    pending = []
+    selector = selectors.DefaultSelector()
+    selector.register(listener, selectors.EVENT_READ)
+    for fd in (out_r, err_r, control_r):
+        selector.register(fd, selectors.EVENT_READ)
+    try:
+        while True:
+            now = time.monotonic()
+            timeout = min([0.1] + [max(0.0, deadline - now) for *_, deadline in pending])
+            for key, _ in selector.select(timeout):
+                now = time.monotonic()
+                if key.fileobj is listener:
+                    conn, _ = listener.accept()
+                    _handle_client(session, conn, pending, now)
+                    continue
+                data = os.read(key.fd, 65536)
+                if not data:
+                    selector.unregister(key.fd)
+                    os.close(key.fd)
+                    session.open_streams.discard(key.fd)
+                elif key.fd == control_r:
+                    session.read_requested(data.count(b'?'))
+                else:
+                    session.output(key.fd, data)
+            now = time.monotonic()
+            session.check(now)
+            still_waiting = []
+            for conn, stream, cursor, deadline in pending:
+                if session.has_news(cursor) or now >= deadline or session.closed:
+                    try:
+                        write_frame(stream, session.snapshot(cursor))
+                    except OSError:
+                        pass
+                    stream.close()
+                    conn.close()
+                else:
+                    still_waiting.append((conn, stream, cursor, deadline))
+            pending = still_waiting
+            if session.finished(now) and not pending:
+                return
+    finally:
+        session.kill('closed')
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def main():
+    config = json.loads(sys.argv[1])
+    if os.geteuid() == 0 and config.get('run_as_uid') is None:
+        sys.exit("Refusing to run code as root without run_as_uid")
+    for module in config['preload']:
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    if 'session' in config:
+        serve_session(config)
+    else:
+        serve(config)
+
+
+if __name__ == '__main__':
+    main()
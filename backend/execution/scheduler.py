@@ -0,0 +1,219 @@
+import itertools
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+from perf.metrics import Counter, Gauge, Histogram
+from .forkserver import ExecutionError
+
+QUEUE_DEPTH = Gauge(
+    'pywhiz_execution_queue_depth',
+    'Code runs waiting for an execution slot in this worker.',
+)
+IN_FLIGHT = Gauge(
+    'pywhiz_execution_in_flight',
+    'Code runs holding an execution slot in this worker.',
+)
+DECISIONS = Counter(
+    'pywhiz_execution_scheduler_decisions_total',
+    'Execution scheduler decisions: started at once, queued, or turned away and why.',
+    labelnames=('decision',),
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    'pywhiz_execution_queue_wait_seconds',
+    'Time code runs waited for an execution slot.',
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0),
+)
+
+
+class ExecutionBusy(ExecutionError):
+    """No slot for this run; ``position`` is where it stood in the queue."""
+    def __init__(self, position, retry_after, per_user=False):
+        super().__init__(f"Busy, queued at position {position}")
+        self.position = position
+        self.retry_after = retry_after
+        self.per_user = per_user  # The user's own limit, not the worker's
+
+
+class Ticket:
+    __slots__ = ('user', 'weight', 'start', 'seq', 'charged', 'granted')
+
+    def __init__(self, user, weight, start, seq):
+        self.user = user
+        self.weight = weight
+        self.start = start
+        self.seq = seq
+        self.charged = 0.0
+        self.granted = False
+
+
+class FairScheduler:
+    """
+    Admission to code execution, fair across users.
+
+    At most ``SLOTS`` runs execute at once in this worker, and at most
+    ``PER_USER`` runs of one user execute at once across all workers: the
+    slots and queue are per process, but each started run is also counted
+    in the shared cache, and a run that would exceed the user's count
+    there is turned away. Waiting runs are served by start-time fair
+    queuing: each user's runs are tagged with a virtual start time that
+    advances by the run's wall time divided by the user's weight, and the
+    smallest tag goes next. A student re-running a slow loop therefore
+    falls behind classmates who have run little, instead of holding every
+    slot. Runs that can't be queued or wait longer than ``QUEUE_SECONDS``
+    raise ``ExecutionBusy``.
+
+    The cross-worker count needs a shared cache backend; with the default
+    per-process cache it only adds up this worker's runs.
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._running = {}  # user -> runs holding a slot
+        self._finish = {}  # user -> virtual time their next run may start
+        self._virtual = 0.0
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._run_seconds = 1.0  # Moving average, for estimates
+
+    @property
+    def config(self):
+        return settings.CODE_EXECUTION['SCHEDULER']
+
+    def _order(self, ticket):
+        return ticket.start, ticket.seq
+
+    def position(self, ticket):
+        return sorted(self._waiting, key=self._order).index(ticket) + 1
+
+    def _retry_after(self, position):
+        return max(1, math.ceil(position * self._run_seconds / self.config['SLOTS']))
+
+    def _publish(self):
+        QUEUE_DEPTH.set(len(self._waiting))
+        IN_FLIGHT.set(self._in_flight)
+
+    def _dispatch(self):
+        config = self.config
+        granted = False
+        while self._in_flight < config['SLOTS']:
+            eligible = [t for t in self._waiting if self._running.get(t.user, 0) < config['PER_USER']]
+            if not eligible:
+                break
+            ticket = min(eligible, key=self._order)
+            self._waiting.remove(ticket)
+            ticket.granted = True
+            ticket.charged = self._run_seconds
+            self._running[ticket.user] = self._running.get(ticket.user, 0) + 1
+            self._in_flight += 1
+            self._virtual = max(self._virtual, ticket.start)
+            self._finish[ticket.user] = max(self._finish.get(ticket.user, 0.0), ticket.start) + (
+                ticket.charged / ticket.weight
+            )
+            granted = True
+        if granted:
+            self._cond.notify_all()
+        self._publish()
+
+    def _reject(self, decision, position, per_user=False):
+        DECISIONS.inc(decision=decision)
+        raise ExecutionBusy(position, self._retry_after(position), per_user)
+
+    def _enter(self, user, weight):
+        config = self.config
+        with self._cond:
+            queued = sum(1 for t in self._waiting if t.user == user)
+            if self._running.get(user, 0) + queued >= config['PER_USER'] + config['PER_USER_QUEUED']:
+                mine = [self.position(t) for t in self._waiting if t.user == user]
+                self._reject('rejected_user', min(mine) if mine else 1, per_user=True)
+            if len(self._waiting) >= config['MAX_QUEUE']:
+                self._reject('rejected_full', len(self._waiting) + 1)
+
+            ticket = Ticket(user, weight, max(self._virtual, self._finish.get(user, 0.0)), next(self._seq))
+            self._waiting.append(ticket)
+            self._dispatch()
+            if ticket.granted:
+                return ticket, False
+
+            DECISIONS.inc(decision='queued')
+            queued_at = time.monotonic()
+            deadline = queued_at + config['QUEUE_SECONDS']
+            while not ticket.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    position = self.position(ticket)
+                    self._waiting.remove(ticket)
+                    self._publish()
+                    QUEUE_WAIT_SECONDS.observe(time.monotonic() - queued_at)
+                    self._reject('timed_out', position)
+                self._cond.wait(remaining)
+            QUEUE_WAIT_SECONDS.observe(time.monotonic() - queued_at)
+            return ticket, True
+
+    def _leave(self, ticket, seconds, ran=True):
+        with self._cond:
+            user = ticket.user
+            self._running[user] -= 1
+            if not self._running[user]:
+                del self._running[user]
+            self._in_flight -= 1
+            # Charge what the run actually took instead of the estimate
+            self._finish[user] += (seconds - ticket.charged) / ticket.weight
+            if ran:
+                self._run_seconds = 0.9 * self._run_seconds + 0.1 * seconds
+            if (user not in self._running and self._finish[user] <= self._virtual
+                    and not any(t.user == user for t in self._waiting)):
+                del self._finish[user]  # Idle users start from the current virtual time anyway
+            self._dispatch()
+
+    def _claim_key(self, user):
+        return f"execution:running:{user}"
+
+    def _claim(self, user):
+        """Count a run against ``user``'s limit in the shared cache; False if over it."""
+        key = self._claim_key(user)
+        # The expiry frees the count of a worker that died mid-run
+        cache.add(key, 0, self.config['CLAIM_SECONDS'])
+        try:
+            running = cache.incr(key)
+        except ValueError:  # Expired since add()
+            cache.add(key, 1, self.config['CLAIM_SECONDS'])
+            running = 1
+        if running > self.config['PER_USER']:
+            self._release_claim(user)
+            return False
+        return True
+
+    def _release_claim(self, user):
+        try:
+            cache.decr(self._claim_key(user))
+        except ValueError:
+            pass
+
+    @contextmanager
+    def slot(self, user, weight=1.0):
+        """Hold an execution slot for ``user`` (any hashable id) around one run."""
+        ticket, queued = self._enter(user, weight)
+        if not self._claim(user):
+            # Running in another worker; refunded, as nothing ran
+            self._leave(ticket, 0.0, ran=False)
+            self._reject('rejected_user', 1, per_user=True)
+        if not queued:
+            DECISIONS.inc(decision='started')
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release_claim(user)
+            self._leave(ticket, time.monotonic() - started)
+
+    def weight(self, user):
+        """Share of execution time for ``user``: staff demos in class get more."""
+        return self.config['STAFF_WEIGHT'] if user.is_staff else 1.0
+
+
+scheduler = FairScheduler()
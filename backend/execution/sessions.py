@@ -0,0 +1,122 @@
+import os
+import socket
+import uuid
+
+from django.conf import settings
+
+from .forkserver import ExecutionError, sandbox_config, start_template
+from .sandbox import read_frame, write_frame
+
+
+class SessionNotFound(ExecutionError):
+    pass
+
+
+class SessionLimitReached(ExecutionError):
+    pass
+
+
+class SessionRequestError(ExecutionError):
+    """The session refused the request, e.g. input after the program ended."""
+
+
+class SessionsUnavailable(ExecutionError):
+    pass
+
+
+def _config():
+    return settings.CODE_EXECUTION['SESSIONS']
+
+
+def available():
+    """
+    Whether interactive runs are enabled. They run on this host, so only
+    with the fork-server backend and with children dropped to an
+    unprivileged ``RUN_AS_UID``.
+    """
+    config = settings.CODE_EXECUTION
+    return config['BACKEND'] == 'forkserver' and config['RUN_AS_UID'] is not None
+
+
+def _directory():
+    directory = _config()['SOCKET_DIR']
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    return directory
+
+
+def _socket_path(user_id, session_id):
+    # The owner is part of the name: a session can only be reached by its user
+    return os.path.join(_directory(), f"{user_id}-{session_id}.sock")
+
+
+def _send(path, message, timeout):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(timeout)
+            conn.connect(path)
+            with conn.makefile('rwb') as stream:
+                write_frame(stream, message)
+                reply = read_frame(stream)
+    except (FileNotFoundError, ConnectionRefusedError):
+        try:
+            os.unlink(path)  # Left behind by a supervisor that died
+        except FileNotFoundError:
+            pass
+        raise SessionNotFound("No such session")
+    except OSError as e:
+        raise ExecutionError(f"Session did not answer: {e}")
+    if reply is None:
+        raise SessionNotFound("Session has ended")
+    if 'error' in reply:
+        raise SessionRequestError(reply['error'])
+    return reply
+
+
+def send(user_id, session_id, message):
+    """
+    Send one request to a session and return its reply: a state
+    (``running``, ``waiting_input`` or ``exited``), output ``events``
+    after ``message['cursor']`` and the new cursor. Polls may be held
+    open for up to ``message['wait']`` seconds.
+    """
+    wait = min(float(message.get('wait', 0)), _config()['POLL_SECONDS'])
+    return _send(_socket_path(user_id, session_id), dict(message, wait=wait), wait + 5)
+
+
+def close_user_sessions(user_id):
+    directory = _directory()
+    for name in os.listdir(directory):
+        if name.startswith(f"{user_id}-") and name.endswith('.sock'):
+            try:
+                _send(os.path.join(directory, name), {'op': 'close'}, 5)
+            except ExecutionError:
+                pass
+
+
+def start(user_id, code):
+    """
+    Start running ``code`` interactively for ``user_id`` and return the
+    session id. A user has one session at a time; starting another closes
+    the previous one.
+    """
+    if not available():
+        raise SessionsUnavailable("Interactive runs are not enabled")
+    close_user_sessions(user_id)
+    if len(os.listdir(_directory())) >= _config()['MAX_SESSIONS']:
+        raise SessionLimitReached("Too many interactive sessions running")
+
+    session_id = str(uuid.uuid4())
+    config = _config()
+    process = start_template(dict(sandbox_config(), session={
+        'socket': _socket_path(user_id, session_id),
+        'seconds': config['SECONDS'],
+        'idle_seconds': config['IDLE_SECONDS'],
+        'poll_seconds': config['POLL_SECONDS'],
+        'linger_seconds': config['LINGER_SECONDS'],
+        'buffer_chars': config['BUFFER_CHARS'],
+        'max_inputs': config['MAX_INPUTS'],
+    }), {'code': code})
+    # The supervisor runs on its own; subprocess reaps it once it exits
+    process.stdin.close()
+    process.stdout.close()
+    return session_id
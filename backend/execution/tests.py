@@ -0,0 +1,287 @@
+import os
+import signal
+import sys
+import threading
+import time
+import unittest
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from . import sandbox
+from .sandbox import OutputCapture
+from .backends import ExecutionResult, piston_reason
+from .forkserver import ExecutionError, Template, sandbox_config
+from .scheduler import ExecutionBusy, FairScheduler
+
+# The uid children drop to when the tests run as root
+NOBODY = 65534
+
+
+@unittest.skipUnless(sys.platform == 'linux', "The sandbox needs Linux")
+class SandboxTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.template = Template(cls.template_config())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.template.close()
+        super().tearDownClass()
+
+    @staticmethod
+    def template_config():
+        return dict(sandbox_config(), run_as_uid=NOBODY if os.geteuid() == 0 else None)
+
+    def run_code(self, code, stdin=''):
+        return self.template.run(code, stdin)
+
+    def assertRefused(self, code):
+        result = self.run_code(code)
+        self.assertEqual(result['exit_code'], 1, result)
+        self.assertIn("Error", result['stderr'])
+
+    def test_runs_code(self):
+        result = self.run_code("print(input().upper())", "hello\n")
+        self.assertEqual((result['exit_code'], result['stdout']), (0, "HELLO\n"))
+
+    def test_deadline_holds_after_output_is_closed(self):
+        template = Template(dict(self.template_config(), wall_seconds=2))
+        try:
+            started = time.monotonic()
+            result = template.run("import os, time; os.close(1); os.close(2); time.sleep(60)", '')
+        finally:
+            template.close()
+        self.assertEqual(result['reason'], 'timeout')
+        self.assertLess(time.monotonic() - started, 10)
+
+    def test_never_runs_as_root(self):
+        self.assertNotEqual(self.run_code("import os; print(os.geteuid())")['stdout'], "0\n")
+
+    @unittest.skipUnless(os.geteuid() == 0, "Only root can start templates as root")
+    def test_refuses_root_without_run_as_uid(self):
+        with self.assertRaises(ExecutionError):
+            Template(dict(sandbox_config(), run_as_uid=None))
+
+    def test_unaudited_modules_cannot_be_imported(self):
+        for module in ('_posixsubprocess', 'ctypes', '_socket', 'subprocess'):
+            with self.subTest(module=module):
+                self.assertRefused(f"import {module}")
+
+    def test_sandbox_globals_are_out_of_reach(self):
+        result = self.run_code(
+            "import sys\n"
+            "print(sorted(n for n in ('ctypes', 'socket', '_posixsubprocess') if n in sys.modules"
+            " or n in sys._getframe(1).f_globals))"
+        )
+        self.assertEqual(result['stdout'], "[]\n")
+
+    def test_processes_and_sockets_are_refused(self):
+        for code in ("import os; os.fork()", "import os; os.system('true')", "import gc; gc.get_objects()"):
+            with self.subTest(code=code):
+                self.assertRefused(code)
+
+    def test_seccomp_filter_holds_without_the_audit_hook(self):
+        # What code that got past the audit hook would meet: subprocess
+        # goes through _posixsubprocess.fork_exec
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            try:
+                import ctypes, socket, subprocess
+                libc = ctypes.CDLL(None, use_errno=True)
+                libc.prctl(sandbox.PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0)
+                sandbox._install_seccomp(libc)
+                refused = 0
+                for attempt in (socket.socket, os.fork, lambda: subprocess.run(['true'])):
+                    try:
+                        attempt()
+                    except OSError:
+                        refused += 1
+                os.write(write_fd, str(refused).encode())
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_fd) as result:
+            self.assertEqual(result.read(), "3")
+
+
+class OutputCaptureTests(SimpleTestCase):
+    def capture(self, chunks, max_bytes=100, max_lines=10):
+        output = OutputCapture(max_bytes, max_lines)
+        for chunk in chunks:
+            output.write(chunk.encode('utf-8'))
+        return output.text()
+
+    def test_short_output_is_kept_whole(self):
+        self.assertEqual(self.capture(["one\n", "two\n"]), ("one\ntwo\n", False))
+        self.assertEqual(self.capture([]), ("", False))
+
+    def test_byte_limit_keeps_head_and_tail(self):
+        text, truncated = self.capture(["a" * 60, "b" * 60, "c" * 60])
+        self.assertTrue(truncated)
+        self.assertEqual(text, "a" * 50 + "\n... [80 bytes, 0 lines omitted] ...\n" + "c" * 50)
+
+    def test_line_limit_keeps_first_and_last_lines(self):
+        lines = [f"{i}\n" for i in range(100)]
+        text, truncated = self.capture(lines, max_bytes=10000)
+        self.assertTrue(truncated)
+        kept = text.splitlines()
+        self.assertEqual(kept[:5], ["0", "1", "2", "3", "4"])
+        self.assertEqual(kept[5], "... [265 bytes, 90 lines omitted] ...")
+        self.assertEqual(kept[6:], ["95", "96", "97", "98", "99"])
+
+    def test_chunk_boundaries_do_not_matter(self):
+        output = "".join(f"line {i}\n" for i in range(500))
+        whole = self.capture([output], max_bytes=300, max_lines=20)
+        by_char = self.capture(list(output), max_bytes=300, max_lines=20)
+        self.assertEqual(whole, by_char)
+
+    def test_memory_stays_bounded(self):
+        output = OutputCapture(100, 10)
+        for _ in range(10000):
+            output.write(b"x" * 1000 + b"\n")
+        self.assertLessEqual(len(output.head) + len(output.tail), 100)
+        self.assertEqual((output.total_bytes, output.total_lines), (10010000, 10000))
+
+
+class OutcomeTests(SimpleTestCase):
+    def outcome(self, **run):
+        return ExecutionResult(
+            stdout=run.get('stdout', ''), stderr=run.get('stderr', ''), exit_code=run.get('code'),
+            signal=run.get('signal'), reason=piston_reason(run),
+        ).outcome
+
+    def test_clean_and_failed_runs(self):
+        self.assertEqual(self.outcome(code=0, status=None), 'ok')
+        self.assertEqual(self.outcome(code=1, status='RE', stderr="NameError: x"), 'error')
+
+    def test_piston_timeout_is_not_oom(self):
+        self.assertEqual(self.outcome(signal='SIGKILL', status='TO', message="Time limit exceeded"), 'timeout')
+        # Older Piston: no status, killed at its run timeout
+        self.assertEqual(self.outcome(signal='SIGKILL', wall_time=3004), 'timeout')
+
+    def test_memory(self):
+        self.assertEqual(self.outcome(code=1, stderr="Traceback ...\nMemoryError\n"), 'oom')
+        self.assertEqual(self.outcome(signal='SIGKILL', status='SG', message="Memory limit exceeded"), 'oom')
+
+    def test_other_kills_are_signals(self):
+        self.assertEqual(self.outcome(signal='SIGKILL', status='SG', wall_time=120), 'signal')
+        self.assertEqual(ExecutionResult(signal=signal.SIGKILL).outcome, 'signal')
+        self.assertEqual(ExecutionResult(signal=signal.SIGXCPU).outcome, 'cpu_limit')
+
+    def test_output_limits(self):
+        self.assertEqual(self.outcome(signal='SIGKILL', status='OL'), 'output_limit')
+        self.assertEqual(ExecutionResult(signal=signal.SIGKILL, reason='output_limit').outcome, 'output_limit')
+
+
+def scheduler_settings(**config):
+    return override_settings(CODE_EXECUTION=dict(
+        settings.CODE_EXECUTION, SCHEDULER=dict(settings.CODE_EXECUTION['SCHEDULER'], **config),
+    ))
+
+
+@scheduler_settings(SLOTS=1, PER_USER=1, PER_USER_QUEUED=2, MAX_QUEUE=2, QUEUE_SECONDS=5)
+class FairSchedulerTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.scheduler = FairScheduler()
+        self.order = []
+        self.threads = []
+
+    def tearDown(self):
+        self.join()
+
+    def join(self):
+        for thread in self.threads:
+            thread.join(5)
+
+    def hold(self, user, scheduler=None):
+        """Take a slot for ``user`` and keep it until the returned event is set."""
+        held, release = threading.Event(), threading.Event()
+
+        def run():
+            with (scheduler or self.scheduler).slot(user):
+                held.set()
+                release.wait(5)
+
+        self.start(run)
+        self.assertTrue(held.wait(5))
+        return release
+
+    def queue(self, user):
+        waiting = len(self.scheduler._waiting)
+
+        def run():
+            try:
+                with self.scheduler.slot(user):
+                    self.order.append(user)
+            except ExecutionBusy:
+                self.order.append(f"busy {user}")
+
+        self.start(run)
+        while len(self.scheduler._waiting) == waiting:
+            time.sleep(0.001)
+
+    def start(self, target):
+        thread = threading.Thread(target=target)
+        thread.start()
+        self.threads.append(thread)
+
+    def test_users_who_ran_less_go_first(self):
+        release = self.hold('heavy')
+        self.queue('heavy')
+        self.queue('light')
+        release.set()
+        self.join()
+        self.assertEqual(self.order, ['light', 'heavy'])
+
+    def test_user_limit(self):
+        release = self.hold('student')
+        self.queue('student')
+        self.queue('student')
+        with self.assertRaises(ExecutionBusy) as busy:
+            with self.scheduler.slot('student'):
+                pass
+        self.assertTrue(busy.exception.per_user)
+        release.set()
+
+    def test_full_queue(self):
+        release = self.hold('a')
+        self.queue('b')
+        self.queue('c')
+        with self.assertRaises(ExecutionBusy) as busy:
+            with self.scheduler.slot('d'):
+                pass
+        self.assertFalse(busy.exception.per_user)
+        self.assertEqual(busy.exception.position, 3)
+        self.assertGreaterEqual(busy.exception.retry_after, 1)
+        release.set()
+
+    @scheduler_settings(SLOTS=1, PER_USER=1, PER_USER_QUEUED=1, MAX_QUEUE=2, QUEUE_SECONDS=0.05)
+    def test_queue_timeout(self):
+        release = self.hold('a')
+        started = time.monotonic()
+        with self.assertRaises(ExecutionBusy) as busy:
+            with self.scheduler.slot('b'):
+                pass
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        self.assertEqual(busy.exception.position, 1)
+        self.assertEqual(self.scheduler._waiting, [])
+        release.set()
+
+    def test_user_limit_holds_across_workers(self):
+        other_worker = FairScheduler()
+        release = self.hold('student', other_worker)
+        with self.assertRaises(ExecutionBusy) as busy:
+            with self.scheduler.slot('student'):
+                pass
+        self.assertTrue(busy.exception.per_user)
+        release.set()
+        self.join()
+        with self.scheduler.slot('student'):
+            pass
+        self.assertEqual(self.scheduler._in_flight, 0)
@@ -0,0 +1,27 @@
+import logging
+
+from django.conf import settings
+
+from .models import ExecutionRecord
+
+logger = logging.getLogger(__name__)
+
+
+def record_execution(result, user, question_id=None, exercise_id=None):
+    """Store the resource usage of one run. Never fails the submission."""
+    try:
+        return ExecutionRecord.objects.create(
+            user=user,
+            question_id=question_id,
+            exercise_id=exercise_id,
+            backend=settings.CODE_EXECUTION['BACKEND'],
+            outcome=result.outcome,
+            exit_code=result.exit_code,
+            wall_ms=result.wall_ms,
+            cpu_ms=result.cpu_ms,
+            max_rss_kb=result.max_rss_kb,
+            output_bytes=result.output_bytes,
+        )
+    except Exception as e:
+        logger.error(f"Could not record execution for user {user.pk}: {e}")
+        return None
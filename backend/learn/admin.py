@@ -1,32 +1,71 @@
 from django.contrib import admin
-from .models import Milestone, LearnContent, CodeQuestion, MCQQuestion
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from .models import (
+    Milestone, LearnContent, CodeQuestion, MCQQuestion,
+    UserCodeAnswer, UserMCQAnswer, ExecutionRecord, SubmissionAttempt,
+)
+from .archive import load_code
+from .pagination import EstimatedCountPaginator
+
+
+def child_count(model):
+    # A correlated subquery per child table; joining all three would multiply rows
+    counts = (model.objects.filter(milestone=OuterRef('pk'))
+              .order_by().values('milestone').annotate(n=Count('pk')).values('n'))
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
 
 @admin.register(Milestone)
 class MilestoneAdmin(admin.ModelAdmin):
-    list_display = ('order', 'title', 'is_active', 'created_at', 'updated_at')
+    list_display = ('order', 'title', 'is_active', 'video_count', 'code_question_count',
+                    'mcq_count', 'created_at', 'updated_at')
     list_filter = ('is_active',)
     search_fields = ('title', 'description')
     ordering = ('order',)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            video_count=child_count(LearnContent),
+            code_question_count=child_count(CodeQuestion),
+            mcq_count=child_count(MCQQuestion),
+        )
+
+    @admin.display(description='Videos', ordering='video_count')
+    def video_count(self, obj):
+        return obj.video_count
+
+    @admin.display(description='Code questions', ordering='code_question_count')
+    def code_question_count(self, obj):
+        return obj.code_question_count
+
+    @admin.display(description='MCQs', ordering='mcq_count')
+    def mcq_count(self, obj):
+        return obj.mcq_count
+
 @admin.register(LearnContent)
 class LearnContentAdmin(admin.ModelAdmin):
     list_display = ('milestone', 'order', 'title', 'video_url', 'is_additional', 'created_at')
     list_editable = ('order', 'is_additional')  # Allow quick editing of order
-    search_fields = ('title', 'transcript', 'milestone__title')
+    list_select_related = ('milestone',)
+    # transcript__match uses the FULLTEXT index on MySQL (see learn.lookups)
+    search_fields = ('title', 'transcript__match', 'milestone__title')
     list_filter = ('milestone', 'is_additional', 'created_at')
     ordering = ('milestone__order', 'order')
 
 @admin.register(CodeQuestion)
 class CodeQuestionAdmin(admin.ModelAdmin):
-    list_display = ("milestone", "question", "video_url", "video_url_2", "audio_url", "created_at")
-    search_fields = ("question", "milestone__title")
+    list_display = ("milestone", "order", "question", "video_url", "video_url_2", "audio_url", "created_at")
+    list_select_related = ("milestone",)
+    search_fields = ("question__match", "milestone__title")
     list_filter = ("milestone",)
+    ordering = ("milestone__order", "order")
 
 @admin.register(MCQQuestion)
 class MCQQuestionAdmin(admin.ModelAdmin):
     list_display = ('milestone', 'order', 'question_text', 'correct_answer', 'audio_url', 'created_at')
     list_filter = ('milestone',)
-    search_fields = ('question_text',)
+    list_select_related = ('milestone',)
+    search_fields = ('question_text__match',)
     ordering = ('milestone__order', 'order')
     readonly_fields = ('created_at', 'updated_at')
     fieldsets = (
@@ -37,4 +76,50 @@ class MCQQuestionAdmin(admin.ModelAdmin):
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
-    )
\ No newline at end of file
+    )
+
+class AnswerAdmin(admin.ModelAdmin):
+    # These tables grow with every submission: no COUNT(*) over the whole
+    # table, no dropdowns of every user and question
+    list_display = ('user', 'question', 'is_correct', 'created_at')
+    list_filter = ('is_correct',)
+    list_select_related = ('user', 'question__milestone')
+    raw_id_fields = ('user', 'question')
+    search_fields = ('=user__email',)
+    readonly_fields = ('created_at', 'updated_at')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+@admin.register(UserCodeAnswer)
+class UserCodeAnswerAdmin(AnswerAdmin):
+    list_display = ('user', 'question', 'is_correct', 'attempts', 'created_at')
+
+@admin.register(UserMCQAnswer)
+class UserMCQAnswerAdmin(AnswerAdmin):
+    list_display = ('user', 'question', 'selected_option', 'is_correct', 'created_at')
+
+@admin.register(ExecutionRecord)
+class ExecutionRecordAdmin(admin.ModelAdmin):
+    list_display = ('user', 'question', 'exercise', 'backend', 'outcome', 'cpu_ms', 'wall_ms',
+                    'max_rss_kb', 'output_bytes', 'created_at')
+    list_filter = ('outcome', 'backend')
+    list_select_related = ('user', 'question__milestone', 'exercise')
+    raw_id_fields = ('user', 'question', 'exercise')
+    search_fields = ('=user__email',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+@admin.register(SubmissionAttempt)
+class SubmissionAttemptAdmin(admin.ModelAdmin):
+    list_display = ('user', 'question', 'exercise', 'is_correct', 'created_at')
+    list_filter = ('is_correct',)
+    list_select_related = ('user', 'question__milestone', 'exercise')
+    raw_id_fields = ('user', 'question', 'exercise', 'blob')
+    search_fields = ('=user__email',)
+    readonly_fields = ('code', 'created_at')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    @admin.display(description='Code')
+    def code(self, obj):
+        return load_code(obj.blob)
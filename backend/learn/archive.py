@@ -0,0 +1,54 @@
+import hashlib
+import logging
+import zlib
+
+from django.db import transaction
+
+from .models import CodeBlob, SubmissionAttempt
+
+logger = logging.getLogger(__name__)
+
+# Programs are small and written once, read rarely: spend the CPU on the ratio
+COMPRESSION_LEVEL = 9
+
+
+def store_code(code):
+    """Store ``code`` unless an identical program is already stored; returns its digest."""
+    encoded = code.encode('utf-8')
+    digest = hashlib.sha256(encoded).hexdigest()
+    CodeBlob.objects.bulk_create(
+        [CodeBlob(digest=digest, data=zlib.compress(encoded, COMPRESSION_LEVEL), size=len(encoded))],
+        ignore_conflicts=True,
+    )
+    return digest
+
+
+def load_code(blob):
+    return zlib.decompress(bytes(blob.data)).decode('utf-8')
+
+
+def archive_attempt(user, code, is_correct, question_id=None, exercise_id=None):
+    """Append one attempt to the archive. Never fails the submission."""
+    try:
+        # Blob and attempt land together; bulk_create would open a transaction anyway
+        with transaction.atomic():
+            return SubmissionAttempt.objects.create(
+                user=user,
+                question_id=question_id,
+                exercise_id=exercise_id,
+                blob_id=store_code(code),
+                is_correct=bool(is_correct),
+            )
+    except Exception as e:
+        logger.error(f"Could not archive attempt for user {user.pk}: {e}")
+        return None
+
+
+def attempt_history(user, question_id=None, exercise_id=None):
+    """``[(created_at, is_correct, code)]`` of a user's attempts, oldest first."""
+    attempts = SubmissionAttempt.objects.filter(user=user).select_related('blob').order_by('created_at', 'id')
+    if question_id is not None:
+        attempts = attempts.filter(question_id=question_id)
+    if exercise_id is not None:
+        attempts = attempts.filter(exercise_id=exercise_id)
+    return [(attempt.created_at, attempt.is_correct, load_code(attempt.blob)) for attempt in attempts]
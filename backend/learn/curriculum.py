@@ -0,0 +1,211 @@
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .models import Milestone, LearnContent, CodeQuestion, MCQQuestion
+from .questions import invalidate_milestone_questions
+
+
+class CurriculumError(Exception):
+    pass
+
+
+class Section:
+    """
+    One curriculum model in the JSON Lines document.
+
+    Records are keyed by milestone order (plus item order for the
+    per-milestone models) so a document can be moved between databases
+    whose UUIDs differ.
+    """
+    def __init__(self, type, model, fields, per_milestone=True):
+        self.type = type
+        self.model = model
+        self.fields = fields
+        self.per_milestone = per_milestone
+
+    def key(self, record):
+        if self.per_milestone:
+            return record['milestone'], record['order']
+        return record['order']
+
+    def existing(self):
+        """Current rows as ``{key: record}``, in one query."""
+        columns = ['milestone__order', *self.fields] if self.per_milestone else self.fields
+        queryset = self.model.objects.order_by(*(['milestone__order', 'order'] if self.per_milestone else ['order']))
+        rows = {}
+        for values in queryset.values(*columns).iterator():
+            if self.per_milestone:
+                values['milestone'] = values.pop('milestone__order')
+            rows[self.key(values)] = values
+        return rows
+
+    def normalize(self, line, raw):
+        """Validate a raw record, filling omitted fields with model defaults."""
+        required = ['milestone', 'order'] if self.per_milestone else ['order']
+        missing = [name for name in required if name not in raw]
+        if missing:
+            raise CurriculumError(f"Line {line}: {self.type} is missing {', '.join(missing)}")
+        unknown = set(raw) - {'type', 'milestone', *self.fields}
+        if unknown:
+            raise CurriculumError(f"Line {line}: unknown {self.type} field(s) {', '.join(sorted(unknown))}")
+
+        record = {name: raw.get(name, self.model._meta.get_field(name).get_default()) for name in self.fields}
+        try:
+            self.model(**record).full_clean(exclude=['milestone'], validate_unique=False, validate_constraints=False)
+        except ValidationError as e:
+            raise CurriculumError(f"Line {line}: invalid {self.type}: {e.message_dict}")
+        if self.per_milestone:
+            record['milestone'] = raw['milestone']
+        return record
+
+
+SECTIONS = [
+    Section('milestone', Milestone, ['order', 'title', 'description', 'is_active'], per_milestone=False),
+    Section('learn_content', LearnContent, [
+        'order', 'title', 'video_url', 'audio_url', 'transcript', 'additional_resources', 'is_additional',
+    ]),
+    Section('code_question', CodeQuestion, [
+        'order', 'question', 'example_code', 'hint', 'video_url', 'video_url_2', 'audio_url',
+    ]),
+    Section('mcq_question', MCQQuestion, [
+        'order', 'question_text', 'options', 'correct_answer', 'explanation', 'audio_url', 'audio_url_2',
+    ]),
+]
+SECTIONS_BY_TYPE = {section.type: section for section in SECTIONS}
+
+
+def export_curriculum(out):
+    """Write the whole curriculum to ``out`` as JSON Lines. Returns the record count."""
+    count = 0
+    for section in SECTIONS:
+        for record in section.existing().values():
+            out.write(json.dumps({'type': section.type, **record}, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def read_curriculum(stream):
+    """Parse a JSON Lines curriculum into ``{type: {key: record}}``."""
+    records = {section.type: {} for section in SECTIONS}
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            raw = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise CurriculumError(f"Line {line}: {e}")
+        section = SECTIONS_BY_TYPE.get(raw.get('type')) if isinstance(raw, dict) else None
+        if section is None:
+            raise CurriculumError(f"Line {line}: expected an object with a known \"type\"")
+        record = section.normalize(line, raw)
+        key = section.key(record)
+        if key in records[section.type]:
+            raise CurriculumError(f"Line {line}: duplicate {section.type} {key}")
+        records[section.type][key] = record
+    return records
+
+
+class CurriculumDiff:
+    """Per-section keys to create, update, leave alone, and (optionally) delete."""
+    def __init__(self, records):
+        self.records = records
+        self.created = {}
+        self.updated = {}
+        self.unchanged = {}
+        self.removed = {}
+        for section in SECTIONS:
+            existing = section.existing()
+            incoming = records[section.type]
+            self.created[section.type] = [key for key in incoming if key not in existing]
+            self.updated[section.type] = [
+                key for key in incoming if key in existing and existing[key] != incoming[key]
+            ]
+            self.unchanged[section.type] = [
+                key for key in incoming if key in existing and existing[key] == incoming[key]
+            ]
+            self.removed[section.type] = [key for key in existing if key not in incoming]
+
+    def summary(self):
+        return {
+            section.type: {
+                'created': len(self.created[section.type]),
+                'updated': len(self.updated[section.type]),
+                'unchanged': len(self.unchanged[section.type]),
+                'removed': len(self.removed[section.type]),
+            }
+            for section in SECTIONS
+        }
+
+    @property
+    def has_changes(self):
+        return any(self.created[t] or self.updated[t] for t in self.records)
+
+
+def apply_curriculum(diff, prune=False):
+    """
+    Upsert the changed records of ``diff`` in one transaction.
+
+    One ``bulk_create(update_conflicts=True)`` per section; unchanged rows
+    are not touched. With ``prune``, rows missing from the document are
+    deleted, which also deletes students' answers to removed questions.
+    """
+    if prune:
+        # Deleting a milestone cascades, so everything kept must belong to a kept milestone
+        kept = set(diff.records['milestone'])
+        for section in SECTIONS[1:]:
+            orphans = sorted({m for m, _ in diff.records[section.type]} - kept)
+            if orphans:
+                raise CurriculumError(
+                    f"{section.type} rows reference milestone(s) {', '.join(map(str, orphans))} "
+                    "that are not in the document"
+                )
+
+    # bulk_create sends no signals, so the cached question facts are dropped here
+    changed_milestones = set()
+    with transaction.atomic():
+        for section in SECTIONS:
+            keys = diff.created[section.type] + diff.updated[section.type]
+            if not keys:
+                continue
+            rows = [dict(diff.records[section.type][key]) for key in keys]
+            if section.per_milestone:
+                milestone_ids = _milestone_ids({row['milestone'] for row in rows})
+                for row in rows:
+                    row['milestone_id'] = milestone_ids[row.pop('milestone')]
+                    changed_milestones.add(row['milestone_id'])
+                unique_fields = ['milestone', 'order']
+            else:
+                unique_fields = ['order']
+            section.model.objects.bulk_create(
+                [section.model(**row) for row in rows],
+                update_conflicts=True,
+                # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target
+                unique_fields=unique_fields if connection.features.supports_update_conflicts_with_target else None,
+                update_fields=[name for name in section.fields if name != 'order'] + ['updated_at'],
+            )
+
+        if prune:
+            for section in reversed(SECTIONS):
+                removed = diff.removed[section.type]
+                if not removed:
+                    continue
+                if section.per_milestone:
+                    condition = reduce(or_, (Q(milestone__order=m, order=o) for m, o in removed))
+                else:
+                    condition = Q(order__in=removed)
+                section.model.objects.filter(condition).delete()
+
+        transaction.on_commit(lambda: invalidate_milestone_questions(changed_milestones))
+
+
+def _milestone_ids(orders):
+    ids = dict(Milestone.objects.filter(order__in=orders).values_list('order', 'id'))
+    missing = sorted(orders - set(ids))
+    if missing:
+        raise CurriculumError(f"No milestone with order {', '.join(map(str, missing))}")
+    return ids
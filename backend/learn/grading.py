@@ -0,0 +1,89 @@
+"""
+Prompts and feedback parsing for grading submitted code.
+
+Shared by the submit views and the ``replay_submissions`` command, so a
+replay exercises the same prompts as live traffic.
+"""
+import json
+
+import openai
+
+from perf.timing import timed_phase
+
+CODE_TUTOR = (
+    "You are a Python tutor. Analyze the code thoroughly, "
+    "even if it doesn't produce output. Check variable declarations, "
+    "function definitions, and overall structure."
+)
+EXERCISE_TUTOR = "You are a friendly Python tutor for kids."
+
+CODE_FEEDBACK_KEYS = ["output", "hints", "suggestions", "is_correct"]
+EXERCISE_FEEDBACK_KEYS = ["output", "hints", "suggestions", "is_correct", "encouragement", "focus_area"]
+
+# Prompt heading for output whose middle was cut by the executor's capture limits
+OUTPUT_HEADING_TRUNCATED = "Output (too long; the middle was omitted where marked)"
+
+
+def needs_input(stderr):
+    """Whether the program stopped because it asked for more input than it was given."""
+    return "EOFError: EOF when reading a line" in stderr
+
+
+def code_prompt(question, code, stdout, stderr, truncated=False):
+    output_heading = OUTPUT_HEADING_TRUNCATED if truncated else "Output"
+    return (
+        f"Question: {question}\n\n"
+        f"Code:\n{code}\n\n"
+        f"{output_heading}:\n{stdout}\n\n"
+        f"Error:\n{stderr if stderr else 'None'}\n\n"
+        "Analyze this code and determine if it correctly answers the question. "
+        "For code without output, check if it properly implements what was asked. "
+        "Respond in JSON with keys: output, hints, suggestions, is_correct. "
+        "The 'output' key should contain your analysis if there's no console output."
+    )
+
+
+def exercise_prompt(question, code, stdout, stderr, truncated=False):
+    output_heading = OUTPUT_HEADING_TRUNCATED if truncated else "Output"
+    return (
+        f"You are a Python tutor for kids aged 11-16 in Sri Lanka. "
+        f"Evaluate this code with friendly, encouraging feedback:\n\n"
+        f"Exercise: {question}\n\n"
+        f"Student's Code:\n{code}\n\n"
+        f"{output_heading}:\n{stdout}\n\n"
+        f"Error:\n{stderr if stderr else 'None'}\n\n"
+        "Provide feedback in JSON format with these keys:\n"
+        "- output: Formatted output explanation\n"
+        "- hints: List of simple hints (max 3)\n"
+        "- suggestions: List of improvement suggestions\n"
+        "- is_correct: boolean\n"
+        "- encouragement: A friendly message praising effort\n"
+        "- focus_area: The main concept to work on\n"
+        "Keep feedback positive and constructive!"
+    )
+
+
+def ask_tutor(system, prompt, json_mode=False):
+    """The model's raw reply to ``prompt``."""
+    extra = {'response_format': {"type": "json_object"}} if json_mode else {}
+    with timed_phase('openai'):
+        chat_response = openai.ChatCompletion.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.7,
+            **extra,
+        )
+    return chat_response.choices[0].message.content
+
+
+def parse_feedback(reply):
+    """Feedback dict from a reply, bare or in a ```json block. Raises ``ValueError``."""
+    try:
+        return json.loads(reply)
+    except json.JSONDecodeError:
+        if "```json" in reply:
+            return json.loads(reply.split("```json")[1].split("```")[0])
+        raise ValueError("Invalid JSON from OpenAI")
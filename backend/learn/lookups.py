@@ -0,0 +1,38 @@
+import re
+
+from django.db.models import Lookup, TextField
+from django.db.models.lookups import IContains
+
+# Characters with a meaning in MySQL boolean-mode full-text queries
+BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]+')
+
+
+def boolean_query(text):
+    """Turn user input into a MySQL boolean-mode query: a prefix term or a phrase."""
+    words = BOOLEAN_OPERATORS.sub(' ', text).split()
+    if not words:
+        return '""'
+    if len(words) == 1:
+        return f"{words[0]}*"
+    return '"' + ' '.join(words) + '"'
+
+
+@TextField.register_lookup
+class Match(Lookup):
+    """
+    ``field__match='text'``: MySQL ``MATCH ... AGAINST`` on a FULLTEXT index.
+
+    Other databases have no such index here and fall back to ``icontains``.
+    Note InnoDB ignores words shorter than ``innodb_ft_min_token_size``
+    (3 by default) and its stopwords.
+    """
+    lookup_name = 'match'
+
+    def as_mysql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        params = (*lhs_params, *(boolean_query(str(param)) for param in rhs_params))
+        return f"MATCH ({lhs}) AGAINST ({rhs} IN BOOLEAN MODE)", params
+
+    def as_sql(self, compiler, connection):
+        return IContains(self.lhs, self.rhs).as_sql(compiler, connection)
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.utils import timezone
+
+from learn.models import ExecutionRecord
+
+SORT_KEYS = {
+    'runs': 'runs',
+    'cpu': 'total_cpu',
+    'wall': 'avg_wall',
+    'rss': 'max_rss',
+    'timeouts': 'timeouts',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Per-question resource usage of code runs: volume, CPU, wall time, peak "
+        "memory and how often runs time out, run out of memory or fail."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7)
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='cpu')
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['days'])
+        records = ExecutionRecord.objects.filter(created_at__gte=since)
+
+        totals = records.aggregate(runs=Count('id'), cpu=Sum('cpu_ms'), wall=Sum('wall_ms'))
+        outcomes = dict(records.values_list('outcome').annotate(n=Count('id')).order_by())
+        self.stdout.write(
+            f"Last {options['days']} day(s): {totals['runs']} run(s), "
+            f"{(totals['cpu'] or 0) / 1000:.1f} CPU s, {(totals['wall'] or 0) / 1000:.1f} wall s"
+        )
+        if outcomes:
+            self.stdout.write("Outcomes: " + ", ".join(f"{k} {v}" for k, v in sorted(outcomes.items())))
+        if not totals['runs']:
+            return
+
+        # Personalized exercises are one-off, so they share a single row (question is NULL)
+        rows = (
+            records.values('question_id', 'question__milestone__order', 'question__order')
+            .annotate(
+                runs=Count('id'),
+                total_cpu=Sum('cpu_ms'),
+                avg_cpu=Avg('cpu_ms'),
+                avg_wall=Avg('wall_ms'),
+                max_wall=Max('wall_ms'),
+                max_rss=Max('max_rss_kb'),
+                timeouts=Count('id', filter=Q(outcome__in=['timeout', 'cpu_limit'])),
+                ooms=Count('id', filter=Q(outcome='oom')),
+                errors=Count('id', filter=Q(outcome='error')),
+                output_limits=Count('id', filter=Q(outcome='output_limit')),
+            )
+            .order_by(f"-{SORT_KEYS[options['sort']]}")[:options['limit']]
+        )
+
+        header = (f"{'question':<14} {'runs':>6} {'cpu s':>8} {'avg cpu':>8} {'avg wall':>9} "
+                  f"{'max wall':>9} {'peak MB':>8} {'timeout':>8} {'oom':>5} {'output':>7} {'error':>6}")
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for row in rows:
+            if row['question_id'] is None:
+                label = 'personalized'
+            else:
+                label = f"M{row['question__milestone__order']}.Q{row['question__order']}"
+            peak = f"{row['max_rss'] / 1024:.1f}" if row['max_rss'] else '-'
+            self.stdout.write(
+                f"{label:<14} {row['runs']:>6} {(row['total_cpu'] or 0) / 1000:>8.1f} "
+                f"{row['avg_cpu'] or 0:>8.0f} {row['avg_wall'] or 0:>9.0f} {row['max_wall'] or 0:>9} "
+                f"{peak:>8} {row['timeouts']:>8} {row['ooms']:>5} {row['output_limits']:>7} {row['errors']:>6}"
+            )
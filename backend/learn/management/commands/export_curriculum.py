@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from learn.curriculum import export_curriculum
+
+
+class Command(BaseCommand):
+    help = "Export milestones, videos and questions as a JSON Lines curriculum document."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', default='-', help="File to write (default: stdout).")
+
+    def handle(self, *args, **options):
+        if options['output'] == '-':
+            export_curriculum(self.stdout)  # No summary line: it would corrupt the document
+            return
+        with open(options['output'], 'w', encoding='utf-8') as out:
+            count = export_curriculum(out)
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} record(s) to {options['output']}"))
@@ -0,0 +1,54 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from learn.curriculum import CurriculumDiff, CurriculumError, apply_curriculum, read_curriculum
+
+
+class Command(BaseCommand):
+    help = (
+        "Upsert a JSON Lines curriculum document produced by export_curriculum. "
+        "Rows are matched on milestone order and item order."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Document to import ('-' for stdin).")
+        parser.add_argument('--dry-run', action='store_true', help="Show the changes without applying them.")
+        parser.add_argument('--prune', action='store_true',
+                            help="Delete rows that are not in the document. Students' answers to "
+                                 "deleted questions are deleted with them.")
+
+    def handle(self, *args, **options):
+        try:
+            if options['path'] == '-':
+                records = read_curriculum(sys.stdin)
+            else:
+                with open(options['path'], encoding='utf-8') as f:
+                    records = read_curriculum(f)
+            diff = CurriculumDiff(records)
+        except CurriculumError as e:
+            raise CommandError(str(e))
+
+        for section, counts in diff.summary().items():
+            removed = 'removed' if options['prune'] else 'not in document'
+            self.stdout.write(
+                f"{section}: {counts['created']} created, {counts['updated']} updated, "
+                f"{counts['unchanged']} unchanged, {counts['removed']} {removed}"
+            )
+            if options['verbosity'] > 1:
+                for label in ('created', 'updated', 'removed'):
+                    for key in getattr(diff, label)[section]:
+                        self.stdout.write(f"  {label} {key}")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING("Dry run: nothing was changed"))
+            return
+        if not diff.has_changes and not (options['prune'] and any(diff.removed.values())):
+            self.stdout.write(self.style.SUCCESS("Curriculum is already up to date"))
+            return
+
+        try:
+            apply_curriculum(diff, prune=options['prune'])
+        except CurriculumError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS("Curriculum imported"))
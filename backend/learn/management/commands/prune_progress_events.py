@@ -0,0 +1,46 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from learn.models import ProcessedProgressEvent
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete progress event idempotency keys older than "
+        "PROGRESS_EVENT_RETENTION_DAYS in bounded batches. Meant to run from "
+        "cron, e.g. daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-batches', type=int, default=0,
+                            help="Stop after this many batches (0 = until done).")
+        parser.add_argument('--sleep', type=float, default=0.05,
+                            help="Seconds to pause between batches to let other writers in.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=settings.PROGRESS_EVENT_RETENTION_DAYS)
+        batches = deleted = 0
+
+        while not options['max_batches'] or batches < options['max_batches']:
+            ids = list(
+                ProcessedProgressEvent.objects.filter(created_at__lt=cutoff)
+                .order_by('created_at').values_list('id', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+
+            ProcessedProgressEvent.objects.filter(id__in=ids).delete()
+
+            batches += 1
+            deleted += len(ids)
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Pruned {deleted} progress event key(s) in {batches} batch(es)"
+        ))
@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from learn.translation import pending_translations, translate_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Translate curriculum text that has no up-to-date stored translation, "
+        "so content endpoints can serve ?lang=<code> without calling the translator."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--language', action='append', dest='languages',
+                            help="Target language (repeatable; default: CURRICULUM_TRANSLATION['LANGUAGES']).")
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep running and translate content as it is saved.")
+
+    def handle(self, *args, **options):
+        languages = options['languages'] or settings.CURRICULUM_TRANSLATION['LANGUAGES']
+        since = None
+        while True:
+            # Content saved while this pass runs is picked up by the next one
+            started = timezone.now()
+            failures = 0
+            for language in languages:
+                pending = pending_translations(language, since=since)
+                if pending:
+                    done, failed = translate_pending(pending, language)
+                    self.stdout.write(f"[{language}] translated {done} text(s)")
+                    if failed:
+                        self.stderr.write(f"[{language}] {failed} text(s) failed and stay pending")
+                    failures += failed
+            if not options['loop']:
+                break
+            # After failures, rescan from the same point so skipped texts are retried
+            if not failures:
+                since = started
+            time.sleep(settings.CURRICULUM_TRANSLATION['POLL_INTERVAL'])
+
+        if failures:
+            self.stdout.write(self.style.WARNING("Some translations failed; run again to retry them"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Curriculum translations are up to date"))
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-19 11:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learn', '0004_codequestion_video_url_2_mcqquestion_audio_url_2'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='personalizedexercise',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='exercise_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usercodeanswer',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='codeanswer_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usermcqanswer',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='mcqanswer_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-19 11:22
+
+from django.db import migrations, models
+
+
+def number_existing_questions(apps, schema_editor):
+    # Existing questions all default to 0; keep their creation order per milestone
+    CodeQuestion = apps.get_model('learn', 'CodeQuestion')
+    counters = {}
+    questions = list(CodeQuestion.objects.order_by('milestone_id', 'created_at', 'id'))
+    for question in questions:
+        question.order = counters.get(question.milestone_id, 0)
+        counters[question.milestone_id] = question.order + 1
+    CodeQuestion.objects.bulk_update(questions, ['order'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learn', '0006_processedprogressevent'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='codequestion',
+            options={'ordering': ['order']},
+        ),
+        migrations.AddField(
+            model_name='codequestion',
+            name='order',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(number_existing_questions, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='codequestion',
+            unique_together={('milestone', 'order')},
+        ),
+    ]
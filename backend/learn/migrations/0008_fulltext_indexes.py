@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-19 11:40
+
+from django.db import migrations
+
+# Backs the __match lookup (learn.lookups); other databases fall back to icontains
+FULLTEXT_INDEXES = [
+    ('learn_learncontent', 'learncontent_transcript_ft', 'transcript'),
+    ('learn_codequestion', 'codequestion_question_ft', 'question'),
+    ('learn_mcqquestion', 'mcqquestion_text_ft', 'question_text'),
+]
+
+
+def create_fulltext_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    for table, name, column in FULLTEXT_INDEXES:
+        schema_editor.execute(f"CREATE FULLTEXT INDEX {name} ON {table} ({column})")
+
+
+def drop_fulltext_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    for table, name, column in FULLTEXT_INDEXES:
+        schema_editor.execute(f"DROP INDEX {name} ON {table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learn', '0007_codequestion_order'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_indexes, drop_fulltext_indexes),
+    ]
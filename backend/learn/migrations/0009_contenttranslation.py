@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-19 11:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learn', '0008_fulltext_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentTranslation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_type', models.CharField(max_length=30)),
+                ('object_id', models.CharField(max_length=36)),
+                ('field', models.CharField(max_length=30)),
+                ('language', models.CharField(max_length=8)),
+                ('source_hash', models.CharField(max_length=64)),
+                ('text', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('content_type', 'object_id', 'field', 'language')},
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-19 11:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learn', '0009_contenttranslation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExecutionRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('backend', models.CharField(max_length=12)),
+                ('outcome', models.CharField(choices=[('ok', 'OK'), ('error', 'Error'), ('timeout', 'Timeout'), ('cpu_limit', 'CPU limit'), ('oom', 'Out of memory'), ('output_limit', 'Output limit'), ('signal', 'Signal')], max_length=12)),
+                ('exit_code', models.SmallIntegerField(blank=True, null=True)),
+                ('wall_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('cpu_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('max_rss_kb', models.PositiveIntegerField(blank=True, null=True)),
+                ('output_bytes', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('exercise', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='learn.personalizedexercise')),
+                ('question', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='learn.codequestion')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='execution_records', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['question', 'created_at'], name='execution_question_created_idx'), models.Index(fields=['created_at'], name='execution_created_idx')],
+            },
+        ),
+    ]
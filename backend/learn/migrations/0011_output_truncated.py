@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learn', '0010_executionrecord'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='personalizedexercise',
+            name='output_truncated',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='usercodeanswer',
+            name='output_truncated',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2 on 2026-10-19 12:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learn', '0012_submission_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='processedprogressevent',
+            index=models.Index(fields=['created_at'], name='progressevent_created_idx'),
+        ),
+    ]
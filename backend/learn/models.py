@@ -45,9 +45,14 @@ class CodeQuestion(models.Model):
     video_url = models.URLField(blank=True, null=True)  # New field
     video_url_2 = models.URLField(blank=True, null=True)  # New additional video URL
     audio_url = models.URLField(blank=True, null=True)  # New field
+    order = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        ordering = ['order']
+        unique_together = ('milestone', 'order')  # Curriculum import key
+
     def __str__(self):
         return f"Code Question for {self.milestone.title}"
 
@@ -56,6 +61,7 @@ class UserCodeAnswer(models.Model):
     question = models.ForeignKey(CodeQuestion, on_delete=models.CASCADE)
     user_code = models.TextField()
     output = models.TextField(blank=True)
+    output_truncated = models.BooleanField(default=False)  # Program output was too long and cut
     hints = models.TextField(blank=True)
     suggestions = models.TextField(blank=True)
     is_correct = models.BooleanField(default=False)
@@ -65,6 +71,10 @@ class UserCodeAnswer(models.Model):
 
     class Meta:
         unique_together = ('user', 'question')
+        indexes = [
+            # Keyset pagination of a user's answer history
+            models.Index(fields=['user', 'created_at', 'id'], name='codeanswer_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email}'s answer to {self.question.id}"
@@ -99,6 +109,10 @@ class UserMCQAnswer(models.Model):
 
     class Meta:
         unique_together = ('user', 'question')
+        indexes = [
+            # Keyset pagination of a user's answer history
+            models.Index(fields=['user', 'created_at', 'id'], name='mcqanswer_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email}'s answer to MCQ {self.question.id}"
@@ -117,6 +131,22 @@ class UserProgress(models.Model):
     def __str__(self):
         return f"{self.user.email}'s Progress"
 
+class ProcessedProgressEvent(models.Model):
+    """Idempotency keys of progress events already applied for a user."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='processed_progress_events')
+    idempotency_key = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'idempotency_key')
+        indexes = [
+            # prune_progress_events
+            models.Index(fields=['created_at'], name='progressevent_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email}: {self.idempotency_key}"
+
 class PersonalizedExercise(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='personalized_exercises')
@@ -128,6 +158,7 @@ class PersonalizedExercise(models.Model):
         ('hard', 'Hard')
     ], default='easy')
     output = models.TextField(blank=True)
+    output_truncated = models.BooleanField(default=False)
     hints = models.TextField(blank=True)
     suggestions = models.TextField(blank=True)
     is_completed = models.BooleanField(default=False)
@@ -135,5 +166,96 @@ class PersonalizedExercise(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a user's exercise history
+            models.Index(fields=['user', 'created_at', 'id'], name='exercise_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Personalized Exercise for {self.user.email}"
+class ContentTranslation(models.Model):
+    """
+    Stored translation of one curriculum text field.
+
+    ``source_hash`` is the hash of the text it was translated from, so
+    edited content is re-translated and stale rows are never served.
+    """
+    content_type = models.CharField(max_length=30)  # learn_content, code_question or mcq_question
+    object_id = models.CharField(max_length=36)
+    field = models.CharField(max_length=30)  # options.<key> for MCQ options
+    language = models.CharField(max_length=8)
+    source_hash = models.CharField(max_length=64)
+    text = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('content_type', 'object_id', 'field', 'language')
+
+    def __str__(self):
+        return f"{self.content_type} {self.object_id} {self.field} [{self.language}]"
+
+class ExecutionRecord(models.Model):
+    """Resource usage of one code run on the submission path, for capacity planning."""
+    OUTCOMES = [
+        ('ok', 'OK'),
+        ('error', 'Error'),
+        ('timeout', 'Timeout'),
+        ('cpu_limit', 'CPU limit'),
+        ('oom', 'Out of memory'),
+        ('output_limit', 'Output limit'),
+        ('signal', 'Signal'),
+    ]
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='execution_records')
+    question = models.ForeignKey('CodeQuestion', on_delete=models.CASCADE, null=True, blank=True)
+    exercise = models.ForeignKey('PersonalizedExercise', on_delete=models.CASCADE, null=True, blank=True)
+    backend = models.CharField(max_length=12)
+    outcome = models.CharField(max_length=12, choices=OUTCOMES)
+    exit_code = models.SmallIntegerField(null=True, blank=True)
+    wall_ms = models.PositiveIntegerField(null=True, blank=True)
+    cpu_ms = models.PositiveIntegerField(null=True, blank=True)
+    max_rss_kb = models.PositiveIntegerField(null=True, blank=True)
+    output_bytes = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['question', 'created_at'], name='execution_question_created_idx'),
+            models.Index(fields=['created_at'], name='execution_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.outcome} run for {self.user_id} ({self.wall_ms} ms)"
+
+class CodeBlob(models.Model):
+    """Submitted code stored once per content (SHA-256 of the UTF-8 text), zlib-compressed."""
+    digest = models.CharField(max_length=64, primary_key=True)
+    data = models.BinaryField()
+    size = models.PositiveIntegerField()  # Uncompressed bytes
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.size} bytes)"
+
+class SubmissionAttempt(models.Model):
+    """
+    One submission of code, append-only. ``UserCodeAnswer`` and
+    ``PersonalizedExercise`` keep only the latest code; this keeps every
+    attempt while storing each distinct program once.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='submission_attempts')
+    question = models.ForeignKey('CodeQuestion', on_delete=models.CASCADE, null=True, blank=True)
+    exercise = models.ForeignKey('PersonalizedExercise', on_delete=models.CASCADE, null=True, blank=True)
+    blob = models.ForeignKey(CodeBlob, on_delete=models.PROTECT, related_name='attempts')
+    is_correct = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # A user's attempts at one question or exercise, in order
+            models.Index(fields=['user', 'question', 'created_at'], name='attempt_user_question_idx'),
+            models.Index(fields=['exercise', 'created_at'], name='attempt_exercise_idx'),
+        ]
+
     def __str__(self):
-        return f"Personalized Exercise for {self.user.email}"
\ No newline at end of file
+        return f"Attempt by {self.user_id} at {self.created_at:%Y-%m-%d %H:%M}"
@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import CodeQuestion, MCQQuestion
+
+# Static per-question data the submit views need. Kept in the cache so a
+# submission doesn't re-read the question row; learn.signals drops the
+# entries when questions change, apply_curriculum after its bulk writes.
+
+
+def code_question_key(question_id):
+    return f"learn:code-question:{question_id}"
+
+
+def mcq_question_key(question_id):
+    return f"learn:mcq-question:{question_id}"
+
+
+def mcq_count_key(milestone_id):
+    return f"learn:mcq-count:{milestone_id}"
+
+
+def question_cache_timeout():
+    if settings.CACHES['default']['BACKEND'].endswith('LocMemCache'):
+        return min(settings.QUESTION_CACHE_TIMEOUT, settings.QUESTION_LOCAL_CACHE_TIMEOUT)
+    return settings.QUESTION_CACHE_TIMEOUT
+
+
+def code_question_facts(question_id):
+    """``{id, milestone_id, question}``; raises ``CodeQuestion.DoesNotExist``."""
+    key = code_question_key(question_id)
+    facts = cache.get(key)
+    if facts is None:
+        question = CodeQuestion.objects.only('id', 'milestone_id', 'question').get(id=question_id)
+        facts = {'id': question.id, 'milestone_id': question.milestone_id, 'question': question.question}
+        cache.set(key, facts, question_cache_timeout())
+    return facts
+
+
+def mcq_question_facts(question_id):
+    """``{id, milestone_id, correct_answer, explanation}``; raises ``MCQQuestion.DoesNotExist``."""
+    key = mcq_question_key(question_id)
+    facts = cache.get(key)
+    if facts is None:
+        question = MCQQuestion.objects.only(
+            'id', 'milestone_id', 'correct_answer', 'explanation'
+        ).get(id=question_id)
+        facts = {
+            'id': question.id,
+            'milestone_id': question.milestone_id,
+            'correct_answer': question.correct_answer,
+            'explanation': question.explanation,
+        }
+        cache.set(key, facts, question_cache_timeout())
+    return facts
+
+
+def milestone_mcq_count(milestone_id):
+    key = mcq_count_key(milestone_id)
+    count = cache.get(key)
+    if count is None:
+        count = MCQQuestion.objects.filter(milestone_id=milestone_id).count()
+        cache.set(key, count, question_cache_timeout())
+    return count
+
+
+def invalidate_code_question(question):
+    cache.delete(code_question_key(question.pk))
+
+
+def invalidate_mcq_question(question, old_milestone_id=None):
+    keys = [mcq_question_key(question.pk), mcq_count_key(question.milestone_id)]
+    if old_milestone_id is not None and old_milestone_id != question.milestone_id:
+        keys.append(mcq_count_key(old_milestone_id))
+    cache.delete_many(keys)
+
+
+def invalidate_milestone_questions(milestone_ids):
+    """Drop the entries of every question in ``milestone_ids``, for bulk writes that send no signals."""
+    if not milestone_ids:
+        return
+    keys = [mcq_count_key(milestone_id) for milestone_id in milestone_ids]
+    keys += map(code_question_key, CodeQuestion.objects.filter(
+        milestone_id__in=milestone_ids).values_list('id', flat=True))
+    keys += map(mcq_question_key, MCQQuestion.objects.filter(
+        milestone_id__in=milestone_ids).values_list('id', flat=True))
+    cache.delete_many(keys)
@@ -0,0 +1,176 @@
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter
+from html import escape
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .models import Milestone, LearnContent, CodeQuestion, MCQQuestion
+
+TOKEN = re.compile(r'\w+', re.UNICODE)
+STOPWORDS = frozenset(
+    'a an and are as at be by for from how in is it of on or that the this to was what when which with you your'
+    .split()
+)
+SNIPPET_CHARS = 160
+
+
+def tokenize(text):
+    return [token for token in TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class Document:
+    __slots__ = ('type', 'id', 'milestone', 'title', 'text', 'length')
+
+    def __init__(self, type, id, milestone, title, text):
+        self.type = type
+        self.id = id
+        self.milestone = milestone
+        self.title = title
+        self.text = text
+        self.length = 0
+
+
+def _documents():
+    """Searchable text of every item in an active milestone, one query per model."""
+    milestones = {
+        m.id: {'id': str(m.id), 'order': m.order, 'title': m.title}
+        for m in Milestone.objects.filter(is_active=True)
+    }
+    for content in LearnContent.objects.filter(milestone_id__in=milestones):
+        title = content.title or f"Video {content.order}"
+        yield Document('learn_content', content.id, milestones[content.milestone_id], title,
+                       f"{title}\n{content.transcript}")
+    for question in CodeQuestion.objects.filter(milestone_id__in=milestones):
+        yield Document('code_question', str(question.id), milestones[question.milestone_id],
+                       question.question.split('\n', 1)[0][:100], f"{question.question}\n{question.hint}")
+    for question in MCQQuestion.objects.filter(milestone_id__in=milestones):
+        options = '\n'.join(str(value) for value in (question.options or {}).values())
+        yield Document('mcq_question', str(question.id), milestones[question.milestone_id],
+                       question.question_text.split('\n', 1)[0][:100],
+                       f"{question.question_text}\n{options}\n{question.explanation}")
+
+
+class SearchIndex:
+    """Inverted index over curriculum text, ranked with BM25."""
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, documents):
+        self.documents = []
+        self.postings = {}  # term -> [(doc index, term frequency)]
+        total_length = 0
+        for document in documents:
+            terms = Counter(tokenize(document.text))
+            document.length = sum(terms.values())
+            total_length += document.length
+            index = len(self.documents)
+            self.documents.append(document)
+            for term, frequency in terms.items():
+                self.postings.setdefault(term, []).append((index, frequency))
+        self.average_length = total_length / len(self.documents) if self.documents else 0.0
+
+    def idf(self, term):
+        n = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.documents) - n + 0.5) / (n + 0.5))
+
+    def search(self, query, limit=20):
+        """Return ``[(score, document)]``, best first."""
+        scores = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for index, frequency in postings:
+                length_norm = 1 - self.b + self.b * self.documents[index].length / self.average_length
+                scores[index] = scores.get(index, 0.0) + idf * frequency * (self.k1 + 1) / (
+                    frequency + self.k1 * length_norm
+                )
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(score, self.documents[index]) for index, score in best]
+
+
+def snippet(text, query, width=SNIPPET_CHARS):
+    """HTML-escaped excerpt around the first query term, with terms wrapped in <mark>."""
+    terms = set(tokenize(query))
+    matches = [m for m in TOKEN.finditer(text) if m.group().lower() in terms]
+    start = max(0, matches[0].start() - width // 3) if matches else 0
+    end = min(len(text), start + width)
+    # Don't cut words in half at either edge
+    if start > 0:
+        space = text.find(' ', start)
+        start = space + 1 if 0 <= space < end else start
+    if end < len(text):
+        space = text.rfind(' ', start, end)
+        end = space if space > start else end
+
+    parts = ['…' if start > 0 else '']
+    position = start
+    for match in matches:
+        if match.start() < start or match.end() > end:
+            continue
+        parts.append(escape(text[position:match.start()]))
+        parts.append(f"<mark>{escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(escape(text[position:end]))
+    parts.append('…' if end < len(text) else '')
+    return ' '.join(''.join(parts).split())
+
+
+class CurriculumSearch:
+    """
+    Worker-wide search index, rebuilt when curriculum content changes.
+
+    Saves in this worker mark the index stale through signals. Changes
+    made by other workers are noticed by comparing a row count and latest
+    ``updated_at`` fingerprint, at most ``LEARN_SEARCH['SYNC_SECONDS']``
+    apart.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self._fingerprint = None
+        self._checked_at = 0.0
+
+    def _current_fingerprint(self):
+        return tuple(
+            tuple(model.objects.aggregate(n=Count('pk'), latest=Max('updated_at')).values())
+            for model in (Milestone, LearnContent, CodeQuestion, MCQQuestion)
+        )
+
+    def index(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._index is not None and now - self._checked_at < settings.LEARN_SEARCH['SYNC_SECONDS']:
+                return self._index
+            fingerprint = self._current_fingerprint()
+            self._checked_at = now
+            if self._index is None or fingerprint != self._fingerprint:
+                self._index = SearchIndex(_documents())
+                self._fingerprint = fingerprint
+            return self._index
+
+    def invalidate(self):
+        with self._lock:
+            self._index = None
+
+    def search(self, query, limit=20):
+        return [
+            {
+                'type': document.type,
+                'id': document.id,
+                'milestone': document.milestone,
+                'title': document.title,
+                'snippet': snippet(document.text, query),
+                'score': round(score, 4),
+            }
+            for score, document in self.index().search(query, limit)
+        ]
+
+
+curriculum_search = CurriculumSearch()
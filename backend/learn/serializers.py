@@ -30,6 +30,25 @@ class UserCodeAnswerSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('user', 'output', 'hints', 'suggestions', 'is_correct')
 
+class UserCodeAnswerHistorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UserCodeAnswer
+        fields = [
+            'id', 'question', 'user_code', 'output', 'output_truncated', 'hints', 'suggestions',
+            'is_correct', 'attempts', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+class CodeSubmissionResultSerializer(serializers.ModelSerializer):
+    """Verdict and feedback for a submission, without the nested user and question."""
+    class Meta:
+        model = UserCodeAnswer
+        fields = [
+            'id', 'question', 'user_code', 'output', 'output_truncated', 'hints', 'suggestions',
+            'is_correct', 'attempts', 'updated_at'
+        ]
+        read_only_fields = fields
+
 class MCQQuestionSerializer(serializers.ModelSerializer):
     class Meta:
         model = MCQQuestion
@@ -44,6 +63,12 @@ class UserMCQAnswerSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('user', 'is_correct')
 
+class UserMCQAnswerHistorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UserMCQAnswer
+        fields = ['id', 'question', 'selected_option', 'is_correct', 'created_at', 'updated_at']
+        read_only_fields = fields
+
 class UserProgressSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     current_milestone = MilestoneSerializer(read_only=True)
@@ -71,6 +96,16 @@ class UserProgressSerializer(serializers.ModelSerializer):
     def get_completed_exercises(self, obj):
         return [milestone.id for milestone in obj.completed_exercises.all()]
 
+class ProgressEventSerializer(serializers.Serializer):
+    TYPES = ('video_watched', 'code_completed', 'exercise_completed', 'current_milestone')
+
+    type = serializers.ChoiceField(choices=TYPES)
+    milestone_id = serializers.UUIDField()
+    idempotency_key = serializers.CharField(max_length=64)
+
+class ProgressEventBatchSerializer(serializers.Serializer):
+    events = ProgressEventSerializer(many=True, allow_empty=False, max_length=200)
+
 class PersonalizedExerciseSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     based_on = UserCodeAnswerSerializer(read_only=True)
@@ -82,6 +117,7 @@ class PersonalizedExerciseSerializer(serializers.ModelSerializer):
             'user',
             'question',         
             'output',
+            'output_truncated',
             'hints',
             'suggestions',
             'is_completed',
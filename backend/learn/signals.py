@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Milestone, LearnContent, CodeQuestion, MCQQuestion
+from .questions import invalidate_code_question, invalidate_mcq_question
+from .search import curriculum_search
+
+
+@receiver(post_save, sender=Milestone)
+@receiver(post_delete, sender=Milestone)
+@receiver(post_save, sender=LearnContent)
+@receiver(post_delete, sender=LearnContent)
+@receiver(post_save, sender=CodeQuestion)
+@receiver(post_delete, sender=CodeQuestion)
+@receiver(post_save, sender=MCQQuestion)
+@receiver(post_delete, sender=MCQQuestion)
+def rebuild_search_index(sender, instance, **kwargs):
+    # Rebuilt lazily on the next search
+    curriculum_search.invalidate()
+
+
+@receiver(post_save, sender=CodeQuestion)
+@receiver(post_delete, sender=CodeQuestion)
+def drop_cached_code_question(sender, instance, **kwargs):
+    invalidate_code_question(instance)
+
+
+@receiver(pre_save, sender=MCQQuestion)
+def remember_mcq_milestone(sender, instance, **kwargs):
+    # A question moved to another milestone also changes the old one's count
+    if not instance._state.adding:
+        instance._old_milestone_id = (
+            MCQQuestion.objects.filter(pk=instance.pk).values_list('milestone_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=MCQQuestion)
+@receiver(post_delete, sender=MCQQuestion)
+def drop_cached_mcq_question(sender, instance, **kwargs):
+    invalidate_mcq_question(instance, getattr(instance, '_old_milestone_id', None))
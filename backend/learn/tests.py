@@ -1,3 +1,184 @@
-from django.test import TestCase
+import os
+import sys
+import tempfile
+import unittest
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from user.models import User
+from .curriculum import CurriculumDiff, SECTIONS_BY_TYPE, apply_curriculum
+from .models import (
+    ContentTranslation, ExecutionRecord, MCQQuestion, Milestone, PersonalizedExercise, ProcessedProgressEvent,
+)
+from .questions import mcq_question_facts, milestone_mcq_count
+from .translation import source_hash, translate_pending
+
+
+def cursor(raw):
+    return urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+class KeysetPaginationTests(TestCase):
+    url = reverse('personalized-exercise-list')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='student@example.com', username='student', password='x')
+        other = User.objects.create_user(email='other@example.com', username='other', password='x')
+        cls.exercises = [
+            PersonalizedExercise.objects.create(user=cls.user, question=f"q{i}") for i in range(45)
+        ]
+        PersonalizedExercise.objects.create(user=other, question="not mine")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_pages_cover_history_newest_first(self):
+        seen, url = [], self.url
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [row['id'] for row in response.data['results']]
+            url = response.data['next']
+        expected = sorted(self.exercises, key=lambda e: (e.created_at, e.pk), reverse=True)
+        self.assertEqual(seen, [str(e.pk) for e in expected])
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(self.url, {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 45)
+        response = self.client.get(self.url, {'page_size': 5})
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_last_page_has_no_next(self):
+        response = self.client.get(self.url, {'page_size': 45})
+        self.assertIsNone(response.data['next'])
+
+    def test_invalid_cursors_are_not_found(self):
+        created_at = self.exercises[0].created_at.isoformat()
+        for value in [
+            'zz',
+            cursor('no separator'),
+            cursor(f"not a date|{self.exercises[0].pk}"),
+            cursor(f"{created_at}|"),
+            cursor(f"{created_at}|not-a-uuid"),
+            cursor(f"{created_at}|1' OR '1'='1"),
+        ]:
+            with self.subTest(cursor=value):
+                response = self.client.get(self.url, {'cursor': value})
+                self.assertEqual(response.status_code, 404)
+
+
+class QuestionCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.first = Milestone.objects.create(title="One", description="", order=1)
+        self.second = Milestone.objects.create(title="Two", description="", order=2)
+        self.question = MCQQuestion.objects.create(
+            milestone=self.first, question_text="?", options={'A': 'a', 'B': 'b'}, correct_answer='A', order=1,
+        )
+
+    def test_moving_a_question_updates_both_counts(self):
+        self.assertEqual((milestone_mcq_count(self.first.id), milestone_mcq_count(self.second.id)), (1, 0))
+        self.question.milestone = self.second
+        self.question.save()
+        self.assertEqual((milestone_mcq_count(self.first.id), milestone_mcq_count(self.second.id)), (0, 1))
+
+    def test_curriculum_import_drops_cached_answers(self):
+        self.assertEqual(mcq_question_facts(self.question.id)['correct_answer'], 'A')
+        records = {section.type: section.existing() for section in SECTIONS_BY_TYPE.values()}
+        records['mcq_question'][(1, 1)]['correct_answer'] = 'B'
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_curriculum(CurriculumDiff(records))
+        self.assertEqual(mcq_question_facts(self.question.id)['correct_answer'], 'B')
+
+
+class PruneProgressEventsTests(TestCase):
+    def test_only_keys_past_retention_are_deleted(self):
+        user = User.objects.create_user(email='student@example.com', username='student', password='x')
+        for key, age in [('old', 31), ('older', 60), ('recent', 29)]:
+            event = ProcessedProgressEvent.objects.create(user=user, idempotency_key=key)
+            ProcessedProgressEvent.objects.filter(pk=event.pk).update(created_at=timezone.now() - timedelta(days=age))
+        with override_settings(PROGRESS_EVENT_RETENTION_DAYS=30):
+            call_command('prune_progress_events', batch_size=1, sleep=0, stdout=StringIO())
+        self.assertEqual(list(ProcessedProgressEvent.objects.values_list('idempotency_key', flat=True)), ['recent'])
+
+
+class TranslatePendingTests(TestCase):
+    def pending(self, *texts):
+        return [('code_question', str(i), 'question', text, source_hash(text)) for i, text in enumerate(texts)]
+
+    def test_failed_chunks_are_skipped_and_left_pending(self):
+        def translate(self, text):
+            if 'broken' in text:
+                raise ConnectionError("translator unreachable")
+            return text.upper()
+
+        with mock.patch('deep_translator.GoogleTranslator.translate', translate), \
+                self.assertLogs('learn.translation', 'WARNING'):
+            done, failed = translate_pending(self.pending('one', 'broken', 'three'), 'ta', chunk_size=1)
+        self.assertEqual((done, failed), (2, 1))
+        self.assertEqual(
+            sorted(ContentTranslation.objects.values_list('text', flat=True)), ['ONE', 'THREE'],
+        )
+
+    def test_existing_translations_are_updated(self):
+        with mock.patch('deep_translator.GoogleTranslator.translate', lambda self, text: text.upper()):
+            translate_pending(self.pending('old'), 'ta')
+            translate_pending(self.pending('new'), 'ta')
+        row = ContentTranslation.objects.get()
+        self.assertEqual((row.text, row.source_hash), ('NEW', source_hash('new')))
+
+
+def execution_settings(**config):
+    return override_settings(CODE_EXECUTION=dict(settings.CODE_EXECUTION, **config))
+
+
+class RunSessionTests(TestCase):
+    url = reverse('run-session-list')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='student@example.com', username='student', password='x')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_unavailable_on_piston(self):
+        with execution_settings(BACKEND='piston', RUN_AS_UID=65534):
+            self.assertEqual(self.client.post(self.url, {'code': "print(1)"}).status_code, 404)
+
+    def test_unavailable_without_an_unprivileged_uid(self):
+        with execution_settings(BACKEND='forkserver', RUN_AS_UID=None):
+            self.assertEqual(self.client.post(self.url, {'code': "print(1)"}).status_code, 404)
+            url = reverse('run-session-input', kwargs={'session_id': '00000000-0000-0000-0000-000000000000'})
+            self.assertEqual(self.client.post(url, {'line': 'x'}).status_code, 404)
+
+    @unittest.skipUnless(sys.platform == 'linux', "The sandbox needs Linux")
+    def test_finished_session_is_recorded_once(self):
+        with tempfile.TemporaryDirectory() as socket_dir, execution_settings(
+            BACKEND='forkserver', RUN_AS_UID=65534 if os.geteuid() == 0 else os.getuid(),
+            SESSIONS=dict(settings.CODE_EXECUTION['SESSIONS'], SOCKET_DIR=socket_dir),
+        ):
+            response = self.client.post(self.url, {'code': "print('Hi', input())"})
+            self.assertEqual(response.status_code, 201, response.data)
+            url = reverse('run-session-input', kwargs={'session_id': response.data['id']})
+            reply = self.client.post(url, {'line': 'Ada', 'cursor': 0, 'wait': 5}).data
+            detail = reverse('run-session', kwargs={'session_id': response.data['id']})
+            while reply['state'] != 'exited':
+                reply = self.client.get(detail, {'cursor': reply['cursor'], 'wait': 5}).data
+            self.client.get(detail, {'cursor': 0, 'wait': 0})
+        record = ExecutionRecord.objects.get()
+        self.assertEqual((record.user, record.backend, record.outcome), (self.user, 'forkserver', 'ok'))
@@ -0,0 +1,214 @@
+import hashlib
+import logging
+import re
+
+from deep_translator import GoogleTranslator
+from django.conf import settings
+from django.db import connection, transaction
+
+from perf.timing import timed_phase
+from .models import LearnContent, CodeQuestion, MCQQuestion, ContentTranslation
+
+logger = logging.getLogger(__name__)
+
+# Curriculum text translated ahead of time, by ContentTranslation.content_type
+TRANSLATED_FIELDS = {
+    'learn_content': (LearnContent, ['transcript']),
+    'code_question': (CodeQuestion, ['question', 'hint']),
+    'mcq_question': (MCQQuestion, ['question_text', 'explanation', 'options']),
+}
+
+# Joins several texts into one request; translators leave it alone
+SEPARATOR = '\n|||\n'
+SENTENCE_END = re.compile(r'(?<=[.!?\n])')
+
+
+def source_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def source_texts(content_type, obj):
+    """Yield ``(field, text)`` for each non-empty translatable text of ``obj``."""
+    for field in TRANSLATED_FIELDS[content_type][1]:
+        value = getattr(obj, field)
+        if field == 'options':
+            for key, option in (value or {}).items():
+                if isinstance(option, str) and option.strip():
+                    yield f"options.{key}", option
+        elif value and value.strip():
+            yield field, value
+
+
+def _split_long(text, limit):
+    """Break text into pieces of at most ``limit`` chars, preferably after a sentence or line."""
+    pieces, current = [], ''
+    for unit in SENTENCE_END.split(text):
+        if current and len(current) + len(unit) > limit:
+            pieces.append(current)
+            current = ''
+        while len(unit) > limit:  # A single run-on sentence
+            pieces.append(unit[:limit])
+            unit = unit[limit:]
+        current += unit
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+class BatchTranslator:
+    """
+    Translate many texts with as few requests as possible.
+
+    Short texts are packed into requests of up to ``max_chars`` joined by
+    ``SEPARATOR``; if a response doesn't split back into the same number
+    of parts, that batch is retried one text at a time. Long texts are
+    split into pieces that fit a request and rejoined.
+    """
+    def __init__(self, target, max_chars=None):
+        self.target = target
+        self.max_chars = max_chars or settings.CURRICULUM_TRANSLATION['BATCH_CHARS']
+        self.requests = 0
+        self._translator = GoogleTranslator(source='auto', target=target)
+        if settings.GOOGLE_TRANSLATE_URL:
+            self._translator._base_url = settings.GOOGLE_TRANSLATE_URL
+
+    def _request(self, text):
+        self.requests += 1
+        with timed_phase('translate'):
+            return self._translator.translate(text)
+
+    def _translate_one(self, text):
+        translated = ''
+        for piece in _split_long(text, self.max_chars):
+            if translated:
+                translated += '\n' if translated_from.endswith('\n') else ' '
+            translated += self._request(piece) or piece
+            translated_from = piece
+        return translated
+
+    def _translate_packed(self, texts):
+        if len(texts) == 1:
+            return [self._translate_one(texts[0])]
+        parts = (self._request(SEPARATOR.join(texts)) or '').split('|||')
+        if len(parts) != len(texts):
+            logger.warning(f"Batch of {len(texts)} texts came back as {len(parts)} parts; retrying one by one")
+            return [self._translate_one(text) for text in texts]
+        return [part.strip() for part in parts]
+
+    def translate(self, texts):
+        """Return translations of ``texts`` in the same order."""
+        results = [None] * len(texts)
+        batch, size = [], 0
+        for index, text in enumerate(texts):
+            if len(text) > self.max_chars // 2:
+                results[index] = self._translate_one(text)
+                continue
+            if batch and size + len(SEPARATOR) + len(text) > self.max_chars:
+                for (i, _), translated in zip(batch, self._translate_packed([t for _, t in batch])):
+                    results[i] = translated
+                batch, size = [], 0
+            batch.append((index, text))
+            size += len(text) + len(SEPARATOR)
+        if batch:
+            for (i, _), translated in zip(batch, self._translate_packed([t for _, t in batch])):
+                results[i] = translated
+        return results
+
+
+def pending_translations(language, since=None):
+    """
+    ``[(content_type, object_id, field, text, hash)]`` with no up-to-date
+    translation in ``language``. ``since`` limits the scan to content
+    updated after that time.
+    """
+    pending = []
+    for content_type, (model, _) in TRANSLATED_FIELDS.items():
+        objects = model.objects.all()
+        if since is not None:
+            objects = objects.filter(updated_at__gte=since)
+        objects = list(objects)
+        stored = {
+            (object_id, field): hashed
+            for object_id, field, hashed in ContentTranslation.objects.filter(
+                content_type=content_type, language=language,
+                object_id__in=[str(obj.pk) for obj in objects],
+            ).values_list('object_id', 'field', 'source_hash')
+        }
+        for obj in objects:
+            for field, text in source_texts(content_type, obj):
+                hashed = source_hash(text)
+                if stored.get((str(obj.pk), field)) != hashed:
+                    pending.append((content_type, str(obj.pk), field, text, hashed))
+    return pending
+
+
+def translate_pending(pending, language, chunk_size=100):
+    """
+    Translate and store ``pending`` items, committing every ``chunk_size``.
+
+    A chunk the translator fails on is logged and skipped; its items stay
+    pending for the next run. Returns ``(translated, failed)`` counts.
+    """
+    translator = BatchTranslator(language)
+    done = failed = 0
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        try:
+            translated = translator.translate([text for _, _, _, text, _ in chunk])
+        except Exception as e:  # Network errors, quota and rate limits, translator bugs
+            logger.warning(f"Skipping {len(chunk)} text(s) to [{language}]: {e}", exc_info=True)
+            failed += len(chunk)
+            continue
+        with transaction.atomic():
+            ContentTranslation.objects.bulk_create(
+                [
+                    ContentTranslation(
+                        content_type=content_type, object_id=object_id, field=field,
+                        language=language, source_hash=hashed, text=text,
+                    )
+                    for (content_type, object_id, field, _, hashed), text in zip(chunk, translated)
+                ],
+                update_conflicts=True,
+                # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target
+                unique_fields=(
+                    ['content_type', 'object_id', 'field', 'language']
+                    if connection.features.supports_update_conflicts_with_target else None
+                ),
+                update_fields=['source_hash', 'text', 'updated_at'],
+            )
+        done += len(chunk)
+    return done, failed
+
+
+def apply_translations(items, content_type, language):
+    """
+    Overlay stored translations onto serialized ``items`` in place.
+
+    One query for the whole list. A translation is used only if it was
+    made from the text currently in the item; otherwise the source text
+    is left as it is.
+    """
+    if not items:
+        return items
+    rows = ContentTranslation.objects.filter(
+        content_type=content_type, language=language,
+        object_id__in=[str(item['id']) for item in items],
+    ).values_list('object_id', 'field', 'source_hash', 'text')
+    translations = {(object_id, field): (hashed, text) for object_id, field, hashed, text in rows}
+    if not translations:
+        return items
+
+    for item in items:
+        object_id = str(item['id'])
+        for field in TRANSLATED_FIELDS[content_type][1]:
+            if field == 'options':
+                options = item.get('options') or {}
+                for key, option in options.items():
+                    stored = translations.get((object_id, f"options.{key}"))
+                    if stored and isinstance(option, str) and stored[0] == source_hash(option):
+                        options[key] = stored[1]
+            else:
+                stored = translations.get((object_id, field))
+                if stored and item.get(field) and stored[0] == source_hash(item[field]):
+                    item[field] = stored[1]
+    return items
@@ -4,19 +4,28 @@ from .views import (
     SubmitCodeView, MCQQuestionView, SubmitMCQAnswerView,
     UserProgressView, UpdateMilestoneView,
     PersonalizedExerciseView, SubmitPersonalizedExerciseView,
-    MarkVideoWatchedView, MarkCodeCompletedView, MarkExerciseCompletedView
+    MarkVideoWatchedView, MarkCodeCompletedView, MarkExerciseCompletedView,
+    UserCodeAnswerHistoryView, UserMCQAnswerHistoryView, ProgressEventBatchView,
+    CurriculumSearchView, RunSessionView, RunSessionDetailView, RunSessionInputView
 )
 
 urlpatterns = [
     # Existing paths
     path('milestones/', MilestoneListView.as_view(), name='milestone-list'),
     path('milestones/<uuid:milestone_id>/learn-contents/', LearnContentView.as_view(), name='learn-contents'),
+    path('search/', CurriculumSearchView.as_view(), name='curriculum-search'),
     path('milestones/<uuid:milestone_id>/questions/', CodeQuestionView.as_view(), name='code-questions'),
     path('questions/<uuid:question_id>/submit/', SubmitCodeView.as_view(), name='submit-code'),
+    path('run-sessions/', RunSessionView.as_view(), name='run-session-list'),
+    path('run-sessions/<uuid:session_id>/', RunSessionDetailView.as_view(), name='run-session'),
+    path('run-sessions/<uuid:session_id>/input/', RunSessionInputView.as_view(), name='run-session-input'),
+    path('code-answers/', UserCodeAnswerHistoryView.as_view(), name='code-answer-history'),
     path('milestones/<uuid:milestone_id>/mcq-questions/', MCQQuestionView.as_view(), name='mcq-questions'),
     path('mcq-questions/<uuid:question_id>/submit/', SubmitMCQAnswerView.as_view(), name='submit-mcq-answer'),
+    path('mcq-answers/', UserMCQAnswerHistoryView.as_view(), name='mcq-answer-history'),
     path('progress/', UserProgressView.as_view(), name='user-progress'),
     path('progress/update-milestone/', UpdateMilestoneView.as_view(), name='update-milestone'),
+    path('progress/events/', ProgressEventBatchView.as_view(), name='progress-events'),
     path('personalized-exercises/', PersonalizedExerciseView.as_view(), name='personalized-exercise-list'),
     path('personalized-exercises/<uuid:exercise_id>/submit/', SubmitPersonalizedExerciseView.as_view(), name='submit-personalized-exercise'),
     
@@ -2,24 +2,42 @@ from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import IsAuthenticated
 from .models import (
     Milestone, LearnContent, CodeQuestion,
     UserCodeAnswer, MCQQuestion, UserMCQAnswer,
-    UserProgress, PersonalizedExercise
+    UserProgress, PersonalizedExercise, ProcessedProgressEvent
 )
 from .serializers import (
     MilestoneSerializer, LearnContentSerializer, CodeQuestionSerializer,
     UserCodeAnswerSerializer, MCQQuestionSerializer, UserMCQAnswerSerializer,
-    UserProgressSerializer, PersonalizedExerciseSerializer
+    UserProgressSerializer, PersonalizedExerciseSerializer,
+    UserCodeAnswerHistorySerializer, UserMCQAnswerHistorySerializer,
+    ProgressEventBatchSerializer, CodeSubmissionResultSerializer
 )
+from .pagination import KeysetPagination
+from .accounting import record_execution
+from .archive import archive_attempt
+from .grading import (
+    CODE_TUTOR, EXERCISE_TUTOR, CODE_FEEDBACK_KEYS, EXERCISE_FEEDBACK_KEYS,
+    ask_tutor, code_prompt, exercise_prompt, needs_input, parse_feedback,
+)
+from .questions import code_question_facts, mcq_question_facts, milestone_mcq_count
+from .search import curriculum_search
+from .translation import apply_translations
+from execution.backends import ExecutionError, ExecutionResult, execute
+from execution import sessions
+from execution.scheduler import ExecutionBusy, scheduler
+from perf.timing import timed_phase
 from user.models import User
-import requests
 import openai
 import json
 import logging
 import os
 from django.conf import settings
+from django.db import transaction
+from django.db.models import F
 
 logger = logging.getLogger(__name__)
 
@@ -36,27 +54,65 @@ def translate_to_tamil(text):
     """Translate text to Tamil if it's not already in Tamil"""
     try:
         # Detect the source language (deep-translator does not support detection directly, so use English as fallback)
-        translated_text = GoogleTranslator(source='auto', target='ta').translate(text)
+        translator = GoogleTranslator(source='auto', target='ta')
+        if settings.GOOGLE_TRANSLATE_URL:
+            translator._base_url = settings.GOOGLE_TRANSLATE_URL
+        with timed_phase('translate'):
+            translated_text = translator.translate(text)
         return translated_text
     except Exception as e:
         logger.error(f"Translation error: {str(e)}")
         return text  # Return original if translation fails
 
+def busy_response(busy):
+    """
+    429 when the user already has runs going, 503 when this worker is full.
+    The message isn't translated: no outbound calls while we're overloaded.
+    """
+    response = Response({
+        "status": "busy",
+        "message": f"The code runner is busy; you are at position {busy.position} in the queue. "
+                   "Please try again in a moment.",
+        "queue_position": busy.position,
+        "retry_after": busy.retry_after,
+    }, status=429 if busy.per_user else 503)
+    response["Retry-After"] = str(busy.retry_after)
+    return response
+
 class MilestoneListView(generics.ListAPIView):
     queryset = Milestone.objects.filter(is_active=True).order_by('order')
     serializer_class = MilestoneSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-class LearnContentView(generics.ListAPIView):
+class TranslatedListMixin:
+    """
+    Serve stored translations with ``?lang=<code>``.
+
+    Translations come from ``ContentTranslation`` (filled by the
+    translate_curriculum command); nothing is translated on this path.
+    Text without an up-to-date translation is returned as is.
+    """
+    translation_type = None
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        language = request.query_params.get('lang')
+        if language and language != 'en':
+            apply_translations(response.data, self.translation_type, language)
+        return response
+
+class LearnContentView(TranslatedListMixin, generics.ListAPIView):
     serializer_class = LearnContentSerializer
+    translation_type = 'learn_content'
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
         milestone_id = self.kwargs.get('milestone_id')
         return LearnContent.objects.filter(milestone_id=milestone_id).order_by('order')
 
-class CodeQuestionView(generics.ListAPIView):
+class CodeQuestionView(TranslatedListMixin, generics.ListAPIView):
     serializer_class = CodeQuestionSerializer
+    translation_type = 'code_question'
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
@@ -68,7 +124,7 @@ class SubmitCodeView(APIView):
 
     def post(self, request, question_id):
         try:
-            question = CodeQuestion.objects.get(id=question_id)
+            question = code_question_facts(question_id)
             user = request.user
             user_code = request.data.get("code", "")
             user_inputs = request.data.get("inputs", [])  # List of inputs for input() calls
@@ -76,37 +132,26 @@ class SubmitCodeView(APIView):
             if not user_code:
                 return Response({"error": "No code provided"}, status=400)
 
-            # 🧪 1. Execute the code using Piston with input support
-            piston_payload = {
-                "language": "python3",
-                "version": "3.10.0",
-                "files": [{"name": "main.py", "content": user_code}],
-                
-            }
-            
-            # Add stdin if there are user inputs
-            if user_inputs:
-                piston_payload["stdin"] = "\n".join(user_inputs) + "\n"
-
-            piston_response = requests.post(
-                settings.PISTON_EXECUTE_URL,
-                json=piston_payload,
-                timeout=10  # Add timeout to prevent hanging
-            )
-
-            if piston_response.status_code != 200:
+            # 🧪 1. Execute the code (Piston or the local fork server, see execution.backends)
+            stdin = "\n".join(user_inputs) + "\n" if user_inputs else ""
+            try:
+                with scheduler.slot(user.id, scheduler.weight(user)):
+                    result = execute(user_code, stdin)
+            except ExecutionBusy as busy:
+                return busy_response(busy)
+            except ExecutionError:
                 return Response({"error": "Code execution failed"}, status=500)
+            record_execution(result, user, question_id=question['id'])
 
-            result = piston_response.json().get("run", {})
-            stdout = result.get("stdout", "").strip()
-            stderr = result.get("stderr", "").strip()
+            stdout = result.stdout.strip()
+            stderr = result.stderr.strip()
 
             # Translate error messages to Tamil
             if stderr:
                 stderr = translate_to_tamil(stderr)
 
             # Check if the program is waiting for input
-            if "EOFError: EOF when reading a line" in stderr:
+            if needs_input(stderr):
                 translated_message = translate_to_tamil("This program requires input")
                 return Response({
                     "status": "input_required",
@@ -115,44 +160,14 @@ class SubmitCodeView(APIView):
                 }, status=200)
 
             # 🧠 2. Call OpenAI with the real output
-            prompt = (
-                f"Question: {question.question}\n\n"
-                f"Code:\n{user_code}\n\n"
-                f"Output:\n{stdout}\n\n"
-                f"Error:\n{stderr if stderr else 'None'}\n\n"
-                "Analyze this code and determine if it correctly answers the question. "
-                "For code without output, check if it properly implements what was asked. "
-                "Respond in JSON with keys: output, hints, suggestions, is_correct. "
-                "The 'output' key should contain your analysis if there's no console output."
-            )
-
-            chat_response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are a Python tutor. Analyze the code thoroughly, "
-                                  "even if it doesn't produce output. Check variable declarations, "
-                                  "function definitions, and overall structure."
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
-            )
-
-            gpt_reply = chat_response.choices[0].message.content
+            prompt = code_prompt(question['question'], user_code, stdout, stderr, result.truncated)
+            gpt_reply = ask_tutor(CODE_TUTOR, prompt)
 
             # 🧩 3. Parse feedback JSON
-            try:
-                feedback = json.loads(gpt_reply)
-            except json.JSONDecodeError:
-                if "```json" in gpt_reply:
-                    feedback = json.loads(gpt_reply.split("```json")[1].split("```")[0])
-                else:
-                    raise ValueError("Invalid JSON from OpenAI")
+            feedback = parse_feedback(gpt_reply)
 
             # ✅ 4. Check for required keys
-            for key in ["output", "hints", "suggestions", "is_correct"]:
+            for key in CODE_FEEDBACK_KEYS:
                 if key not in feedback:
                     return Response(
                         {"error": "Incomplete feedback from AI"}, status=500
@@ -170,30 +185,34 @@ class SubmitCodeView(APIView):
             feedback["hints"] = translate_to_tamil(feedback["hints"])
             feedback["suggestions"] = translate_to_tamil(feedback["suggestions"])
 
-            # 📝 5. Save to database
-            answer, _ = UserCodeAnswer.objects.update_or_create(
+            # 📝 5. Save to database: the latest answer, plus the attempt in the archive
+            latest = {
+                "user_code": user_code,
+                "output": feedback["output"],
+                "output_truncated": result.truncated,
+                "hints": feedback["hints"],
+                "suggestions": feedback["suggestions"],
+                "is_correct": feedback["is_correct"],
+            }
+            answer, created = UserCodeAnswer.objects.update_or_create(
                 user=user,
-                question=question,
-                defaults={
-                    "user_code": user_code,
-                    "output": feedback["output"],
-                    "hints": feedback["hints"],
-                    "suggestions": feedback["suggestions"],
-                    "is_correct": feedback["is_correct"],
-                },
+                question_id=question['id'],
+                defaults=dict(latest, attempts=F("attempts") + 1),
+                create_defaults=dict(latest, attempts=1),
             )
+            if not created:
+                answer.refresh_from_db(fields=["attempts"])
+            archive_attempt(user, user_code, feedback["is_correct"], question_id=question['id'])
 
             # 🎯 6. Update progress
             if feedback["is_correct"]:
                 progress, _ = UserProgress.objects.get_or_create(user=user)
                 # Check if this is the first correct answer for this question
-                answer = UserCodeAnswer.objects.get(user=user, question=question)
                 if answer.attempts == 1:  # First attempt was correct
                     progress.score += 10
-                    progress.save()           
-            
+                    progress.save()
 
-            return Response(UserCodeAnswerSerializer(answer).data)
+            return Response(CodeSubmissionResultSerializer(answer).data)
 
         except CodeQuestion.DoesNotExist:
             return Response({"error": "Question not found"}, status=404)
@@ -202,8 +221,17 @@ class SubmitCodeView(APIView):
             return Response({"error": "Failed to evaluate code"}, status=500)
 
             
-class MCQQuestionView(generics.ListAPIView):
+class UserCodeAnswerHistoryView(generics.ListAPIView):
+    serializer_class = UserCodeAnswerHistorySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return UserCodeAnswer.objects.filter(user=self.request.user)
+
+class MCQQuestionView(TranslatedListMixin, generics.ListAPIView):
     serializer_class = MCQQuestionSerializer
+    translation_type = 'mcq_question'
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
@@ -215,15 +243,15 @@ class SubmitMCQAnswerView(APIView):
     
     def post(self, request, question_id):
         try:
-            question = MCQQuestion.objects.get(id=question_id)
+            question = mcq_question_facts(question_id)
             user = request.user
             selected_option = request.data.get('selected_option', '').upper()
             
-            is_correct = selected_option == question.correct_answer
+            is_correct = selected_option == question['correct_answer']
             
             answer, created = UserMCQAnswer.objects.update_or_create(
                 user=user,
-                question=question,
+                question_id=question['id'],
                 defaults={
                     'selected_option': selected_option,
                     'is_correct': is_correct
@@ -231,26 +259,26 @@ class SubmitMCQAnswerView(APIView):
             )
             
             # Check if all MCQ questions for this milestone are answered correctly
-            milestone = question.milestone
-            total_questions = MCQQuestion.objects.filter(milestone=milestone).count()
+            milestone_id = question['milestone_id']
+            total_questions = milestone_mcq_count(milestone_id)
             correct_answers = UserMCQAnswer.objects.filter(
                 user=user,
-                question__milestone=milestone,
+                question__milestone_id=milestone_id,
                 is_correct=True
             ).count()
             
             # Update progress if all questions are correct
             if correct_answers == total_questions:
                 progress = UserProgress.objects.get(user=user)
-                if milestone not in progress.completed_milestones.all():
+                if not progress.completed_milestones.filter(pk=milestone_id).exists():
                     progress.score += 15 * total_questions
-                    progress.completed_milestones.add(milestone)
+                    progress.completed_milestones.add(milestone_id)
                     progress.save()
             
             return Response({
                 'is_correct': is_correct,
-                'correct_answer': question.correct_answer,
-                'explanation': question.explanation
+                'correct_answer': question['correct_answer'],
+                'explanation': question['explanation']
             })
             
         except Exception as e:
@@ -260,6 +288,14 @@ class SubmitMCQAnswerView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+class UserMCQAnswerHistoryView(generics.ListAPIView):
+    serializer_class = UserMCQAnswerHistorySerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return UserMCQAnswer.objects.filter(user=self.request.user)
+
 class UserProgressView(generics.RetrieveAPIView):
     serializer_class = UserProgressSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -298,9 +334,10 @@ class UpdateMilestoneView(APIView):
 class PersonalizedExerciseView(generics.ListCreateAPIView):
     serializer_class = PersonalizedExerciseSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
-        return PersonalizedExercise.objects.filter(user=self.request.user)
+        return PersonalizedExercise.objects.filter(user=self.request.user).select_related('user')
     
     def perform_create(self, serializer):
         user = self.request.user
@@ -356,15 +393,16 @@ class PersonalizedExerciseView(generics.ListCreateAPIView):
         """
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a friendly Python tutor creating fun exercises for kids."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                response_format={ "type": "json_object" }
-            )
+            with timed_phase('openai'):
+                response = openai.ChatCompletion.create(
+                    model="gpt-3.5-turbo",
+                    messages=[
+                        {"role": "system", "content": "You are a friendly Python tutor creating fun exercises for kids."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.7,
+                    response_format={ "type": "json_object" }
+                )
             
             content = response.choices[0].message.content
             exercise_data = json.loads(content)
@@ -481,36 +519,26 @@ class SubmitPersonalizedExerciseView(APIView):
             if not user_code:
                 return Response({"error": "No code provided"}, status=400)
 
-            # 1. Execute the code using Piston with input support
-            piston_payload = {
-                "language": "python3",
-                "version": "3.10.0",
-                "files": [{"name": "main.py", "content": user_code}],
-            }
-            
-            # Add stdin if there are user inputs
-            if user_inputs:
-                piston_payload["stdin"] = "\n".join(user_inputs) + "\n"
-
-            piston_response = requests.post(
-                settings.PISTON_EXECUTE_URL,
-                json=piston_payload,
-                timeout=10  # Add timeout to prevent hanging
-            )
-
-            if piston_response.status_code != 200:
+            # 1. Execute the code (Piston or the local fork server, see execution.backends)
+            stdin = "\n".join(user_inputs) + "\n" if user_inputs else ""
+            try:
+                with scheduler.slot(request.user.id, scheduler.weight(request.user)):
+                    result = execute(user_code, stdin)
+            except ExecutionBusy as busy:
+                return busy_response(busy)
+            except ExecutionError:
                 return Response({"error": "Code execution failed"}, status=500)
+            record_execution(result, request.user, exercise_id=exercise.id)
 
-            result = piston_response.json().get("run", {})
-            stdout = result.get("stdout", "").strip()
-            stderr = result.get("stderr", "").strip()
+            stdout = result.stdout.strip()
+            stderr = result.stderr.strip()
 
             # Translate error messages to Tamil
             if stderr:
                 stderr = translate_to_tamil(stderr)
 
             # Check if the program is waiting for input
-            if "EOFError: EOF when reading a line" in stderr:
+            if needs_input(stderr):
                 translated_message = translate_to_tamil("This program requires input")
                 return Response({
                     "status": "input_required",
@@ -519,51 +547,21 @@ class SubmitPersonalizedExerciseView(APIView):
                 }, status=200)
 
             # 2. Call OpenAI with the real output for kid-friendly feedback
-            prompt = (
-                f"You are a Python tutor for kids aged 11-16 in Sri Lanka. "
-                f"Evaluate this code with friendly, encouraging feedback:\n\n"
-                f"Exercise: {exercise.question}\n\n"
-                f"Student's Code:\n{user_code}\n\n"
-                f"Output:\n{stdout}\n\n"
-                f"Error:\n{stderr if stderr else 'None'}\n\n"
-                "Provide feedback in JSON format with these keys:\n"
-                "- output: Formatted output explanation\n"
-                "- hints: List of simple hints (max 3)\n"
-                "- suggestions: List of improvement suggestions\n"
-                "- is_correct: boolean\n"
-                "- encouragement: A friendly message praising effort\n"
-                "- focus_area: The main concept to work on\n"
-                "Keep feedback positive and constructive!"
-            )
-
-            chat_response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a friendly Python tutor for kids."},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.7,
-                response_format={ "type": "json_object" }
-            )
-
-            feedback_content = chat_response.choices[0].message.content
+            prompt = exercise_prompt(exercise.question, user_code, stdout, stderr, result.truncated)
+            feedback_content = ask_tutor(EXERCISE_TUTOR, prompt, json_mode=True)
 
             # 3. Parse feedback JSON
             try:
-                feedback = json.loads(feedback_content)
-            except json.JSONDecodeError:
-                if "```json" in feedback_content:
-                    feedback = json.loads(feedback_content.split("```json")[1].split("```")[0])
-                else:
-                    logger.error(f"Invalid JSON from OpenAI: {feedback_content}")
-                    return Response(
-                        {"error": "Invalid feedback format from AI"}, 
-                        status=500
-                    )
+                feedback = parse_feedback(feedback_content)
+            except ValueError:
+                logger.error(f"Invalid JSON from OpenAI: {feedback_content}")
+                return Response(
+                    {"error": "Invalid feedback format from AI"}, 
+                    status=500
+                )
 
             # 4. Check for required keys
-            required_keys = ["output", "hints", "suggestions", "is_correct", "encouragement", "focus_area"]
-            for key in required_keys:
+            for key in EXERCISE_FEEDBACK_KEYS:
                 if key not in feedback:
                     logger.error(f"Missing key in feedback: {key}")
                     return Response(
@@ -589,18 +587,26 @@ class SubmitPersonalizedExerciseView(APIView):
                 feedback["output"] = f"{success_msg}\n" + feedback["output"]
 
             # Translate feedback elements to Tamil
-            feedback["hints"] = [translate_to_tamil(hint) if isinstance(feedback["hints"], list) else translate_to_tamil(feedback["hints"])]
-            feedback["suggestions"] = [translate_to_tamil(suggestion) if isinstance(feedback["suggestions"], list) else translate_to_tamil(feedback["suggestions"])]
+            if isinstance(feedback["hints"], list):
+                feedback["hints"] = [translate_to_tamil(hint) for hint in feedback["hints"]]
+            else:
+                feedback["hints"] = [translate_to_tamil(feedback["hints"])]
+            if isinstance(feedback["suggestions"], list):
+                feedback["suggestions"] = [translate_to_tamil(suggestion) for suggestion in feedback["suggestions"]]
+            else:
+                feedback["suggestions"] = [translate_to_tamil(feedback["suggestions"])]
             feedback["encouragement"] = translate_to_tamil(feedback["encouragement"])
 
             # 6. Update the exercise
             exercise.generated_code = user_code
             exercise.output = feedback["output"]
+            exercise.output_truncated = result.truncated
             exercise.hints = hints
             exercise.suggestions = suggestions
             exercise.is_completed = feedback["is_correct"]
             exercise.attempts += 1
             exercise.save()
+            archive_attempt(request.user, user_code, feedback["is_correct"], exercise_id=exercise.id)
 
             # 7. Update progress if correct
             if feedback["is_correct"]:
@@ -668,4 +674,223 @@ class MarkExerciseCompletedView(APIView):
             
             return Response({"status": "success"}, status=status.HTTP_200_OK)
         except Milestone.DoesNotExist:
-            return Response({"error": "Milestone not found"}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+            return Response({"error": "Milestone not found"}, status=status.HTTP_404_NOT_FOUND)
+
+class ProgressEventBatchView(APIView):
+    """
+    Apply a batch of progress events in one transaction.
+
+    Replaces separate calls to the mark-* and update-milestone endpoints.
+    Events whose idempotency key was already applied are skipped, so the
+    client can safely retry a batch for ``PROGRESS_EVENT_RETENTION_DAYS``.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    EVENT_RELATIONS = {
+        'video_watched': 'watched_videos',
+        'code_completed': 'completed_code',
+        'exercise_completed': 'completed_exercises',
+    }
+
+    def post(self, request):
+        serializer = ProgressEventBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = request.user
+
+        # Last event per key wins inside a batch
+        events = {event['idempotency_key']: event for event in serializer.validated_data['events']}
+
+        milestone_ids = {event['milestone_id'] for event in events.values()}
+        found = set(Milestone.objects.filter(id__in=milestone_ids).values_list('id', flat=True))
+        missing = milestone_ids - found
+        if missing:
+            return Response(
+                {'error': 'Milestone not found', 'milestone_ids': sorted(str(m) for m in missing)},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        with transaction.atomic():
+            UserProgress.objects.get_or_create(user=user)
+            # Row lock serialises concurrent batches for the same user
+            progress = UserProgress.objects.select_for_update().get(user=user)
+
+            seen = set(ProcessedProgressEvent.objects.filter(
+                user=user, idempotency_key__in=events.keys()
+            ).values_list('idempotency_key', flat=True))
+            new_events = [event for key, event in events.items() if key not in seen]
+
+            additions = {relation: set() for relation in self.EVENT_RELATIONS.values()}
+            for event in new_events:
+                if event['type'] == 'current_milestone':
+                    progress.current_milestone_id = event['milestone_id']
+                else:
+                    additions[self.EVENT_RELATIONS[event['type']]].add(event['milestone_id'])
+
+            for relation, ids in additions.items():
+                self._bulk_add(progress, relation, ids)
+
+            # Completing the exercises completes the milestone, as in MarkExerciseCompletedView
+            exercise_ids = additions['completed_exercises']
+            if exercise_ids:
+                already = set(progress.completed_milestones.filter(
+                    id__in=exercise_ids
+                ).values_list('id', flat=True))
+                newly_completed = exercise_ids - already
+                self._bulk_add(progress, 'completed_milestones', newly_completed)
+                progress.score += 100 * len(newly_completed)
+
+            if new_events:
+                progress.save()
+                ProcessedProgressEvent.objects.bulk_create(
+                    [ProcessedProgressEvent(user=user, idempotency_key=event['idempotency_key'])
+                     for event in new_events],
+                    ignore_conflicts=True
+                )
+
+        return Response({
+            'applied': len(new_events),
+            'duplicates': len(events) - len(new_events),
+            'progress': self._compact_state(progress),
+        }, status=status.HTTP_200_OK)
+
+    def _bulk_add(self, progress, relation, milestone_ids):
+        if not milestone_ids:
+            return
+        through = getattr(UserProgress, relation).through
+        through.objects.bulk_create(
+            [through(userprogress_id=progress.pk, milestone_id=milestone_id) for milestone_id in milestone_ids],
+            ignore_conflicts=True
+        )
+
+    def _compact_state(self, progress):
+        state = {
+            'current_milestone': progress.current_milestone_id,
+            'score': progress.score,
+        }
+        for relation in ('completed_milestones', *self.EVENT_RELATIONS.values()):
+            through = getattr(UserProgress, relation).through
+            state[relation] = list(
+                through.objects.filter(userprogress_id=progress.pk).values_list('milestone_id', flat=True)
+            )
+        return state
+
+class CurriculumSearchView(APIView):
+    """Ranked search over lesson transcripts and questions (``?q=...&limit=20``)."""
+    permission_classes = [IsAuthenticated]
+    max_limit = 50
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), self.max_limit)
+        except ValueError:
+            return Response({"error": "limit must be a number"}, status=status.HTTP_400_BAD_REQUEST)
+
+        with timed_phase('search'):
+            results = curriculum_search.search(query[:200], limit)
+        return Response({"query": query, "results": results})
+
+class RunSessionMixin:
+    """Shared by the interactive run views: ``?cursor=``/``wait`` parsing and error mapping."""
+    permission_classes = [IsAuthenticated]
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not sessions.available():
+            raise NotFound("Interactive runs are not available")
+
+    def poll_params(self, params, default_wait):
+        try:
+            cursor = max(int(params.get('cursor', 0)), 0)
+            wait = min(max(float(params.get('wait', default_wait)), 0.0),
+                       settings.CODE_EXECUTION['SESSIONS']['POLL_SECONDS'])
+        except (TypeError, ValueError):
+            return None
+        return {'cursor': cursor, 'wait': wait}
+
+    def send(self, request, session_id, message, status_code=200):
+        try:
+            reply = sessions.send(request.user.id, session_id, message)
+        except sessions.SessionNotFound:
+            return Response({"error": "Session not found or already ended"}, status=404)
+        except sessions.SessionRequestError as e:
+            return Response({"error": str(e)}, status=409)
+        except ExecutionError:
+            return Response({"error": "Code execution failed"}, status=500)
+        if reply.get('final'):  # The first reply after the program ended
+            self.record(request.user, reply)
+        return Response(dict(reply, id=session_id), status=status_code)
+
+    def record(self, user, reply):
+        stderr = ''.join(text for stream, text in reply['events'] if stream == 'stderr')
+        record_execution(ExecutionResult(
+            stderr=stderr,
+            exit_code=reply['exit_code'],
+            signal=reply['signal'],
+            reason=None if reply['reason'] == 'closed' else reply['reason'],  # Stopped by the user
+            wall_ms=reply['wall_ms'],
+            cpu_ms=reply['cpu_ms'],
+            max_rss_kb=reply['max_rss_kb'],
+            output_bytes=reply['output_bytes'],
+        ), user)
+
+class RunSessionView(RunSessionMixin, APIView):
+    """
+    Interactive runs for programs that use ``input()``.
+
+    POST starts the program in its own sandboxed process, kept alive for
+    the session (``CODE_EXECUTION['SESSIONS']``); starting it and the first
+    poll take a scheduler slot like any other run. The client then
+    long-polls the output from a cursor and sends stdin lines when the
+    state is ``waiting_input``, instead of re-running the whole program
+    with every input. ``inputs`` in the final reply can be passed to the
+    submit endpoint for grading.
+    """
+    def post(self, request):
+        code = request.data.get("code", "")
+        if not code:
+            return Response({"error": "No code provided"}, status=400)
+        try:
+            with scheduler.slot(request.user.id, scheduler.weight(request.user)):
+                session_id = sessions.start(request.user.id, code)
+                # Return the first prompt or output if it comes quickly
+                return self.send(request, session_id, {'op': 'poll', 'cursor': 0, 'wait': 1}, status_code=201)
+        except ExecutionBusy as busy:
+            return busy_response(busy)
+        except sessions.SessionLimitReached:
+            response = Response({"status": "busy", "error": "Too many programs are running; try again shortly"},
+                                status=503)
+            response["Retry-After"] = "5"
+            return response
+        except ExecutionError:
+            return Response({"error": "Code execution failed"}, status=500)
+
+class RunSessionDetailView(RunSessionMixin, APIView):
+    """GET long-polls output after ``?cursor=`` for up to ``?wait=`` seconds; DELETE stops the program."""
+    def get(self, request, session_id):
+        params = self.poll_params(request.query_params, settings.CODE_EXECUTION['SESSIONS']['POLL_SECONDS'])
+        if params is None:
+            return Response({"error": "cursor and wait must be numbers"}, status=400)
+        return self.send(request, str(session_id), dict(params, op='poll'))
+
+    def delete(self, request, session_id):
+        response = self.send(request, str(session_id), {'op': 'close'})
+        return Response(status=204) if response.status_code == 200 else response
+
+class RunSessionInputView(RunSessionMixin, APIView):
+    """Send one line of stdin (``line``), or ``eof: true``, and get the output that follows."""
+    def post(self, request, session_id):
+        params = self.poll_params(request.data, 5)
+        if params is None:
+            return Response({"error": "cursor and wait must be numbers"}, status=400)
+        if request.data.get("eof"):
+            return self.send(request, str(session_id), dict(params, op='eof'))
+
+        line = request.data.get("line")
+        if not isinstance(line, str) or '\n' in line:
+            return Response({"error": "line must be a single line of text"}, status=400)
+        if len(line) > settings.CODE_EXECUTION['SESSIONS']['MAX_LINE_CHARS']:
+            return Response({"error": "line is too long"}, status=400)
+        return self.send(request, str(session_id), dict(params, op='input', line=line))
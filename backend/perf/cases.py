@@ -0,0 +1,189 @@
+import json
+import os
+from contextlib import ExitStack, contextmanager
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import get_resolver, reverse
+from django.urls.resolvers import URLResolver
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from execution import sessions
+from user.serializers import MyTokenObtainPairSerializer
+from .seed import SEED_PASSWORD
+
+API_PREFIXES = ('api/auth/', 'api/contact/', 'api/learn/', 'api/perf/')
+
+FAKE_FEEDBACK = {
+    "output": "Looks good.",
+    "hints": "Keep going",
+    "suggestions": "Add comments",
+    "is_correct": True,
+    "encouragement": "Great work!",
+    "focus_area": "variables",
+    "question": "Print the sum of two numbers.",
+    "difficulty": "easy",
+}
+
+
+class Case:
+    """
+    One benchmarked request against a named route.
+
+    ``kwargs``, ``data`` and ``cookies`` may be callables taking
+    ``(ctx, n)`` so repeated runs can use fresh values. ``as_user`` names
+    the seeded account to authenticate as; ``multipart`` sends form data
+    instead of JSON.
+    """
+    def __init__(self, route, method='get', kwargs=None, data=None, auth=True, cookies=None,
+                 label=None, as_user='user', multipart=False):
+        self.route = route
+        self.method = method
+        self.kwargs = kwargs
+        self.data = data
+        self.auth = auth
+        self.as_user = as_user
+        self.multipart = multipart
+        self.cookies = cookies
+        self.label = label or f"{method.upper()} {route}"
+
+    def _value(self, value, ctx, n):
+        return value(ctx, n) if callable(value) else value
+
+    def build(self, ctx, n):
+        path = reverse(self.route, kwargs=self._value(self.kwargs, ctx, n))
+        cookies = {}
+        if self.auth:
+            # Minted as login does: the auth user cache only serves tokens with a version
+            token = MyTokenObtainPairSerializer.get_token(ctx[self.as_user])
+            cookies['access_token'] = str(token.access_token)
+        cookies.update(self._value(self.cookies, ctx, n) or {})
+        return path, self._value(self.data, ctx, n), cookies
+
+
+INTERACTIVE_CODE = "name = input('Name? ')\nprint('Hi', name)"
+
+
+def _waiting_session(ctx, n):
+    """A fresh interactive session that has printed its prompt and waits for input."""
+    session_id = sessions.start(ctx['user'].id, INTERACTIVE_CODE)
+    sessions.send(ctx['user'].id, session_id, {'op': 'poll', 'wait': 5})
+    return {'session_id': session_id}
+
+
+def _with_otp(ctx, n):
+    user = ctx['users'][1]
+    user.otp = '123456'
+    user.otp_created_at = timezone.now()
+    user.save(update_fields=['otp', 'otp_created_at'])
+    return user
+
+
+CASES = [
+    # user
+    Case('register', 'post', auth=False, data=lambda ctx, n: {
+        'username': f'bench{n}', 'email': f'bench{n}@example.com', 'password': SEED_PASSWORD,
+    }),
+    Case('verify-email', 'post', auth=False, data=lambda ctx, n: {
+        'email': _with_otp(ctx, n).email, 'otp': '123456',
+    }),
+    Case('login', 'post', auth=False, data=lambda ctx, n: {
+        'email': ctx['user'].email, 'password': SEED_PASSWORD,
+    }),
+    Case('logout', 'post'),
+    Case('user-detail'),
+    Case('password-reset-request', 'post', auth=False, data=lambda ctx, n: {'email': ctx['user'].email}),
+    Case('password-reset', 'post', auth=False, data=lambda ctx, n: {
+        'email': _with_otp(ctx, n).email, 'otp': '123456', 'new_password': SEED_PASSWORD,
+    }),
+    Case('token-refresh', 'post', auth=False, cookies=lambda ctx, n: {
+        'refresh_token': str(RefreshToken.for_user(ctx['user'])),
+    }),
+    Case('student-import', 'post', as_user='staff', multipart=True, data=lambda ctx, n: {
+        'file': SimpleUploadedFile(
+            'class.csv', f"email,username,password\nimport{n}@example.com,import{n},Import{n}pass\n".encode(),
+            content_type='text/csv'
+        ),
+    }),
+
+    # contact
+    Case('contact-message-create', 'post', auth=False, data=lambda ctx, n: {
+        'full_name': 'Benchmark Parent', 'email': 'parent@example.com', 'message': f'Hello {n}',
+    }),
+
+    # learn
+    Case('milestone-list'),
+    Case('curriculum-search', data=lambda ctx, n: {'q': 'milestone print'}),
+    Case('learn-contents', kwargs=lambda ctx, n: {'milestone_id': ctx['milestone'].id}),
+    Case('code-questions', kwargs=lambda ctx, n: {'milestone_id': ctx['milestone'].id}),
+    Case('submit-code', 'post', kwargs=lambda ctx, n: {'question_id': ctx['code_question'].id},
+         data={'code': "print('hello')"}),
+    Case('run-session-list', 'post', data={'code': INTERACTIVE_CODE}),
+    Case('run-session', kwargs=_waiting_session, data={'cursor': 6, 'wait': 0}),
+    Case('run-session-input', 'post', kwargs=_waiting_session, data={'line': 'Ada', 'cursor': 6}),
+    Case('code-answer-history'),
+    Case('mcq-questions', kwargs=lambda ctx, n: {'milestone_id': ctx['milestone'].id}),
+    Case('mcq-questions', kwargs=lambda ctx, n: {'milestone_id': ctx['milestone'].id},
+         data={'lang': 'ta'}, label='GET mcq-questions?lang=ta'),
+    Case('submit-mcq-answer', 'post', kwargs=lambda ctx, n: {'question_id': ctx['mcq_question'].id},
+         data={'selected_option': 'A'}),
+    Case('mcq-answer-history'),
+    Case('user-progress'),
+    Case('progress-events', 'post', data=lambda ctx, n: {'events': [
+        {'type': event_type, 'milestone_id': str(milestone.id), 'idempotency_key': f'{n}-{event_type}-{milestone.order}'}
+        for milestone in ctx['milestones'][:3]
+        for event_type in ('video_watched', 'code_completed', 'exercise_completed', 'current_milestone')
+    ]}),
+    Case('update-milestone', 'post', data=lambda ctx, n: {'milestone_id': str(ctx['milestone'].id)}),
+    Case('personalized-exercise-list'),
+    Case('personalized-exercise-list', 'post', data={'difficulty': 'easy'}),
+    Case('submit-personalized-exercise', 'post',
+         kwargs=lambda ctx, n: {'exercise_id': ctx['exercise'].id}, data={'code': "print('hello')"}),
+    Case('mark-video-watched', 'post', kwargs=lambda ctx, n: {'milestone_id': ctx['milestone'].id}),
+    Case('mark-code-completed', 'post', kwargs=lambda ctx, n: {'milestone_id': ctx['milestone'].id}),
+    Case('mark-exercise-completed', 'post', kwargs=lambda ctx, n: {'milestone_id': ctx['milestone'].id}),
+
+    # perf
+    Case('metrics', as_user='staff'),
+]
+
+
+def api_route_names():
+    """Names of every route mounted under the API prefixes."""
+    names = set()
+    for pattern in get_resolver().url_patterns:
+        if isinstance(pattern, URLResolver) and str(pattern.pattern) in API_PREFIXES:
+            names.update(p.name for p in pattern.url_patterns if getattr(p, 'name', None))
+    return names
+
+
+def uncovered_routes(cases=CASES):
+    return sorted(api_route_names() - {case.route for case in cases})
+
+
+def _fake_piston(*args, **kwargs):
+    return SimpleNamespace(status_code=200, json=lambda: {"run": {"stdout": "hello\n", "stderr": ""}})
+
+
+def _fake_chat_completion(*args, **kwargs):
+    message = SimpleNamespace(content=json.dumps(FAKE_FEEDBACK))
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@contextmanager
+def offline_services():
+    """Replace Piston, OpenAI, Google Translate and SMTP with in-process fakes."""
+    with ExitStack() as stack:
+        stack.enter_context(override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'))
+        # Interactive sessions run real sandboxes whatever the backend; they refuse root
+        if os.geteuid() == 0 and settings.CODE_EXECUTION['RUN_AS_UID'] is None:
+            stack.enter_context(override_settings(CODE_EXECUTION=dict(settings.CODE_EXECUTION, RUN_AS_UID=65534)))
+        stack.enter_context(mock.patch('execution.sessions.available', lambda: True))
+        stack.enter_context(mock.patch('execution.backends.requests.post', _fake_piston))
+        stack.enter_context(mock.patch('learn.views.openai.ChatCompletion.create', _fake_chat_completion))
+        stack.enter_context(mock.patch('learn.views.translate_to_tamil', lambda text: text))
+        yield
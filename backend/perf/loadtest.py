@@ -0,0 +1,139 @@
+import random
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+from .stats import percentile
+
+LOADTEST_PASSWORD = 'Loadtest123'
+
+
+def loadtest_email(n):
+    return f"loadtest{n}@example.com"
+
+
+class LoadStats:
+    """Thread-safe latency samples keyed by endpoint label."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, label, seconds, ok):
+        with self._lock:
+            self.samples[label].append(seconds * 1000)
+            if not ok:
+                self.errors[label] += 1
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    @property
+    def duration(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def summary(self):
+        rows = []
+        for label in sorted(self.samples):
+            timings = self.samples[label]
+            rows.append({
+                'endpoint': label,
+                'count': len(timings),
+                'errors': self.errors[label],
+                'rps': len(timings) / self.duration if self.duration else 0.0,
+                'p50': percentile(timings, 50),
+                'p95': percentile(timings, 95),
+                'p99': percentile(timings, 99),
+                'max': max(timings),
+            })
+        return rows
+
+
+class Student:
+    """
+    One simulated student working through the course.
+
+    Mirrors what the frontend does per milestone: watch the lesson,
+    submit every code question and MCQ, then move on.
+    """
+    def __init__(self, base_url, email, stats, milestones=3, think_ms=0, rng=None):
+        self.base_url = base_url.rstrip('/')
+        self.email = email
+        self.stats = stats
+        self.milestones = milestones
+        self.think_ms = think_ms
+        self.rng = rng or random.Random()
+        self.session = requests.Session()
+
+    def call(self, method, label, path, json=None):
+        if self.think_ms:
+            time.sleep(self.rng.uniform(0, self.think_ms) / 1000)
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, json=json, timeout=60)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        self.stats.record(f"{method} {label}", time.perf_counter() - start, ok)
+        return response if ok else None
+
+    def data(self, response, default):
+        if response is None:
+            return default
+        body = response.json()
+        # Paginated endpoints wrap their items in "results"
+        return body.get('results', default) if isinstance(body, dict) else body
+
+    def run(self):
+        login = self.call('POST', '/api/auth/login/', '/api/auth/login/',
+                          json={'email': self.email, 'password': LOADTEST_PASSWORD})
+        if login is None:
+            return
+
+        milestones = self.data(self.call('GET', '/api/learn/milestones/', '/api/learn/milestones/'), [])
+        for milestone in milestones[:self.milestones]:
+            base = f"/api/learn/milestones/{milestone['id']}"
+            self.call('GET', '/api/learn/progress/', '/api/learn/progress/')
+            self.call('GET', '/api/learn/milestones/{id}/learn-contents/', f"{base}/learn-contents/")
+            self.call('POST', '/api/learn/milestones/{id}/mark-video-watched/', f"{base}/mark-video-watched/")
+
+            questions = self.data(self.call('GET', '/api/learn/milestones/{id}/questions/', f"{base}/questions/"), [])
+            for question in questions:
+                self.call('POST', '/api/learn/questions/{id}/submit/',
+                          f"/api/learn/questions/{question['id']}/submit/",
+                          json={'code': "print('hello')", 'inputs': []})
+            self.call('POST', '/api/learn/milestones/{id}/mark-code-completed/', f"{base}/mark-code-completed/")
+
+            mcqs = self.data(self.call('GET', '/api/learn/milestones/{id}/mcq-questions/', f"{base}/mcq-questions/"), [])
+            for mcq in mcqs:
+                option = self.rng.choice(sorted(mcq.get('options') or {'A': ''}))
+                self.call('POST', '/api/learn/mcq-questions/{id}/submit/',
+                          f"/api/learn/mcq-questions/{mcq['id']}/submit/",
+                          json={'selected_option': option})
+            self.call('POST', '/api/learn/milestones/{id}/mark-exercise-completed/',
+                      f"{base}/mark-exercise-completed/")
+            self.call('POST', '/api/learn/progress/update-milestone/', '/api/learn/progress/update-milestone/',
+                      json={'milestone_id': milestone['id']})
+
+
+def run_class(base_url, students, milestones=3, think_ms=0, ramp_up=0.0, seed=None):
+    """Run ``students`` concurrent students and return the collected stats."""
+    stats = LoadStats()
+    rng = random.Random(seed)
+    threads = []
+    for n in range(students):
+        student = Student(base_url, loadtest_email(n), stats, milestones=milestones,
+                          think_ms=think_ms, rng=random.Random(rng.random()))
+        thread = threading.Thread(target=student.run, daemon=True)
+        threads.append(thread)
+        thread.start()
+        if ramp_up and students > 1:
+            time.sleep(ramp_up / (students - 1))
+    for thread in threads:
+        thread.join()
+    stats.stop()
+    return stats
@@ -0,0 +1,143 @@
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from perf.cases import CASES, offline_services, uncovered_routes
+from perf.recorder import QueryRecorder
+from perf.seed import seed_dataset
+
+DEFAULT_BASELINE = Path(__file__).resolve().parents[2] / 'baseline.json'
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database, call every API route and compare query "
+        "count, rows fetched and wall time against the stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE),
+                            help="Baseline JSON file to compare against or update.")
+        parser.add_argument('--update-baseline', action='store_true',
+                            help="Write the measured numbers as the new baseline.")
+        parser.add_argument('--repeat', type=int, default=5,
+                            help="Requests per endpoint; medians are reported.")
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--query-slack', type=int, default=0,
+                            help="Extra queries allowed over the baseline.")
+        parser.add_argument('--time-ratio', type=float, default=1.5,
+                            help="Allowed wall time as a multiple of the baseline.")
+        parser.add_argument('--time-floor-ms', type=float, default=5.0,
+                            help="Wall-time regressions below this many ms are ignored.")
+
+    def handle(self, *args, **options):
+        missing = uncovered_routes()
+        if missing:
+            raise CommandError(f"No benchmark case for route(s): {', '.join(missing)}")
+
+        baseline_path = Path(options['baseline'])
+        baseline = {}
+        if baseline_path.exists() and not options['update_baseline']:
+            baseline = json.loads(baseline_path.read_text())
+
+        results = self.run_cases(options)
+
+        if options['update_baseline']:
+            baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {baseline_path}"))
+            self.report(results, {}, options)
+            return
+
+        regressions = self.report(results, baseline, options)
+        if regressions:
+            raise CommandError(f"{regressions} endpoint(s) regressed against {baseline_path}")
+        self.stdout.write(self.style.SUCCESS("No regressions."))
+
+    def run_cases(self, options):
+        """Run every case inside a fresh test database."""
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            ctx = seed_dataset(users=options['users'])
+            client = Client()
+            results = {}
+            with offline_services():
+                for case in CASES:
+                    results[case.label] = self.measure(client, case, ctx, options['repeat'])
+            return results
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def measure(self, client, case, ctx, repeat):
+        timings, queries, rows, statuses = [], [], [], set()
+        for n in range(repeat):
+            path, data, cookies = case.build(ctx, n)
+            client.cookies.clear()
+            for key, value in cookies.items():
+                client.cookies[key] = value
+
+            with QueryRecorder() as recorder:
+                start = time.perf_counter()
+                if case.method == 'get':
+                    response = client.get(path, data)
+                elif case.multipart:
+                    response = getattr(client, case.method)(path, data)
+                else:
+                    response = getattr(client, case.method)(path, data or {}, content_type='application/json')
+                elapsed = time.perf_counter() - start
+
+            timings.append(elapsed * 1000)
+            queries.append(recorder.queries)
+            rows.append(recorder.rows)
+            statuses.add(response.status_code)
+
+        # Medians report the steady state, after any per-process caches are warm
+        return {
+            'queries': statistics.median_low(queries),
+            'rows': statistics.median_low(rows),
+            'wall_ms': round(statistics.median(timings), 2),
+            'status': sorted(statuses),
+        }
+
+    def report(self, results, baseline, options):
+        """Print one line per endpoint and return the number of regressions."""
+        header = f"{'endpoint':<42} {'queries':>9} {'rows':>7} {'wall ms':>9} {'status':>8}  verdict"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+
+        regressions = 0
+        for label, result in results.items():
+            base = baseline.get(label)
+            problems = []
+            if base:
+                if result['queries'] > base['queries'] + options['query_slack']:
+                    problems.append(f"queries {base['queries']} -> {result['queries']}")
+                allowed_ms = max(base['wall_ms'] * options['time_ratio'],
+                                 base['wall_ms'] + options['time_floor_ms'])
+                if result['wall_ms'] > allowed_ms:
+                    problems.append(f"wall {base['wall_ms']} -> {result['wall_ms']} ms")
+            if any(code >= 500 for code in result['status']):
+                problems.append("server error")
+
+            if problems:
+                regressions += 1
+                verdict = self.style.ERROR("REGRESSED: " + "; ".join(problems))
+            elif base:
+                verdict = self.style.SUCCESS("ok")
+            else:
+                verdict = self.style.WARNING("no baseline")
+
+            status = ','.join(str(code) for code in result['status'])
+            self.stdout.write(
+                f"{label:<42} {result['queries']:>9} {result['rows']:>7} "
+                f"{result['wall_ms']:>9.2f} {status:>8}  {verdict}"
+            )
+        return regressions
@@ -0,0 +1,102 @@
+import gzip
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.renderers import JSONRenderer
+
+from backend.middleware import brotli, compress
+from backend.renderers import FastJSONRenderer
+from perf.cases import CASES, offline_services
+from perf.seed import seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Render every benchmarked endpoint's response with the stock and the "
+        "fast JSON renderer, and compare CPU per response and bytes on the wire "
+        "uncompressed, gzipped and brotli-compressed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200,
+                            help="Renders per response when timing.")
+        parser.add_argument('--users', type=int, default=20)
+
+    def handle(self, *args, **options):
+        payloads = self.collect_payloads(options['users'])
+        renderers = {'stdlib': JSONRenderer(), 'fast': FastJSONRenderer()}
+
+        header = (f"{'endpoint':<42} {'stdlib us':>10} {'fast us':>9} {'bytes':>8} "
+                  f"{'gzip':>7} {'br':>7} {'gz us':>7} {'br us':>7}")
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        totals = dict.fromkeys(('stdlib', 'fast', 'bytes', 'gzip', 'br'), 0.0)
+        for label, data in payloads.items():
+            cpu = {name: self.cpu_us(lambda r=r: r.render(data), options['iterations'])
+                   for name, r in renderers.items()}
+            body = renderers['fast'].render(data)
+            gz = compress(body, 'gzip')
+            br = compress(body, 'br') if brotli else b''
+            gz_us = self.cpu_us(lambda: compress(body, 'gzip'), max(1, options['iterations'] // 10))
+            br_us = self.cpu_us(lambda: compress(body, 'br'), max(1, options['iterations'] // 10)) if brotli else 0
+
+            compressible = len(body) >= settings.RESPONSE_COMPRESSION['MIN_SIZE']
+            self.stdout.write(
+                f"{label:<42} {cpu['stdlib']:>10.1f} {cpu['fast']:>9.1f} {len(body):>8} "
+                f"{len(gz) if compressible else '-':>7} {len(br) if compressible and brotli else '-':>7} "
+                f"{gz_us if compressible else 0:>7.0f} {br_us if compressible else 0:>7.0f}"
+            )
+            totals['stdlib'] += cpu['stdlib']
+            totals['fast'] += cpu['fast']
+            totals['bytes'] += len(body)
+            totals['gzip'] += len(gz) if compressible else len(body)
+            totals['br'] += (len(br) if compressible else len(body)) if brotli else 0
+
+        self.stdout.write('-' * len(header))
+        self.stdout.write(
+            f"{'total':<42} {totals['stdlib']:>10.1f} {totals['fast']:>9.1f} {totals['bytes']:>8.0f} "
+            f"{totals['gzip']:>7.0f} {totals['br'] if brotli else '-':>7}"
+        )
+        speedup = totals['stdlib'] / totals['fast'] if totals['fast'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendering {speedup:.1f}x faster; gzip sends {totals['gzip'] / totals['bytes']:.0%} of the bytes"
+            + ("" if brotli else " (brotli not installed)")
+        ))
+
+    def cpu_us(self, func, iterations):
+        start = time.process_time()
+        for _ in range(iterations):
+            func()
+        return (time.process_time() - start) / iterations * 1e6
+
+    def collect_payloads(self, users):
+        """Response data of every case that returns a body, from a seeded throwaway database."""
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            ctx = seed_dataset(users=users)
+            client = Client()
+            payloads = {}
+            with offline_services():
+                for case in CASES:
+                    path, data, cookies = case.build(ctx, 0)
+                    client.cookies.clear()
+                    for key, value in cookies.items():
+                        client.cookies[key] = value
+                    if case.method == 'get':
+                        response = client.get(path, data)
+                    elif case.multipart:
+                        response = getattr(client, case.method)(path, data)
+                    else:
+                        response = getattr(client, case.method)(path, data or {}, content_type='application/json')
+                    if getattr(response, 'data', None) is not None:
+                        payloads[case.label] = response.data
+            return payloads
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
@@ -0,0 +1,73 @@
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+
+from perf.loadtest import LOADTEST_PASSWORD, loadtest_email, run_class
+from user.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate a class of students logging in, reading lessons and "
+        "submitting code and MCQs against a running PyWhiz server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--students', type=int, default=30)
+        parser.add_argument('--milestones', type=int, default=3,
+                            help="Milestones each student works through.")
+        parser.add_argument('--think-ms', type=float, default=0,
+                            help="Upper bound of the random pause before each request.")
+        parser.add_argument('--ramp-up', type=float, default=0,
+                            help="Seconds over which students are started.")
+        parser.add_argument('--seed', type=int, default=None)
+        parser.add_argument('--create-users', action='store_true',
+                            help="Create the loadtest accounts in the configured database first.")
+
+    def handle(self, *args, **options):
+        if options['create_users']:
+            self.create_users(options['students'])
+
+        self.stdout.write(
+            f"Running {options['students']} students x {options['milestones']} milestones "
+            f"against {options['base_url']}"
+        )
+        stats = run_class(
+            options['base_url'],
+            options['students'],
+            milestones=options['milestones'],
+            think_ms=options['think_ms'],
+            ramp_up=options['ramp_up'],
+            seed=options['seed'],
+        )
+        self.report(stats)
+
+    def create_users(self, count):
+        password = make_password(LOADTEST_PASSWORD)
+        created = 0
+        for n in range(count):
+            _, was_created = User.objects.get_or_create(
+                email=loadtest_email(n),
+                defaults={'username': f"loadtest{n}", 'password': password, 'email_verified': True},
+            )
+            created += was_created
+        self.stdout.write(f"Created {created} loadtest account(s)")
+
+    def report(self, stats):
+        rows = stats.summary()
+        total = sum(row['count'] for row in rows)
+        errors = sum(row['errors'] for row in rows)
+
+        header = (f"{'endpoint':<56} {'count':>6} {'err':>5} {'req/s':>7} "
+                  f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for row in rows:
+            self.stdout.write(
+                f"{row['endpoint']:<56} {row['count']:>6} {row['errors']:>5} {row['rps']:>7.1f} "
+                f"{row['p50']:>8.1f} {row['p95']:>8.1f} {row['p99']:>8.1f} {row['max']:>8.1f}"
+            )
+        self.stdout.write('-' * len(header))
+        summary = (f"{total} requests in {stats.duration:.1f}s "
+                   f"({total / stats.duration:.1f} req/s), {errors} error(s); latencies in ms")
+        self.stdout.write(self.style.ERROR(summary) if errors else self.style.SUCCESS(summary))
@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from execution.backends import BACKENDS
+from execution.forkserver import pool
+from perf.replay import TUTORS, replay, stored_submissions
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay stored code answers and personalized exercises through the grading "
+        "pipeline and report throughput, latency percentiles and how often the verdict "
+        "differs from the stored one. Nothing is written back; error messages are not "
+        "translated as they are in the submit views."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', choices=['code', 'exercise', 'all'], default='all')
+        parser.add_argument('--limit', type=int, default=None, help="Replay at most this many submissions.")
+        parser.add_argument('--chunk-size', type=int, default=500, help="Rows fetched per database round trip.")
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--executor', choices=sorted(BACKENDS), default=None,
+                            help="Defaults to CODE_EXECUTION['BACKEND'].")
+        parser.add_argument('--tutor', choices=sorted(TUTORS), default='heuristic',
+                            help="openai calls the real model (and costs money); heuristic and "
+                                 "stored run offline.")
+        parser.add_argument('--show-changes', type=int, default=10,
+                            help="List up to this many submissions whose verdict changed.")
+
+    def handle(self, *args, **options):
+        executor = options['executor'] or settings.CODE_EXECUTION['BACKEND']
+        submissions = stored_submissions(options['source'], options['limit'], options['chunk_size'])
+        self.stdout.write(
+            f"Replaying {options['source']} submissions: executor={executor}, "
+            f"tutor={options['tutor']}, concurrency={options['concurrency']}"
+        )
+        try:
+            stats = replay(submissions, executor, options['tutor'], options['concurrency'],
+                           keep_changes=options['show_changes'])
+        finally:
+            if executor == 'forkserver':
+                pool.close()
+        self.report(stats)
+
+    def report(self, stats):
+        if not stats.count:
+            self.stdout.write(self.style.WARNING("No submissions to replay"))
+            return
+
+        header = f"{'phase':<10} {'count':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for row in stats.latency_rows():
+            self.stdout.write(
+                f"{row['phase']:<10} {row['count']:>7} {row['p50']:>9.1f} {row['p95']:>9.1f} "
+                f"{row['p99']:>9.1f} {row['max']:>9.1f}"
+            )
+        self.stdout.write('-' * len(header))
+
+        graded = sum(stats.verdicts.values())
+        agreed = stats.verdicts[(True, True)] + stats.verdicts[(False, False)]
+        self.stdout.write(
+            f"Verdicts: {agreed}/{graded} unchanged ({agreed / graded:.1%})" if graded else "Verdicts: none graded"
+        )
+        if graded:
+            self.stdout.write(
+                f"  correct -> incorrect: {stats.verdicts[(True, False)]}, "
+                f"incorrect -> correct: {stats.verdicts[(False, True)]}"
+            )
+        self.stdout.write(
+            f"No verdict: {stats.statuses['input_required']} need input, {stats.statuses['error']} error(s)"
+        )
+        for error, count in stats.errors.most_common(5):
+            self.stdout.write(f"  {error}: {count}")
+        for change in stats.changes:
+            submission = change.submission
+            self.stdout.write(
+                f"  changed {submission.kind} {submission.id}: "
+                f"{'correct' if submission.stored_correct else 'incorrect'} -> "
+                f"{'correct' if change.verdict else 'incorrect'}"
+            )
+
+        summary = (f"{stats.count} submissions in {stats.duration:.1f}s "
+                   f"({stats.count / stats.duration:.1f}/s); latencies in ms")
+        self.stdout.write(self.style.ERROR(summary) if stats.statuses['error'] else self.style.SUCCESS(summary))
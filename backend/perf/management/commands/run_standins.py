@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from perf.standins import STANDINS, Latency, start_standin
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve local stand-ins for Piston, OpenAI and Google Translate. "
+        "Start the Django app with the printed environment variables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--base-port', type=int, default=8901,
+                            help="Piston listens here, OpenAI and Translate on the next two ports.")
+        for name in STANDINS:
+            parser.add_argument(f'--{name}-latency', default='fixed:0',
+                                help="fixed:MS, uniform:LO:HI, normal:MEAN:SD or lognormal:MU:SIGMA")
+            parser.add_argument(f'--{name}-error-rate', type=float, default=0.0,
+                                help="Fraction of requests answered with an error status.")
+
+    def handle(self, *args, **options):
+        servers = []
+        for offset, name in enumerate(STANDINS):
+            try:
+                latency = Latency(options[f'{name}_latency'])
+            except ValueError as e:
+                raise CommandError(str(e))
+            server, env_var, url = start_standin(
+                name,
+                host=options['host'],
+                port=options['base_port'] + offset,
+                latency=latency,
+                error_rate=options[f'{name}_error_rate'],
+            )
+            servers.append(server)
+            self.stdout.write(f"{name:<10} latency={latency} errors={options[f'{name}_error_rate']:.0%}")
+            self.stdout.write(f"  export {env_var}={url}")
+
+        self.stdout.write(self.style.SUCCESS("Stand-ins running, Ctrl+C to stop."))
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            for server in servers:
+                server.shutdown()
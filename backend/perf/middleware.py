@@ -0,0 +1,25 @@
+from django.db import connection
+
+from .timing import db_timer, record, request_timer, server_timing_header
+
+
+class RequestTimingMiddleware:
+    """
+    Split each request's wall time into phases (db, piston, openai,
+    translate, app) and expose it via ``Server-Timing`` and /api/perf/metrics/.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_timer() as timer, connection.execute_wrapper(db_timer):
+            response = self.get_response(request)
+
+        breakdown = timer.breakdown()
+        response['Server-Timing'] = server_timing_header(timer, breakdown)
+
+        match = getattr(request, 'resolver_match', None)
+        # Route templates rather than paths keep label cardinality bounded
+        route = '/' + match.route if match and match.route else 'unmatched'
+        record(route, request.method, response.status_code, breakdown)
+        return response
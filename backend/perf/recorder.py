@@ -0,0 +1,36 @@
+import time
+
+from django.db import connection
+
+
+class QueryRecorder:
+    """
+    Count queries, rows and time spent in the database while active.
+
+    Rows come from the DB-API ``rowcount``; MySQL reports it for SELECTs,
+    backends that don't (SQLite) contribute nothing for reads.
+    """
+    def __init__(self, using=connection):
+        self.connection = using
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+            rowcount = getattr(context.get('cursor'), 'rowcount', -1)
+            if rowcount and rowcount > 0:
+                self.rows += rowcount
+
+    def __enter__(self):
+        self._wrapper = self.connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._wrapper.__exit__(*exc_info)
@@ -0,0 +1,165 @@
+"""
+Replay stored submissions through the grading pipeline.
+
+Used by the ``replay_submissions`` command to measure grading throughput
+and how often verdicts change when the executor, the tutor model or the
+prompts change. Rows are streamed from the database; grading runs in a
+thread pool and never writes anything back.
+"""
+import itertools
+import threading
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from execution.backends import BACKENDS
+from learn.grading import (
+    CODE_TUTOR, EXERCISE_TUTOR, ask_tutor, code_prompt, exercise_prompt, needs_input, parse_feedback,
+)
+from learn.models import PersonalizedExercise, UserCodeAnswer
+from .stats import percentile
+
+Submission = namedtuple('Submission', 'kind id question code stored_correct')
+Graded = namedtuple('Graded', 'submission status verdict total_ms execute_ms tutor_ms error')
+
+
+def stored_submissions(source='all', limit=None, chunk_size=500):
+    """Yield ``Submission``s, oldest first, fetching ``chunk_size`` rows at a time."""
+    streams = []
+    if source in ('code', 'all'):
+        rows = UserCodeAnswer.objects.order_by('created_at').values_list(
+            'id', 'question__question', 'user_code', 'is_correct',
+        ).iterator(chunk_size=chunk_size)
+        streams.append(Submission('code', *row) for row in rows)
+    if source in ('exercise', 'all'):
+        rows = PersonalizedExercise.objects.exclude(generated_code='').order_by('created_at').values_list(
+            'id', 'question', 'generated_code', 'is_completed',
+        ).iterator(chunk_size=chunk_size)
+        streams.append(Submission('exercise', *row) for row in rows)
+    return itertools.islice(itertools.chain(*streams), limit)
+
+
+def openai_tutor(submission, prompt, result):
+    """The production model and prompts."""
+    if submission.kind == 'code':
+        return parse_feedback(ask_tutor(CODE_TUTOR, prompt))
+    return parse_feedback(ask_tutor(EXERCISE_TUTOR, prompt, json_mode=True))
+
+
+def heuristic_tutor(submission, prompt, result):
+    """Offline stand-in: correct when the program ran cleanly and printed something."""
+    return {'is_correct': result.outcome == 'ok' and bool(result.stdout.strip())}
+
+
+def stored_tutor(submission, prompt, result):
+    """Keeps the stored verdict, to time the executor alone."""
+    return {'is_correct': submission.stored_correct}
+
+
+TUTORS = {
+    'openai': openai_tutor,
+    'heuristic': heuristic_tutor,
+    'stored': stored_tutor,
+}
+
+
+def grade(submission, executor, tutor):
+    """Run one submission through execute -> prompt -> tutor, as the submit views do."""
+    started = time.perf_counter()
+    execute_ms = tutor_ms = None
+    try:
+        result = executor(submission.code, '')
+        execute_ms = (time.perf_counter() - started) * 1000
+        stdout, stderr = result.stdout.strip(), result.stderr.strip()
+        if needs_input(stderr):
+            # Inputs aren't stored, so there is nothing to feed the program
+            return Graded(submission, 'input_required', None, execute_ms, execute_ms, None, None)
+
+        build_prompt = code_prompt if submission.kind == 'code' else exercise_prompt
+        prompt = build_prompt(submission.question, submission.code, stdout, stderr, result.truncated)
+        tutor_started = time.perf_counter()
+        feedback = tutor(submission, prompt, result)
+        tutor_ms = (time.perf_counter() - tutor_started) * 1000
+        if 'is_correct' not in feedback:
+            raise ValueError("Feedback has no is_correct")
+        status, verdict, error = 'graded', bool(feedback['is_correct']), None
+    except Exception as e:  # Executor or model API failures, bad feedback: count them and keep going
+        status, verdict, error = 'error', None, f"{type(e).__name__}: {e}"
+    total_ms = (time.perf_counter() - started) * 1000
+    return Graded(submission, status, verdict, total_ms, execute_ms, tutor_ms, error)
+
+
+class ReplayStats:
+    """Latencies, statuses and verdict changes of a replay."""
+    def __init__(self, keep_changes=20):
+        self._lock = threading.Lock()
+        self.keep_changes = keep_changes
+        self.timings = {'total': [], 'execute': [], 'tutor': []}
+        self.statuses = Counter()
+        self.verdicts = Counter()  # (stored, replayed) for graded submissions
+        self.changes = []
+        self.errors = Counter()
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def add(self, graded):
+        with self._lock:
+            self.statuses[graded.status] += 1
+            self.timings['total'].append(graded.total_ms)
+            if graded.execute_ms is not None:
+                self.timings['execute'].append(graded.execute_ms)
+            if graded.tutor_ms is not None:
+                self.timings['tutor'].append(graded.tutor_ms)
+            if graded.error:
+                self.errors[graded.error.split(':', 1)[0]] += 1
+            if graded.status == 'graded':
+                stored = bool(graded.submission.stored_correct)
+                self.verdicts[(stored, graded.verdict)] += 1
+                if stored != graded.verdict and len(self.changes) < self.keep_changes:
+                    self.changes.append(graded)
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    @property
+    def duration(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def count(self):
+        return sum(self.statuses.values())
+
+    def latency_rows(self):
+        return [
+            {
+                'phase': phase,
+                'count': len(values),
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'p99': percentile(values, 99),
+                'max': max(values),
+            }
+            for phase, values in self.timings.items() if values
+        ]
+
+
+def replay(submissions, executor='piston', tutor='heuristic', concurrency=4, keep_changes=20):
+    """
+    Grade ``submissions`` with ``concurrency`` threads and return
+    ``ReplayStats``. At most twice ``concurrency`` submissions are held in
+    memory at once, however many rows the query yields.
+    """
+    run, judge = BACKENDS[executor], TUTORS[tutor]
+    stats = ReplayStats(keep_changes)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        in_flight = set()
+        for submission in submissions:
+            if len(in_flight) >= concurrency * 2:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stats.add(future.result())
+            in_flight.add(pool.submit(grade, submission, run, judge))
+        for future in wait(in_flight).done:
+            stats.add(future.result())
+    stats.stop()
+    return stats
@@ -0,0 +1,130 @@
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from learn.models import (
+    Milestone, LearnContent, CodeQuestion,
+    UserCodeAnswer, MCQQuestion, UserMCQAnswer,
+    UserProgress, PersonalizedExercise
+)
+from user.models import User
+
+SEED_PASSWORD = 'Benchmark123'
+
+TRANSCRIPT = (
+    "In this lesson we learn how Python stores values in variables, "
+    "how to print them and how to combine them with operators. "
+) * 40
+
+
+@transaction.atomic
+def seed_dataset(milestones=15, users=20, exercises_per_user=30, seed=42):
+    """
+    Create a course and a class of students with realistic history.
+
+    Returns a dict with the objects the benchmark cases need.
+    """
+    rng = random.Random(seed)
+
+    milestone_objs = Milestone.objects.bulk_create([
+        Milestone(title=f"Milestone {n}", description=f"Concepts for milestone {n}", order=n)
+        for n in range(1, milestones + 1)
+    ])
+
+    LearnContent.objects.bulk_create([
+        LearnContent(
+            milestone=milestone,
+            video_url=f"https://videos.example.com/{milestone.order}/{n}",
+            transcript=TRANSCRIPT,
+            order=n,
+            is_additional=n > 0,
+            title=f"Video {n}",
+        )
+        for milestone in milestone_objs
+        for n in range(3)
+    ])
+
+    code_questions = CodeQuestion.objects.bulk_create([
+        CodeQuestion(
+            milestone=milestone,
+            question=f"Write a program for task {n} of milestone {milestone.order}.",
+            example_code="print('hello')",
+            hint="Use print().",
+            order=n,
+        )
+        for milestone in milestone_objs
+        for n in range(3)
+    ])
+
+    mcq_questions = MCQQuestion.objects.bulk_create([
+        MCQQuestion(
+            milestone=milestone,
+            question_text=f"Question {n} about milestone {milestone.order}?",
+            options={'A': 'First', 'B': 'Second', 'C': 'Third', 'D': 'Fourth'},
+            correct_answer='A',
+            explanation="The first option is correct.",
+            order=n,
+        )
+        for milestone in milestone_objs
+        for n in range(5)
+    ])
+
+    # Saved one by one: MySQL does not return auto-increment ids from bulk_create
+    password = make_password(SEED_PASSWORD)
+    user_objs = []
+    for n in range(users):
+        user = User(username=f"student{n}", email=f"student{n}@example.com",
+                    email_verified=True, password=password)
+        user.save()
+        user_objs.append(user)
+    staff = User.objects.create(username="teacher", email="teacher@example.com",
+                                email_verified=True, is_staff=True, password=password)
+
+    code_answers, mcq_answers, exercises = [], [], []
+    for user in user_objs:
+        for question in rng.sample(code_questions, k=min(20, len(code_questions))):
+            code_answers.append(UserCodeAnswer(
+                user=user,
+                question=question,
+                user_code="print('hello')",
+                output="hello",
+                is_correct=rng.random() > 0.3,
+                attempts=rng.randint(1, 4),
+            ))
+        for question in rng.sample(mcq_questions, k=min(40, len(mcq_questions))):
+            option = rng.choice('ABCD')
+            mcq_answers.append(UserMCQAnswer(
+                user=user,
+                question=question,
+                selected_option=option,
+                is_correct=option == question.correct_answer,
+            ))
+        for n in range(exercises_per_user):
+            exercises.append(PersonalizedExercise(
+                user=user,
+                question=f"Exercise {n} for {user.username}",
+                hints="- Think step by step",
+            ))
+    UserCodeAnswer.objects.bulk_create(code_answers)
+    UserMCQAnswer.objects.bulk_create(mcq_answers)
+    PersonalizedExercise.objects.bulk_create(exercises)
+
+    done = milestone_objs[:max(1, milestones // 3)]
+    for user in user_objs:
+        progress = UserProgress.objects.create(user=user, current_milestone=done[-1], score=250)
+        progress.completed_milestones.add(*done)
+        progress.watched_videos.add(*done)
+        progress.completed_code.add(*done)
+        progress.completed_exercises.add(*done)
+
+    return {
+        'user': user_objs[0],
+        'users': user_objs,
+        'staff': staff,
+        'milestone': milestone_objs[0],
+        'milestones': milestone_objs,
+        'code_question': code_questions[0],
+        'mcq_question': mcq_questions[0],
+        'exercise': PersonalizedExercise.objects.filter(user=user_objs[0]).first(),
+    }
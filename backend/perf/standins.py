@@ -0,0 +1,169 @@
+"""
+Local stand-ins for the services the submission path calls out to.
+
+Each server mimics just enough of the real API for ``learn.views`` to work:
+Piston's ``/api/v2/piston/execute``, OpenAI's ``/v1/chat/completions`` and
+Google Translate's mobile page. Latency and failures are injected per
+request so load tests can see how the app behaves when a dependency is slow
+or flaky.
+"""
+import html
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .cases import FAKE_FEEDBACK
+
+
+class Latency:
+    """
+    Latency distribution parsed from a spec string, in milliseconds.
+
+    ``fixed:50``, ``uniform:20:80``, ``normal:100:25`` or
+    ``lognormal:4.5:0.5`` (mu and sigma of the underlying normal).
+    """
+    def __init__(self, spec='fixed:0'):
+        kind, *params = spec.split(':')
+        try:
+            params = [float(p) for p in params]
+        except ValueError:
+            raise ValueError(f"Invalid latency spec: {spec}")
+        samplers = {
+            'fixed': (1, lambda p: p[0]),
+            'uniform': (2, lambda p: random.uniform(p[0], p[1])),
+            'normal': (2, lambda p: random.gauss(p[0], p[1])),
+            'lognormal': (2, lambda p: random.lognormvariate(p[0], p[1])),
+        }
+        if kind not in samplers or len(params) != samplers[kind][0]:
+            raise ValueError(f"Invalid latency spec: {spec}")
+        self.spec = spec
+        self._sample = samplers[kind][1]
+        self._params = params
+
+    def sample(self):
+        """Seconds to wait for one request."""
+        return max(0.0, self._sample(self._params)) / 1000
+
+    def __str__(self):
+        return self.spec
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    latency = Latency()
+    error_rate = 0.0
+    error_status = 500
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_html(self, markup, status=200):
+        body = markup.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def simulate(self):
+        """Sleep for the configured latency; return False if this request should fail."""
+        time.sleep(self.latency.sample())
+        if random.random() < self.error_rate:
+            self.send_json({'error': 'injected failure'}, status=self.error_status)
+            return False
+        return True
+
+
+class PistonHandler(StandInHandler):
+    def do_POST(self):
+        payload = self.read_json()
+        if not self.simulate():
+            return
+        code = ''.join(f.get('content', '') for f in payload.get('files', []))
+        stdin = payload.get('stdin', '')
+        if 'input(' in code and not stdin:
+            run = {
+                'stdout': '',
+                'stderr': 'Traceback (most recent call last):\nEOFError: EOF when reading a line\n',
+                'code': 1,
+            }
+        else:
+            run = {'stdout': 'hello\n', 'stderr': '', 'code': 0}
+        self.send_json({'language': 'python', 'version': '3.10.0', 'run': run})
+
+
+class OpenAIHandler(StandInHandler):
+    def do_POST(self):
+        payload = self.read_json()
+        if not self.simulate():
+            return
+        self.send_json({
+            'id': f"chatcmpl-{uuid.uuid4().hex}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': payload.get('model', 'gpt-3.5-turbo'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': json.dumps(FAKE_FEEDBACK)},
+                'finish_reason': 'stop',
+            }],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+        })
+
+
+class TranslateHandler(StandInHandler):
+    error_status = 429
+
+    def do_GET(self):
+        if not self.simulate():
+            return
+        query = parse_qs(urlparse(self.path).query)
+        text = query.get('q', [''])[0]
+        target = query.get('tl', ['ta'])[0]
+        self.send_html(f'<html><body><div class="t0">[{target}] {html.escape(text)}</div></body></html>')
+
+
+STANDINS = {
+    'piston': (PistonHandler, 'PISTON_EXECUTE_URL', '/api/v2/piston/execute'),
+    'openai': (OpenAIHandler, 'OPENAI_API_BASE', '/v1'),
+    'translate': (TranslateHandler, 'GOOGLE_TRANSLATE_URL', '/m'),
+}
+
+
+def start_standin(name, host='127.0.0.1', port=0, latency=None, error_rate=0.0):
+    """
+    Start one stand-in in a daemon thread.
+
+    Returns ``(server, env_var, url)``; ``url`` is the value the Django
+    app should be started with for ``env_var``.
+    """
+    handler, env_var, path = STANDINS[name]
+    handler_class = type(handler.__name__, (handler,), {
+        'latency': latency or Latency(),
+        'error_rate': error_rate,
+    })
+    server = ThreadingHTTPServer((host, port), handler_class)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://{host}:{server.server_address[1]}{path}"
+    return server, env_var, url
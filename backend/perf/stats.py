@@ -0,0 +1,10 @@
+import math
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values`` (need not be sorted)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
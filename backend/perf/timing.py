@@ -0,0 +1,103 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from .metrics import Counter, Histogram
+
+_current = ContextVar('request_timer', default=None)
+
+PHASE_SECONDS = Histogram(
+    'pywhiz_request_phase_seconds',
+    'Time spent in each phase of a request.',
+    labelnames=('route', 'phase'),
+)
+REQUESTS_TOTAL = Counter(
+    'pywhiz_requests_total',
+    'Requests handled, by route, method and status code.',
+    labelnames=('route', 'method', 'status'),
+)
+
+
+class RequestTimer:
+    """Accumulates wall time per named phase for one request."""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.counts = {}
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def breakdown(self):
+        """Phase durations plus ``app`` (time not attributed elsewhere) and ``total``."""
+        total = self.total()
+        phases = dict(self.phases)
+        phases['app'] = max(0.0, total - sum(self.phases.values()))
+        phases['total'] = total
+        return phases
+
+
+def current_timer():
+    return _current.get()
+
+
+@contextmanager
+def timed_phase(phase):
+    """Attribute the time spent in the block to ``phase`` of the current request."""
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(phase, time.perf_counter() - start)
+
+
+def timed(phase):
+    """Decorator form of ``timed_phase``."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed_phase(phase):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def db_timer(execute, sql, params, many, context):
+    """``connection.execute_wrapper`` hook charging queries to the ``db`` phase."""
+    with timed_phase('db'):
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def request_timer():
+    timer = RequestTimer()
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+
+
+def server_timing_header(timer, breakdown):
+    parts = []
+    for phase, seconds in breakdown.items():
+        entry = f"{phase};dur={seconds * 1000:.1f}"
+        if phase in timer.counts:
+            entry += f';desc="{timer.counts[phase]} call(s)"'
+        parts.append(entry)
+    return ', '.join(parts)
+
+
+def record(route, method, status, breakdown):
+    for phase, seconds in breakdown.items():
+        PHASE_SECONDS.observe(seconds, route=route, phase=phase)
+    REQUESTS_TOTAL.inc(route=route, method=method, status=status)
@@ -1,8 +1,52 @@
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
-from rest_framework_simplejwt.tokens import AccessToken
-from datetime import datetime, timedelta
+from rest_framework_simplejwt.settings import api_settings
+from .tokens import get_token_context
+
+# Columns kept in the authenticated-user cache. Anything else (password,
+# otp) is deferred and loaded from the database on first access.
+CACHED_USER_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name', 'email_verified',
+    'is_active', 'is_staff', 'is_superuser', 'last_login', 'date_joined',
+)
+
+def token_version(user):
+    """Changes whenever the user's password changes."""
+    return user.get_session_auth_hash()[:16]
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+def user_cache_timeout():
+    """
+    A per-process cache only sees invalidations made by its own worker,
+    so entries there are kept just long enough to absorb a page's burst of
+    API calls.
+    """
+    if settings.CACHES['default']['BACKEND'].endswith('LocMemCache'):
+        return min(settings.AUTH_USER_CACHE_TIMEOUT, settings.AUTH_USER_LOCAL_CACHE_TIMEOUT)
+    return settings.AUTH_USER_CACHE_TIMEOUT
+
+def cache_user(user):
+    values = {field: getattr(user, field) for field in CACHED_USER_FIELDS}
+    cache.set(
+        user_cache_key(user.pk),
+        {'ver': token_version(user), 'values': values},
+        user_cache_timeout()
+    )
+
+def invalidate_cached_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+def user_from_cache(entry):
+    model = get_user_model()
+    values = entry['values']
+    # from_db expects values in concrete field order
+    names = [f.attname for f in model._meta.concrete_fields if f.attname in values]
+    return model.from_db('default', names, [values[name] for name in names])
 
 class CookieJWTAuthentication(JWTAuthentication):
     def authenticate(self, request):
@@ -10,26 +54,55 @@ class CookieJWTAuthentication(JWTAuthentication):
         if request.path in ['/api/token/refresh/', '/api/login/']:
             return None
             
-        raw_token = request.COOKIES.get(settings.SIMPLE_JWT['AUTH_COOKIE'])
-        raw_refresh_token = request.COOKIES.get(settings.SIMPLE_JWT['AUTH_COOKIE_REFRESH'])
+        # Cookies are parsed and verified once per request (see user.tokens)
+        context = get_token_context(request)
         
-        if not raw_token and not raw_refresh_token:
+        if not context.raw_access and not context.raw_refresh:
             return None
         
         try:
-            if raw_token:
-                validated_token = self.get_validated_token(raw_token)
+            if context.raw_access:
+                validated_token = context.access_token
+                if validated_token is None:
+                    raise InvalidToken(str(context.access_error))
                 user = self.get_user(validated_token)
                 return (user, validated_token)
                 
             return None
             
         except InvalidToken as e:
-            if raw_refresh_token:
-                try:
-                    AccessToken(raw_token, verify=False)
+            if context.raw_refresh:
+                if context.access_expires_at is not None:
                     # Token is expired but refresh available
                     return None
-                except Exception:
-                    raise AuthenticationFailed('Your session is invalid. Please log in again.')
-            raise AuthenticationFailed('Please log in to continue.')
\ No newline at end of file
+                raise AuthenticationFailed('Your session is invalid. Please log in again.')
+            raise AuthenticationFailed('Please log in to continue.')
+
+    def get_user(self, validated_token):
+        """
+        Resolve the token's user from the cache, falling back to the database.
+
+        Tokens carry a ``ver`` claim (see ``MyTokenObtainPairSerializer``);
+        a password change moves the user to a new version, so older tokens
+        no longer match the cache and are rejected once the row is reloaded.
+        Tokens without the claim are always checked against the database.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        version = validated_token.get('ver')
+        entry = cache.get(user_cache_key(user_id)) if version is not None else None
+        if entry and entry['ver'] == version:
+            if not entry['values']['is_active']:
+                raise AuthenticationFailed('User is inactive', code='user_inactive')
+            return user_from_cache(entry)
+
+        user = super().get_user(validated_token)
+        if not user.is_active:  # Whatever CHECK_USER_IS_ACTIVE says
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if version is not None and version != token_version(user):
+            raise AuthenticationFailed('Your session is invalid. Please log in again.')
+        cache_user(user)
+        return user
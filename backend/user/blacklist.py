@@ -0,0 +1,125 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings."""
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: two 64-bit halves of one digest give all k positions
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class BlacklistFilter:
+    """
+    In-memory filter of blacklisted refresh-token jtis.
+
+    A negative answer means the jti is definitely not blacklisted and the
+    database lookup can be skipped. Rows blacklisted by other workers are
+    picked up incrementally (by primary key) at most
+    ``TOKEN_BLACKLIST_FILTER['SYNC_SECONDS']`` apart. Ids are allocated
+    before commit, so each sync re-reads the last ``SYNC_OVERLAP_ROWS`` ids
+    below the high-water mark to catch transactions that committed late.
+    Tokens blacklisted in this worker are added immediately. The filter is rebuilt from scratch
+    periodically, or when it outgrows its capacity, so pruned rows drop out.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._high_water = 0
+        self._synced_at = 0.0
+        self._built_at = 0.0
+
+    @property
+    def config(self):
+        return settings.TOKEN_BLACKLIST_FILTER
+
+    def _rows(self, after_id=0):
+        # Expired tokens fail the exp check before the blacklist is consulted
+        return BlacklistedToken.objects.filter(
+            id__gt=after_id, token__expires_at__gt=timezone.now()
+        ).values_list('id', 'token__jti').order_by('id').iterator(chunk_size=5000)
+
+    def _rebuild(self):
+        live = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now()).count()
+        capacity = max(self.config['CAPACITY'], live * 2)
+        bloom = BloomFilter(capacity, self.config['ERROR_RATE'])
+        high_water = 0
+        for row_id, jti in self._rows():
+            bloom.add(jti)
+            high_water = row_id
+        self._filter = bloom
+        self._high_water = high_water
+        self._built_at = self._synced_at = time.monotonic()
+
+    def _sync(self):
+        after_id = max(0, self._high_water - self.config['SYNC_OVERLAP_ROWS'])
+        for row_id, jti in self._rows(after_id):
+            if jti not in self._filter:  # Re-read rows mustn't count twice towards capacity
+                self._filter.add(jti)
+            self._high_water = max(self._high_water, row_id)
+        self._synced_at = time.monotonic()
+
+    def _refresh(self):
+        now = time.monotonic()
+        if (self._filter is None
+                or self._filter.count > self._filter.capacity
+                or now - self._built_at > self.config['REBUILD_SECONDS']):
+            self._rebuild()
+        elif now - self._synced_at >= self.config['SYNC_SECONDS']:
+            self._sync()
+
+    def might_contain(self, jti):
+        with self._lock:
+            self._refresh()
+            return jti in self._filter
+
+    def add(self, jti):
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    def reset(self):
+        with self._lock:
+            self._filter = None
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class FilteredRefreshToken(RefreshToken):
+    """Refresh token whose blacklist check goes through ``blacklist_filter`` first."""
+    def check_blacklist(self):
+        if blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist_filter.add(self.payload[api_settings.JTI_CLAIM])
+        return result
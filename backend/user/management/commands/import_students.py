@@ -0,0 +1,66 @@
+import csv
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from learn.models import Milestone
+from user.provisioning import StudentImporter, read_students
+
+
+class Command(BaseCommand):
+    help = (
+        "Create student accounts and progress rows from a CSV with email, "
+        "username and optional password columns."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path')
+        parser.add_argument('--milestone-order', type=int, default=None,
+                            help="Milestone students start on (default: the first one).")
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Password hashing processes (default: CPU count).")
+        parser.add_argument('--credentials-out', default=None,
+                            help="Write generated passwords to this CSV file.")
+
+    def handle(self, *args, **options):
+        milestone = self.get_milestone(options['milestone_order'])
+        importer = StudentImporter(
+            chunk_size=options['chunk_size'], workers=options['workers'] or os.cpu_count() or 1,
+            milestone=milestone,
+        )
+
+        start = time.perf_counter()
+        with open(options['csv_path'], newline='', encoding='utf-8-sig') as f:
+            summary = importer.run(read_students(f))
+        elapsed = time.perf_counter() - start
+
+        for skipped in summary['skipped']:
+            self.stdout.write(self.style.WARNING(f"Line {skipped['line']}: {skipped['reason']}"))
+
+        if summary['credentials']:
+            if options['credentials_out']:
+                with open(options['credentials_out'], 'w', newline='') as out:
+                    writer = csv.DictWriter(out, fieldnames=['email', 'username', 'password'])
+                    writer.writeheader()
+                    writer.writerows(summary['credentials'])
+                self.stdout.write(f"Generated passwords written to {options['credentials_out']}")
+            else:
+                self.stdout.write(self.style.WARNING(
+                    f"{len(summary['credentials'])} password(s) were generated; "
+                    "use --credentials-out to keep them"
+                ))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {summary['created']} student(s), skipped {len(summary['skipped'])} "
+            f"in {elapsed:.1f}s"
+        ))
+
+    def get_milestone(self, order):
+        if order is None:
+            return Milestone.objects.first()
+        try:
+            return Milestone.objects.get(order=order)
+        except Milestone.DoesNotExist:
+            raise CommandError(f"No milestone with order {order}")
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired outstanding and blacklisted refresh tokens in bounded "
+        "batches. Meant to run from cron, e.g. hourly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-batches', type=int, default=0,
+                            help="Stop after this many batches (0 = until done).")
+        parser.add_argument('--sleep', type=float, default=0.05,
+                            help="Seconds to pause between batches to let other writers in.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now()
+        batches = deleted = 0
+
+        while not options['max_batches'] or batches < options['max_batches']:
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lt=cutoff)
+                .order_by('id').values_list('id', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+
+            with transaction.atomic():
+                BlacklistedToken.objects.filter(token_id__in=ids).delete()
+                OutstandingToken.objects.filter(id__in=ids).delete()
+
+            batches += 1
+            deleted += len(ids)
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Pruned {deleted} expired token(s) in {batches} batch(es)"
+        ))
@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from user.outbox import Throttle, claim_batch, send_batch
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails, reusing one SMTP connection per batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep polling for new emails instead of exiting when the queue is empty.")
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX['BATCH_SIZE'])
+        parser.add_argument('--rate', type=float, default=settings.OUTBOX['RATE_PER_SECOND'],
+                            help="Maximum emails per second (0 = unthrottled).")
+
+    def handle(self, *args, **options):
+        throttle = Throttle(options['rate'])
+        total_sent = total_failed = 0
+
+        while True:
+            emails = claim_batch(options['batch_size'])
+            if emails:
+                sent, failed = send_batch(emails, throttle)
+                total_sent += sent
+                total_failed += failed
+                self.stdout.write(f"Sent {sent}, failed {failed}")
+                continue
+            if not options['loop']:
+                break
+            time.sleep(settings.OUTBOX['POLL_INTERVAL'])
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {total_sent} sent, {total_failed} failed"))
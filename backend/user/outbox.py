@@ -0,0 +1,122 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(subject, body, to_email):
+    """Queue an email for the send_outbox worker instead of sending inline."""
+    return OutboxEmail.objects.create(subject=subject, body=body, to_email=to_email)
+
+
+def claim_batch(batch_size):
+    """
+    Mark up to ``batch_size`` due emails as sending and return them.
+
+    Rows stuck in ``sending`` longer than ``OUTBOX['CLAIM_TIMEOUT']``
+    (a crashed worker) are claimed again.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.OUTBOX['CLAIM_TIMEOUT'])
+    with transaction.atomic():
+        ids = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.PENDING, available_at__lte=now)
+            .order_by('available_at').values_list('id', flat=True)[:batch_size]
+        )
+        if len(ids) < batch_size:
+            ids += list(
+                OutboxEmail.objects.select_for_update(skip_locked=True)
+                .filter(status=OutboxEmail.SENDING, claimed_at__lt=stale)
+                .values_list('id', flat=True)[:batch_size - len(ids)]
+            )
+        OutboxEmail.objects.filter(id__in=ids).update(status=OutboxEmail.SENDING, claimed_at=now)
+    return list(OutboxEmail.objects.filter(id__in=ids).order_by('available_at'))
+
+
+class Throttle:
+    """Spaces calls at least ``1 / rate`` seconds apart."""
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+
+    def wait(self):
+        now = time.monotonic()
+        if now < self._next:
+            time.sleep(self._next - now)
+            now = self._next
+        self._next = now + self.interval
+
+
+def _record_failure(email, error):
+    config = settings.OUTBOX
+    email.last_error = str(error)
+    if email.attempts >= config['MAX_ATTEMPTS']:
+        email.status = OutboxEmail.FAILED
+    else:
+        email.status = OutboxEmail.PENDING
+        email.available_at = timezone.now() + timedelta(
+            seconds=config['RETRY_BACKOFF'] * 2 ** (email.attempts - 1)
+        )
+
+
+def _save(email):
+    email.save(update_fields=['status', 'attempts', 'last_error', 'available_at', 'sent_at'])
+
+
+def send_batch(emails, throttle=None):
+    """
+    Deliver ``emails`` over a single SMTP connection.
+
+    Failures are rescheduled with exponential backoff until
+    ``OUTBOX['MAX_ATTEMPTS']`` is reached. Returns ``(sent, failed)``.
+    """
+    sent = failed = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        logger.warning(f"Outbox could not connect to the mail server: {e}")
+        for email in emails:
+            email.attempts += 1
+            _record_failure(email, e)
+            _save(email)
+        return 0, len(emails)
+
+    try:
+        for email in emails:
+            if throttle:
+                throttle.wait()
+            email.attempts += 1
+            try:
+                EmailMessage(
+                    email.subject, email.body, settings.EMAIL_HOST_USER, [email.to_email],
+                    connection=connection,
+                ).send()
+            except Exception as e:
+                logger.warning(f"Outbox email {email.id} failed (attempt {email.attempts}): {e}")
+                failed += 1
+                _record_failure(email, e)
+                # The SMTP session may be unusable after an error; start a fresh one
+                connection.close()
+                try:
+                    connection.open()
+                except Exception:
+                    pass  # send() opens a per-message connection instead
+            else:
+                sent += 1
+                email.status = OutboxEmail.SENT
+                email.sent_at = timezone.now()
+                email.last_error = ''
+            _save(email)
+    finally:
+        connection.close()
+    return sent, failed
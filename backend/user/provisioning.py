@@ -0,0 +1,175 @@
+import csv
+import io
+import secrets
+import string
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import DataError, IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from learn.models import UserProgress
+from .models import User
+
+PASSWORD_ALPHABET = string.ascii_letters + string.digits
+
+
+def generate_password(length=10):
+    # Always contains a letter and a digit, as LetterNumberValidator requires
+    while True:
+        password = ''.join(secrets.choice(PASSWORD_ALPHABET) for _ in range(length))
+        if any(c.isalpha() for c in password) and any(c.isdigit() for c in password):
+            return password
+
+
+def is_acceptable_password(password):
+    # Same rules as RegisterSerializer
+    return (len(password) >= 8
+            and any(c.isalpha() for c in password)
+            and any(c.isdigit() for c in password))
+
+
+def read_students(stream):
+    """
+    Yield student rows from a CSV stream with ``email``, ``username`` and
+    optional ``password`` columns. Accepts text or binary streams.
+    """
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    for line, row in enumerate(csv.DictReader(stream), start=2):
+        yield line, {key.strip().lower(): (value or '').strip() for key, value in row.items() if key}
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class StudentImporter:
+    """
+    Bulk-create students and their ``UserProgress`` rows from CSV rows.
+
+    With ``workers`` > 1 passwords are hashed across a process pool (PBKDF2
+    dominates the cost); that is for the management command, not for web
+    requests. Each chunk is committed in its own transaction, and a chunk
+    the database rejects is retried row by row, so one bad row is reported
+    instead of failing the import.
+    """
+    def __init__(self, chunk_size=500, workers=1, milestone=None):
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.milestone = milestone
+        self.created = 0
+        self.skipped = []
+        self.credentials = []
+        self._seen_emails = set()
+        self._seen_usernames = set()
+
+    def run(self, rows):
+        pool = ProcessPoolExecutor(self.workers) if self.workers > 1 else None
+        try:
+            for chunk in _chunks(rows, self.chunk_size):
+                self._import_chunk(chunk, pool)
+        finally:
+            if pool:
+                pool.shutdown()
+        return self.summary()
+
+    def summary(self):
+        return {
+            'created': self.created,
+            'skipped': [{'line': line, 'reason': reason} for line, reason in self.skipped],
+            'credentials': self.credentials,
+        }
+
+    def _valid_rows(self, chunk):
+        # Usernames default to the email's local part; look up the final names
+        rows = []
+        for line, row in chunk:
+            email = row.get('email', '').lower()
+            rows.append((line, row, email, row.get('username') or email.split('@')[0]))
+        # Compared case-insensitively, as MySQL's collation does for the unique indexes
+        taken_emails = set(User.objects.annotate(key=Lower('email')).filter(
+            key__in={email for _, _, email, _ in rows}).values_list('key', flat=True))
+        taken_usernames = set(User.objects.annotate(key=Lower('username')).filter(
+            key__in={username.lower() for _, _, _, username in rows}).values_list('key', flat=True))
+
+        for line, row, email, username in rows:
+            if not self._field_is_valid('email', email):
+                self.skipped.append((line, 'invalid email'))
+                continue
+            if not username or not self._field_is_valid('username', username):
+                self.skipped.append((line, 'invalid username'))
+                continue
+            if email in taken_emails or email in self._seen_emails:
+                self.skipped.append((line, 'email already registered'))
+                continue
+            if username.lower() in taken_usernames or username.lower() in self._seen_usernames:
+                self.skipped.append((line, 'username already taken'))
+                continue
+            password = row.get('password', '')
+            if password and not is_acceptable_password(password):
+                self.skipped.append((line, 'password must be 8+ characters with a letter and a number'))
+                continue
+            self._seen_emails.add(email)
+            self._seen_usernames.add(username.lower())
+            yield line, email, username, password
+
+    @staticmethod
+    def _field_is_valid(name, value):
+        # The model field's own validators, max_length included
+        try:
+            User._meta.get_field(name).run_validators(value)
+        except ValidationError:
+            return False
+        return True
+
+    def _import_chunk(self, chunk, pool):
+        students = []
+        for line, email, username, password in self._valid_rows(chunk):
+            generated = not password
+            students.append((line, email, username, generate_password() if generated else password, generated))
+        if not students:
+            return
+
+        passwords = [password for _, _, _, password, _ in students]
+        if pool:
+            hashes = list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // self.workers)))
+        else:
+            hashes = [make_password(password) for password in passwords]
+
+        try:
+            self._save(students, hashes)
+        except (IntegrityError, DataError):
+            # Something the checks above can't see, e.g. a concurrent signup
+            for student, hashed in zip(students, hashes):
+                try:
+                    self._save([student], [hashed])
+                except (IntegrityError, DataError):
+                    self.skipped.append((student[0], 'rejected by the database'))
+
+    def _save(self, students, hashes):
+        with transaction.atomic():
+            User.objects.bulk_create([
+                User(email=email, username=username, password=hashed, email_verified=True)
+                for (_, email, username, _, _), hashed in zip(students, hashes)
+            ])
+            # MySQL does not return ids from bulk_create, so look them up in one query
+            user_ids = User.objects.filter(
+                email__in=[email for _, email, _, _, _ in students]
+            ).values_list('id', flat=True)
+            UserProgress.objects.bulk_create(
+                [UserProgress(user_id=user_id, current_milestone=self.milestone) for user_id in user_ids],
+                ignore_conflicts=True
+            )
+        self.created += len(students)
+        self.credentials += [
+            {'email': email, 'username': username, 'password': password}
+            for _, email, username, password, generated in students if generated
+        ]
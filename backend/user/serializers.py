@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from .authentication import token_version
+from .blacklist import FilteredRefreshToken
 
 User = get_user_model()
 
@@ -15,8 +17,13 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         token = super().get_token(user)
         token['email'] = user.email
         token['username'] = user.username
+        token['ver'] = token_version(user)
         return token
 
+class CookieTokenRefreshSerializer(TokenRefreshSerializer):
+    # Skips the blacklist query for jtis the in-memory filter has never seen
+    token_class = FilteredRefreshToken
+
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(
         write_only=True,
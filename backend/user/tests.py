@@ -1,3 +1,200 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import CookieJWTAuthentication, cache_user, user_cache_key
+from .blacklist import BlacklistFilter, BloomFilter
+from .models import User
+from .provisioning import StudentImporter
+from .serializers import MyTokenObtainPairSerializer
+from .throttling import AuthIPThrottle, local_buckets
+
+
+class CachedUserAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='student@example.com', username='student', password='x')
+        self.auth = CookieJWTAuthentication()
+
+    def token(self):
+        return MyTokenObtainPairSerializer.get_token(self.user).access_token
+
+    def test_versioned_token_is_served_from_cache(self):
+        token = self.token()
+        self.auth.get_user(token)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.auth.get_user(token).pk, self.user.pk)
+
+    def test_token_without_version_always_reads_the_database(self):
+        cache_user(self.user)
+        with self.assertNumQueries(1):
+            self.auth.get_user(AccessToken.for_user(self.user))
+
+    def test_inactive_user_in_cache_is_rejected(self):
+        token = self.token()
+        self.user.is_active = False
+        cache_user(self.user)  # As another worker might still hold it
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(token)
+
+    def test_deactivation_evicts_the_cached_user(self):
+        token = self.token()
+        self.auth.get_user(token)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(token)
+
+    def test_password_change_invalidates_older_tokens(self):
+        token = self.token()
+        self.user.set_password('changed')
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(token)
+
+
+class BloomFilterTests(TestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000)
+        items = [f"jti-{i}" for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        self.assertTrue(all(item in bloom for item in items))
+        self.assertEqual(bloom.count, 1000)
+
+    def test_false_positive_rate_is_near_target(self):
+        bloom = BloomFilter(5000, error_rate=0.01)
+        for i in range(5000):
+            bloom.add(f"in-{i}")
+        false_positives = sum(f"out-{i}" in bloom for i in range(20000))
+        self.assertLess(false_positives / 20000, 0.02)
+
+    def test_sizing(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        self.assertEqual(bloom.hashes, 7)
+        self.assertEqual(len(bloom.bits), (bloom.size + 7) // 8)
+        self.assertNotIn("anything", BloomFilter(0))
+
+
+@override_settings(TOKEN_BLACKLIST_FILTER=dict(settings.TOKEN_BLACKLIST_FILTER, SYNC_SECONDS=0, SYNC_OVERLAP_ROWS=10))
+class BlacklistFilterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='student@example.com', username='student', password='x')
+        self.filter = BlacklistFilter()
+
+    def blacklist(self, jti, **kwargs):
+        token = OutstandingToken.objects.create(
+            user=self.user, jti=jti, token=jti, expires_at=timezone.now() + timedelta(days=1),
+        )
+        return BlacklistedToken.objects.create(token=token, **kwargs)
+
+    def test_picks_up_rows_from_other_workers(self):
+        self.blacklist('first')
+        self.assertTrue(self.filter.might_contain('first'))
+        self.assertFalse(self.filter.might_contain('second'))
+        self.blacklist('second')
+        self.assertTrue(self.filter.might_contain('second'))
+
+    def test_rows_committed_after_a_higher_id_are_synced(self):
+        row = self.blacklist('high', id=20)
+        self.assertTrue(self.filter.might_contain('high'))
+        # Allocated a lower id, but committed after the sync above
+        self.blacklist('late', id=row.id - 5)
+        self.assertTrue(self.filter.might_contain('late'))
+
+    def test_re_read_rows_are_not_counted_twice(self):
+        self.blacklist('only')
+        self.filter.might_contain('only')
+        self.filter.might_contain('only')
+        self.assertEqual(self.filter._filter.count, 1)
+
+    def test_expired_rows_are_skipped(self):
+        token = self.blacklist('expired').token
+        token.expires_at = timezone.now() - timedelta(minutes=1)
+        token.save()
+        self.assertFalse(self.filter.might_contain('expired'))
+
+
+class AuthIPThrottleTests(TestCase):
+    def ident(self, **meta):
+        request = APIRequestFactory().post('/api/login/', REMOTE_ADDR='10.0.0.1', **meta)
+        return AuthIPThrottle().get_cache_key(request, None)
+
+    def test_forwarded_for_is_ignored_without_proxies(self):
+        with override_settings(REST_FRAMEWORK=dict(settings.REST_FRAMEWORK, NUM_PROXIES=0)):
+            self.assertEqual(self.ident(HTTP_X_FORWARDED_FOR='1.2.3.4'), '10.0.0.1')
+
+    def test_spoofed_entries_are_skipped_behind_a_proxy(self):
+        with override_settings(REST_FRAMEWORK=dict(settings.REST_FRAMEWORK, NUM_PROXIES=1)):
+            self.assertEqual(self.ident(HTTP_X_FORWARDED_FOR='1.2.3.4, 203.0.113.7'), '203.0.113.7')
+
+
+class EmailSendThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        local_buckets.clear()
+
+    def test_password_reset_emails_are_limited_per_address(self):
+        User.objects.create_user(email='student@example.com', username='student', password='x')
+        client = APIClient()
+        url = reverse('password-reset-request')
+        codes = [client.post(url, {'email': 'student@example.com'}).status_code for _ in range(5)]
+        self.assertEqual(codes, [200] * 5)
+        self.assertEqual(client.post(url, {'email': 'Student@example.com'}).status_code, 429)
+        self.assertEqual(client.post(url, {'email': 'other@example.com'}).status_code, 404)
+
+
+class StudentImporterTests(TestCase):
+    def test_defaulted_username_is_checked_against_existing_users(self):
+        User.objects.create_user(email='amal@old.example.com', username='amal', password='x')
+        importer = StudentImporter(workers=1)
+        summary = importer.run([
+            (2, {'email': 'amal@example.com', 'username': ''}),
+            (3, {'email': 'nimal@example.com', 'username': ''}),
+        ])
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual(summary['skipped'], [{'line': 2, 'reason': 'username already taken'}])
+        self.assertTrue(User.objects.filter(username='nimal').exists())
+
+    def test_rows_are_checked_like_the_model(self):
+        User.objects.create_user(email='Amal@Example.com', username='Amal', password='x')
+        summary = StudentImporter(workers=1).run([
+            (2, {'email': 'amal@example.com', 'username': 'new'}),
+            (3, {'email': 'nimal@example.com', 'username': 'amal'}),
+            (4, {'email': 'kamal@example.com', 'username': 'k' * 151}),
+            (5, {'email': 'saman@example.com', 'username': 'sa man'}),
+        ])
+        self.assertEqual(summary['created'], 0)
+        self.assertEqual([s['reason'] for s in summary['skipped']], [
+            'email already registered', 'username already taken', 'invalid username', 'invalid username',
+        ])
+
+    def test_rows_the_database_rejects_are_reported(self):
+        User.objects.create_user(email='amal@example.com', username='amal', password='x')
+        importer = StudentImporter(workers=1)
+        rows = [(2, 'amal@example.com', 'other', ''), (3, 'nimal@example.com', 'nimal', '')]
+        with mock.patch.object(StudentImporter, '_valid_rows', return_value=rows):
+            summary = importer.run([(2, {}), (3, {})])
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual(summary['skipped'], [{'line': 2, 'reason': 'rejected by the database'}])
+        self.assertEqual([c['email'] for c in summary['credentials']], ['nimal@example.com'])
+
+    def test_upload_with_a_bad_milestone_order(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(
+            email='staff@example.com', username='staff', password='x', is_staff=True,
+        ))
+        upload = SimpleUploadedFile('students.csv', b"email,username\namal@example.com,amal\n")
+        response = client.post(reverse('student-import'), {'file': upload, 'milestone_order': 'first'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,136 @@
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+import jwt
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_from_epoch
+
+# Access tokens expiring sooner than this get a refresh hint
+REFRESH_WINDOW = timedelta(minutes=15)
+
+
+class VerifiedTokenCache:
+    """
+    Worker-wide LRU of access tokens whose signature already checked out.
+
+    Hits skip signature verification but still re-check expiry, so a
+    cached token stops working the moment it expires.
+    """
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, raw):
+        with self._lock:
+            token = self._tokens.get(raw)
+            if token is not None:
+                self._tokens.move_to_end(raw)
+        if token is None:
+            return None
+        try:
+            token.check_exp(current_time=aware_utcnow())
+        except TokenError:
+            self.discard(raw)
+            return None
+        return token
+
+    def put(self, raw, token):
+        with self._lock:
+            self._tokens[raw] = token
+            self._tokens.move_to_end(raw)
+            while len(self._tokens) > self.maxsize:
+                self._tokens.popitem(last=False)
+
+    def discard(self, raw):
+        with self._lock:
+            self._tokens.pop(raw, None)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+
+
+verified_access_tokens = VerifiedTokenCache()
+
+
+class TokenContext:
+    """
+    Parsed auth cookies for one request.
+
+    Built once per request by ``TokenRefreshMiddleware`` and shared with
+    ``CookieJWTAuthentication`` and ``check_token_refresh`` so each token
+    is decoded and verified at most once.
+    """
+    def __init__(self, request):
+        self.raw_access = request.COOKIES.get(settings.SIMPLE_JWT['AUTH_COOKIE'])
+        self.raw_refresh = request.COOKIES.get(settings.SIMPLE_JWT['AUTH_COOKIE_REFRESH'])
+
+    @cached_property
+    def _access(self):
+        """``(token, error)`` for the access cookie."""
+        if not self.raw_access:
+            return None, None
+        token = verified_access_tokens.get(self.raw_access)
+        if token is not None:
+            return token, None
+        try:
+            token = AccessToken(self.raw_access)
+        except TokenError as e:
+            return None, e
+        verified_access_tokens.put(self.raw_access, token)
+        return token, None
+
+    @property
+    def access_token(self):
+        """The verified access token, or None if absent or invalid."""
+        return self._access[0]
+
+    @property
+    def access_error(self):
+        return self._access[1]
+
+    @cached_property
+    def access_expires_at(self):
+        token = self.access_token
+        if token is not None:
+            return datetime_from_epoch(token['exp'])
+        if not self.raw_access:
+            return None
+        # Expired or otherwise invalid: read exp without trusting it, for the refresh hint only
+        try:
+            exp = jwt.decode(self.raw_access, options={'verify_signature': False}).get('exp')
+        except jwt.InvalidTokenError:
+            return None
+        return datetime_from_epoch(exp) if exp else None
+
+    @cached_property
+    def should_refresh(self):
+        expires_at = self.access_expires_at
+        return expires_at is not None and expires_at - aware_utcnow() < REFRESH_WINDOW
+
+    @cached_property
+    def refresh_status(self):
+        """'valid', 'expired', 'invalid' or None when there is no refresh cookie."""
+        if not self.raw_refresh:
+            return None
+        try:
+            jwt.decode(self.raw_refresh, settings.SECRET_KEY, algorithms=['HS256'])
+        except jwt.ExpiredSignatureError:
+            return 'expired'
+        except jwt.InvalidTokenError:
+            return 'invalid'
+        return 'valid'
+
+
+def get_token_context(request):
+    """Return the request's ``TokenContext``, creating it on first use."""
+    request = getattr(request, '_request', request)  # unwrap DRF requests
+    context = getattr(request, 'token_context', None)
+    if context is None:
+        context = request.token_context = TokenContext(request)
+    return context
@@ -1,7 +1,8 @@
 from django.urls import path
 from .views import (
     RegisterView, VerifyEmailView, LoginView, LogoutView,
-    UserDetailView, PasswordResetRequestView, PasswordResetView, CookieTokenRefreshView
+    UserDetailView, PasswordResetRequestView, PasswordResetView, CookieTokenRefreshView,
+    StudentImportView
 )
 from rest_framework_simplejwt.views import TokenRefreshView
 
@@ -14,4 +15,5 @@ urlpatterns = [
     path('password-reset-request/', PasswordResetRequestView.as_view(), name='password-reset-request'),
     path('password-reset/', PasswordResetView.as_view(), name='password-reset'),
     path('token/refresh/', CookieTokenRefreshView.as_view(), name='token-refresh'),  # Use custom view,
+    path('students/import/', StudentImportView.as_view(), name='student-import'),
 ]
\ No newline at end of file
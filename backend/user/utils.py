@@ -1,7 +1,4 @@
-from django.http import JsonResponse
-import jwt
-from datetime import datetime
-from django.conf import settings
+from .tokens import get_token_context
 
 def check_token_refresh(view_func):
     """
@@ -11,22 +8,12 @@ def check_token_refresh(view_func):
         response = view_func(request, *args, **kwargs)
         
         if hasattr(request, 'should_refresh_token') and request.should_refresh_token:
-            refresh_token = request.COOKIES.get('refresh_token')
-            if refresh_token:
-                try:
-                    # Verify refresh token is valid
-                    jwt.decode(
-                        refresh_token,
-                        settings.SECRET_KEY,
-                        algorithms=['HS256']
-                    )
-                    
-                    # If we get here, token is valid
-                    response.data['should_refresh_token'] = True
-                except jwt.ExpiredSignatureError:
-                    response.data['session_expired'] = True
-                except jwt.InvalidTokenError:
-                    pass
+            # Verified once per request and shared with the middleware
+            refresh_status = get_token_context(request).refresh_status
+            if refresh_status == 'valid':
+                response.data['should_refresh_token'] = True
+            elif refresh_status == 'expired':
+                response.data['session_expired'] = True
                     
         return response
-    return wrapper
\ No newline at end of file
+    return wrapper
@@ -2,17 +2,22 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.permissions import AllowAny
-from django.core.mail import send_mail
+from rest_framework.permissions import IsAdminUser
+from rest_framework.parsers import MultiPartParser
 from django.conf import settings
 import random
 import string
 from datetime import datetime, timedelta
 from django.utils import timezone
 from .models import User
+from .outbox import enqueue_email
+from .throttling import AuthIPThrottle, AuthEmailThrottle, AuthEmailSendThrottle
+from .provisioning import StudentImporter, read_students
+from learn.models import Milestone
 from .serializers import (
     UserSerializer, MyTokenObtainPairSerializer, RegisterSerializer,
     EmailVerificationSerializer, PasswordResetRequestSerializer,
-    PasswordResetSerializer
+    PasswordResetSerializer, CookieTokenRefreshSerializer
 )
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.views import APIView
@@ -28,6 +33,8 @@ import logging
 
 class RegisterView(generics.CreateAPIView):
     permission_classes = [AllowAny]  # Add this line
+    # Each registration sends an OTP email
+    throttle_classes = [AuthIPThrottle, AuthEmailSendThrottle]
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
     
@@ -42,13 +49,11 @@ class RegisterView(generics.CreateAPIView):
         user.otp_created_at = timezone.now()
         user.save()
         
-        # Send email with OTP
-        send_mail(
+        # Queue email with OTP; the send_outbox worker delivers it
+        enqueue_email(
             'Verify your email for PyWhiz',
             f'Your OTP is: {otp}',
-            settings.EMAIL_HOST_USER,
-            [user.email],
-            fail_silently=False,
+            user.email,
         )
         
         return Response({
@@ -58,6 +63,8 @@ class RegisterView(generics.CreateAPIView):
 
 class VerifyEmailView(APIView):
     permission_classes = [AllowAny]
+    # Checked before any user lookup
+    throttle_classes = [AuthIPThrottle, AuthEmailThrottle]
     def post(self, request):
         serializer = EmailVerificationSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -84,6 +91,8 @@ class VerifyEmailView(APIView):
 
 class LoginView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
+    # Rejects over-budget attempts before the password hash check
+    throttle_classes = [AuthIPThrottle, AuthEmailThrottle]
     
     def post(self, request, *args, **kwargs):
         response = super().post(request, *args, **kwargs)
@@ -130,6 +139,8 @@ class UserDetailView(generics.RetrieveAPIView):
 
 class PasswordResetRequestView(APIView):
     permission_classes = [AllowAny]
+    # Checked before any user lookup; each request sends an OTP email
+    throttle_classes = [AuthIPThrottle, AuthEmailSendThrottle]
     def post(self, request):
         serializer = PasswordResetRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -147,19 +158,19 @@ class PasswordResetRequestView(APIView):
         user.otp_created_at = timezone.now()
         user.save()
         
-        # Send email with OTP
-        send_mail(
+        # Queue email with OTP; the send_outbox worker delivers it
+        enqueue_email(
             'Password Reset OTP for PyWhiz',
             f'Your OTP is: {otp}',
-            settings.EMAIL_HOST_USER,
-            [user.email],
-            fail_silently=False,
+            user.email,
         )
         
         return Response({'message': 'OTP sent to your email'}, status=status.HTTP_200_OK)
 
 class PasswordResetView(APIView):
     permission_classes = [AllowAny]
+    # Checked before any user lookup
+    throttle_classes = [AuthIPThrottle, AuthEmailThrottle]
     def post(self, request):
         serializer = PasswordResetSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -185,9 +196,37 @@ class PasswordResetView(APIView):
         else:
             return Response({'error': 'Invalid or expired OTP'}, status=status.HTTP_400_BAD_REQUEST)
 
+class StudentImportView(APIView):
+    """Staff upload of a class list CSV (see the import_students command)."""
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({'error': 'No CSV file provided'}, status=status.HTTP_400_BAD_REQUEST)
+
+        milestone_order = request.data.get('milestone_order')
+        if milestone_order:
+            try:
+                milestone_order = int(milestone_order)
+            except ValueError:
+                return Response({'error': 'milestone_order must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+            milestone = Milestone.objects.filter(order=milestone_order).first()
+            if milestone is None:
+                return Response({'error': 'Milestone not found'}, status=status.HTTP_404_NOT_FOUND)
+        else:
+            milestone = Milestone.objects.first()
+
+        # Hashed inline: no process pool inside a web worker
+        summary = StudentImporter(milestone=milestone).run(read_students(upload.file))
+        return Response(summary, status=status.HTTP_201_CREATED)
+
 logger = logging.getLogger(__name__)
 
 class CookieTokenRefreshView(TokenRefreshView):
+    serializer_class = CookieTokenRefreshSerializer
+
     def post(self, request, *args, **kwargs):
         refresh_token = request.COOKIES.get('refresh_token')
 
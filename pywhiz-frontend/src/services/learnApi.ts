@@ -162,9 +162,19 @@ export const updateCurrentMilestone = async (milestoneId: string): Promise<void>
 }
 
 // New API functions for personalized exercises
+// The list is cursor-paginated; follow `next` until the whole history is loaded
 export const fetchPersonalizedExercises = async (): Promise<PersonalizedExercise[]> => {
-  const response = await api.get("/learn/personalized-exercises/")
-  return response.data
+  const exercises: PersonalizedExercise[] = []
+  let cursor: string | null = null
+  do {
+    const response = await api.get("/learn/personalized-exercises/", {
+      params: { page_size: 100, ...(cursor ? { cursor } : {}) },
+    })
+    exercises.push(...response.data.results)
+    // Only the cursor is taken from `next`: its host is the one Django saw, which may not be ours
+    cursor = response.data.next ? new URL(response.data.next).searchParams.get("cursor") : null
+  } while (cursor)
+  return exercises
 }
 
 export const createPersonalizedExercise = async (data: {